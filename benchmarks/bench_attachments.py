@@ -0,0 +1,75 @@
+"""
+Measures the peak memory allocated by bulk sending mails with a large
+attachment each against the fake Postmark server.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from email.headerregistry import Address
+
+from riskmatrix.mail import PostmarkMailer
+from riskmatrix.mail.fake_postmark import FakePostmarkServer
+
+
+from typing import Any
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mails', type=int, default=20)
+    parser.add_argument(
+        '--size',
+        type=int,
+        default=5_000_000,
+        help='Size of the attachment in bytes'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.pdf')
+        with open(path, 'wb') as fp:
+            fp.write(os.urandom(args.size))
+
+        variants: dict[str, Any] = {
+            'bytes': lambda: open(path, 'rb').read(),
+            'path': lambda: path,
+        }
+        with FakePostmarkServer() as server:
+            mailer = PostmarkMailer(
+                Address(addr_spec='noreply@example.com'),
+                'token',
+                'benchmark',
+                api_url=server.url
+            )
+            for label, content in variants.items():
+                tracemalloc.start()
+                mails: Any = [
+                    {
+                        'receivers': Address(addr_spec=f'u{i}@example.com'),
+                        'subject': 'Report',
+                        'content': 'See attachment',
+                        'attachments': [{
+                            'filename': 'report.pdf',
+                            'content': content(),
+                            'content_type': 'application/pdf'
+                        }]
+                    }
+                    for i in range(args.mails)
+                ]
+                start = time.perf_counter()
+                mailer.bulk_send(mails)
+                elapsed = time.perf_counter() - start
+                del mails
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f'{label:>5}: peak {peak / 1_000_000:7.1f} MB, '
+                    f'{elapsed:.2f}s'
+                )
+            mailer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Measures the throughput of streaming generated risks as server-sent
+events for concurrent batch requests, using the fake LLM provider with a
+simulated latency and token rate, for a varying generation concurrency.
+
+Also reports the peak number of generation threads in use and the mean
+time until a request receives its first event.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from riskmatrix.fake_llm import FakeChatModel
+from riskmatrix.llm import GenerationPool
+from riskmatrix.views.risk import server_sent_event
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterator
+
+
+class Occupancy:
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+        self._lock = Lock()
+
+    def track(
+        self,
+        stream: 'Callable[[], Iterator[str]]'
+    ) -> 'Callable[[], Iterator[str]]':
+
+        def tracked() -> 'Iterator[str]':
+            with self._lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                yield from stream()
+            finally:
+                with self._lock:
+                    self.running -= 1
+        return tracked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=4)
+    parser.add_argument('--catalogs', type=int, default=4)
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.2,
+        help='Simulated time to the first token in seconds'
+    )
+    parser.add_argument(
+        '--tokens-per-second',
+        type=float,
+        default=200,
+        help='Simulated token rate of a single generation'
+    )
+    args = parser.parse_args()
+
+    llm = FakeChatModel(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second
+    )
+
+    def generation(name: str) -> 'Callable[[], Iterator[str]]':
+        prompt = f'Current Risk-Catalog:\n - name:{name}\n'
+
+        def stream() -> 'Iterator[str]':
+            for chunk in llm.stream([prompt]):
+                yield chunk.content
+        return stream
+
+    for max_concurrency in (1, 2, 4, 8, 16):
+        pool = GenerationPool(max_concurrency)
+        occupancy = Occupancy()
+
+        def batch_request(index: int) -> tuple[int, float]:
+            streams = {
+                f'{index}-{catalog}': occupancy.track(
+                    generation(f'Catalog {index}-{catalog}')
+                )
+                for catalog in range(args.catalogs)
+            }
+            start = time.perf_counter()
+            first_event = None
+            size = 0
+            for event in pool.multiplex(streams):
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                data = {'catalog': event.key, 'text': event.data}
+                size += len(server_sent_event(event.event, data))
+            assert first_event is not None
+            return size, first_event
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.requests) as executor:
+            results = list(executor.map(batch_request, range(args.requests)))
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+
+        size = sum(size for size, _ in results)
+        first_event = sum(first for _, first in results) / len(results)
+        print(
+            f'{max_concurrency:2} concurrent: '
+            f'{size / elapsed / 1000:7.1f} kB/s, '
+            f'first event {first_event:5.2f}s, '
+            f'peak {occupancy.peak:2} threads ({elapsed:.2f}s)'
+        )
+
+
+if __name__ == '__main__':
+    main()
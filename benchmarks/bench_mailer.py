@@ -0,0 +1,78 @@
+"""
+Measures the throughput of bulk sending mails against the fake Postmark
+server with a simulated API latency, for a varying number of workers.
+
+A share of the batches fails with a server error, these mails come back
+as temporary failures and are retried, like the outbox would do.
+"""
+import argparse
+import time
+from email.headerregistry import Address
+
+from riskmatrix.mail import MailState
+from riskmatrix.mail import PostmarkMailer
+from riskmatrix.mail.fake_postmark import FakePostmarkServer
+
+
+from typing import Any
+
+
+def make_mails(count: int) -> list[Any]:
+    return [
+        {
+            'receivers': Address(addr_spec=f'user{index}@example.com'),
+            'subject': 'Report',
+            'content': 'Lorem ipsum dolor sit amet. ' * 40
+        }
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mails', type=int, default=10_000)
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.1,
+        help='Simulated API latency per request in seconds'
+    )
+    parser.add_argument(
+        '--failures',
+        type=int,
+        default=2,
+        help='Number of batches which fail with a server error'
+    )
+    args = parser.parse_args()
+
+    with FakePostmarkServer(latency=args.latency) as server:
+        for max_workers in (1, 2, 4, 8):
+            server.fail_requests = args.failures
+            mailer = PostmarkMailer(
+                Address(addr_spec='noreply@example.com'),
+                'token',
+                'benchmark',
+                max_workers=max_workers,
+                api_url=server.url
+            )
+            mails = make_mails(args.mails)
+            start = time.perf_counter()
+            rounds = 0
+            while mails:
+                rounds += 1
+                results = mailer.bulk_send(mails)
+                mails = [
+                    mail
+                    for mail, result in zip(mails, results, strict=True)
+                    if result == MailState.temporary_failure
+                ]
+            elapsed = time.perf_counter() - start
+            mailer.close()
+            print(
+                f'{max_workers} workers: {args.mails / elapsed:8.0f} mails/s '
+                f'({elapsed:.2f}s, {rounds} rounds)'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures the throughput of `SessionSecurityPolicy.permits`.
+
+The first check on a request loads the user, which dominates the cold
+path, so we measure repeated checks on an already warm request, like a
+typical page with many buttons and links performs them.
+"""
+import argparse
+import sqlalchemy
+import transaction
+from pyramid import testing
+from timeit import Timer
+
+from riskmatrix.cache import request_cache
+from riskmatrix.models import Organization
+from riskmatrix.models import Risk
+from riskmatrix.models import RiskCatalog
+from riskmatrix.models import User
+from riskmatrix.orm import Base
+from riskmatrix.orm import get_engine
+from riskmatrix.orm import get_session_factory
+from riskmatrix.orm import get_tm_session
+from riskmatrix.security_policy import SessionSecurityPolicy
+from riskmatrix.testing import DummyRequest
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from riskmatrix.types import ACL
+
+
+class RequestCachePolicy(SessionSecurityPolicy):
+    """ The policy as it was before it used `request_bound_cache`. """
+
+    acl = request_cache()(
+        SessionSecurityPolicy.acl.__wrapped__  # type:ignore[attr-defined]
+    )
+    principals = request_cache()(
+        SessionSecurityPolicy.principals.__wrapped__  # type:ignore
+    )
+    principal_set = request_cache()(
+        SessionSecurityPolicy.principal_set.__wrapped__  # type:ignore
+    )
+
+
+class ACLContext:
+
+    def __init__(self, acl: list['ACL']):
+        self.acl = acl
+
+    def __acl__(self) -> list['ACL']:
+        return list(self.acl)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checks', type=int, default=100_000)
+    args = parser.parse_args()
+
+    config = testing.setUp(settings={'sqlalchemy.url': 'sqlite:///:memory:'})
+    engine = get_engine(config.get_settings())
+    Base.metadata.create_all(engine)
+    session = get_tm_session(get_session_factory(engine), transaction.manager)
+
+    organization = Organization(name='Benchmark', email='bench@example.com')
+    user = User(organization=organization, email='bench@example.com')
+    catalog = RiskCatalog(name='Catalog', organization=organization)
+    session.add_all([organization, user, catalog])
+    session.flush()
+    risk = Risk(name='Risk', catalog=catalog)
+    session.add(risk)
+    session.flush()
+
+    # the same ACL as the risk, but it has to be built and scanned
+    acl_context = ACLContext(risk.__acl__())
+
+    variants = (
+        ('request_cache, ACL scan', RequestCachePolicy(), acl_context),
+        ('request_bound_cache, ACL scan', SessionSecurityPolicy(), acl_context),  # noqa: E501
+        ('organization fast path', SessionSecurityPolicy(), risk),
+    )
+    for label, policy, context in variants:
+        request = DummyRequest(dbsession=session)
+        request.session['auth.userid'] = user.id
+        testing.setUp(config.registry, request=request)
+        assert policy.permits(request, context, 'view')
+
+        timer = Timer(lambda: policy.permits(request, context, 'view'))
+        best = min(timer.repeat(repeat=5, number=args.checks))
+        checks = args.checks
+        print(
+            f'{label:>30}: '
+            f'{checks / best:>10,.0f} checks/s '
+            f'({best / checks * 1e6:.2f}µs per check)'
+        )
+
+    transaction.abort()
+    testing.tearDown()
+    sqlalchemy.orm.close_all_sessions()
+
+
+if __name__ == '__main__':
+    main()
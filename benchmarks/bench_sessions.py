@@ -0,0 +1,105 @@
+"""
+Compares the cost of loading and saving a session using the available
+session backends.
+
+Every iteration simulates a request of a logged in user: the session is
+loaded from the cookie, read by the security policy, a flash message is
+added and popped again and the session cookie is written.
+"""
+import argparse
+import tempfile
+from pyramid import testing
+from pyramid.request import Request
+from pyramid.response import Response
+from timeit import Timer
+
+from riskmatrix.flash import MessageQueue
+from riskmatrix.security_policy import SessionSecurityPolicy
+from riskmatrix.session import session_factory_from_settings
+
+
+from typing import Any
+
+
+def response_cookies(response: Response) -> dict[str, str]:
+    cookies = {}
+    for header in response.headers.getall('Set-Cookie'):
+        name, value = header.split(';', 1)[0].split('=', 1)
+        # NOTE: beaker prefixes the cookie with a space
+        cookies[name.strip()] = value
+    return cookies
+
+
+def simulate_request(
+    factory: Any,
+    policy:  SessionSecurityPolicy,
+    cookies: dict[str, str]
+) -> dict[str, str]:
+
+    request = Request.blank('/')
+    request.cookies.update(cookies)
+    request.session = factory(request)
+    assert policy.authenticated_userid(request) == 'user'
+    messages = MessageQueue(request)
+    messages.add('Saved')
+    messages.pop()
+    response = Response()
+    request._process_response_callbacks(response)
+    cookies.update(response_cookies(response))
+    return cookies
+
+
+def login(factory: Any, policy: SessionSecurityPolicy) -> dict[str, str]:
+    request = Request.blank('/')
+    request.session = factory(request)
+    policy.remember(request, 'user')
+    response = Response()
+    request._process_response_callbacks(response)
+    return response_cookies(response)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2_000)
+    args = parser.parse_args()
+
+    testing.setUp()
+    policy = SessionSecurityPolicy(timeout=28800)
+
+    with tempfile.TemporaryDirectory() as directory:
+        common = {
+            'session.key': 'riskmatrix',
+            'session.secret': 'benchmark',
+            'session.cookie_expires': '3024000',
+        }
+        variants = (
+            ('beaker file', {
+                **common,
+                'session.type': 'file',
+                'session.data_dir': f'{directory}/data',
+                'session.lock_dir': f'{directory}/lock',
+            }),
+            ('beaker memory', {**common, 'session.type': 'memory'}),
+            ('encrypted cookie', {
+                **common,
+                'session.type': 'encrypted_cookie'
+            }),
+        )
+        for label, settings in variants:
+            factory = session_factory_from_settings(settings)
+            cookies = login(factory, policy)
+
+            timer = Timer(lambda: simulate_request(factory, policy, cookies))
+            best = min(timer.repeat(repeat=5, number=args.requests))
+            count = args.requests
+            print(
+                f'{label:>20}: '
+                f'{count / best:>10,.0f} requests/s '
+                f'({best / count * 1e6:.2f}µs per request)'
+            )
+
+    testing.tearDown()
+
+
+if __name__ == '__main__':
+    main()
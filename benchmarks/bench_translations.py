@@ -0,0 +1,70 @@
+"""
+Measures rendering the header of a table with translated column titles
+and descriptions, with and without memoized translations.
+"""
+import argparse
+from pyramid import i18n
+from pyramid import testing
+from pyramid.interfaces import ILocalizer
+from timeit import Timer
+
+from riskmatrix.data_table import DataColumn
+from riskmatrix.i18n import _
+from riskmatrix.i18n.core import make_localizer
+from riskmatrix.testing import DummyRequest
+
+
+COLUMNS = [
+    DataColumn(_('Name'), _('Name of the risk')),
+    DataColumn(_('Description')),
+    DataColumn(_('Category')),
+    DataColumn(_('Likelihood')),
+    DataColumn(_('Impact')),
+    DataColumn(_('Organization')),
+]
+
+
+def render_header() -> str:
+    return ''.join(column.header() for column in COLUMNS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=10_000)
+    args = parser.parse_args()
+
+    config = testing.setUp()
+    config.add_translation_dirs('riskmatrix:locale/', 'wtforms:locale/')
+    config.commit()
+
+    for language in ('de', 'fr'):
+        localizer = make_localizer(language, config.registry)
+        variants = (
+            ('pyramid', i18n.Localizer(language, localizer.translations)),
+            ('memoized', localizer),
+        )
+        for label, localizer in variants:
+            config.registry.registerUtility(
+                localizer,
+                ILocalizer,
+                name=language
+            )
+            request = DummyRequest()
+            request.locale_name = language
+            request.localizer = localizer
+            testing.setUp(config.registry, request=request)
+
+            timer = Timer(render_header)
+            best = min(timer.repeat(repeat=5, number=args.renders))
+            renders = args.renders
+            print(
+                f'{language} {label:>10}: '
+                f'{renders / best:>10,.0f} headers/s '
+                f'({best / renders * 1e6:.2f}µs per header)'
+            )
+
+    testing.tearDown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import logging
+import runpy
+from setuptools import setup
+from setuptools.command.build_py import build_py
+
+
+log = logging.getLogger('riskmatrix.setup')
+
+
+class BuildPyWithCatalogs(build_py):
+    """ Compiles the gettext catalogs before they are copied. """
+
+    def run(self) -> None:
+        # NOTE: We can't import riskmatrix itself, since its dependencies
+        #       aren't available while building
+        catalogs = runpy.run_path('src/riskmatrix/i18n/catalogs.py')
+        for path in catalogs['compile_catalogs']():
+            log.info('compiled %s', path)
+        super().run()
+
+
+setup(cmdclass={'build_py': BuildPyWithCatalogs})
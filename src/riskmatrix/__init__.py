@@ -1,6 +1,5 @@
 from fanstatic import Fanstatic
 from pyramid.config import Configurator
-from pyramid_beaker import session_factory_from_settings
 from typing import Any
 from email.headerregistry import Address
 from pyramid.settings import asbool
@@ -12,10 +11,7 @@ from riskmatrix.layouts.steps import show_steps
 from riskmatrix.route_factories import root_factory
 from riskmatrix.security import authenticated_user
 from riskmatrix.security_policy import SessionSecurityPolicy
-from openai import OpenAI
-from anthropic import Anthropic
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+from riskmatrix.session import session_factory_from_settings
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -35,11 +31,15 @@ def includeme(config: Configurator) -> None:
     token = settings.get('mail.postmark_token', '')
     stream = settings.get('mail.postmark_stream', 'development')
     blackhole = asbool(settings.get('mail.postmark_blackhole', False))
+    max_workers = int(settings.get('mail.postmark_max_workers', 4))
+    api_url = settings.get('mail.postmark_api_url')
     config.registry.registerUtility(PostmarkMailer(
         Address(addr_spec=default_sender),
         token,
         stream,
-        blackhole=blackhole
+        blackhole=blackhole,
+        max_workers=max_workers,
+        api_url=api_url
     ))
     config.include('pyramid_beaker')
     config.include('pyramid_chameleon')
@@ -48,6 +48,10 @@ def includeme(config: Configurator) -> None:
     config.include('riskmatrix.layouts')
     config.include('riskmatrix.views')
     config.include('riskmatrix.subscribers')
+    config.include('riskmatrix.instrumentation')
+    config.include('riskmatrix.cache')
+    config.include('riskmatrix.passwords')
+    config.include('riskmatrix.i18n')
 
     session_factory = session_factory_from_settings(settings)
     config.set_session_factory(session_factory)
@@ -83,51 +87,19 @@ def main(
             dsn=sentry_dsn,
             environment=sentry_environment,
             integrations=[PyramidIntegration(), SqlalchemyIntegration()],
-            traces_sample_rate=1.0,
-            profiles_sample_rate=1.0,
+            traces_sample_rate=float(
+                settings.get('sentry_traces_sample_rate', 1.0)
+            ),
+            profiles_sample_rate=float(
+                settings.get('sentry_profiles_sample_rate', 1.0)
+            ),
             enable_tracing=True,
             send_default_pii=True
         )
 
     with Configurator(settings=settings, root_factory=root_factory) as config:
         includeme(config)
-
-        if openai_apikey := settings.get('openai_api_key'):
-            openai_client = ChatOpenAI(
-                api_key=openai_apikey,
-                model = "gpt-4o-mini",
-                temperature=0.7
-            )
-            config.add_request_method(
-                lambda r: openai_client,
-                'llm',
-                reify=True
-            )
-        elif anthropic_apikey := settings.get('anthropic_api_key'):
-            anthropic_client = ChatAnthropic(
-                api_key=anthropic_apikey,
-                model="claude-3-5-sonnet-20240620",
-                temperature=0.7
-            )
-            config.add_request_method(
-                lambda r: anthropic_client,
-                'llm',
-                reify=True
-            )
-            
-        if langfuse_host := settings.get("langfuse_host"):
-            from langfuse.callback import CallbackHandler
-            langfuse_handler = CallbackHandler(
-                secret_key=settings.get("langfuse_secret_key"),
-                public_key=settings.get("langfuse_public_key"),
-                host=langfuse_host,
-            )
-            config.add_request_method(
-                lambda r: langfuse_handler,
-                'langfuse',
-                reify=True
-            )
- 
+        config.include('riskmatrix.llm')
 
     app = config.make_wsgi_app()
     return Fanstatic(app, versioning=True)
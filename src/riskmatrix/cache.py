@@ -1,14 +1,33 @@
+import os
+import pickle  # nosec: B403
+import sqlite3
+from collections import OrderedDict
 from enum import Enum
+from functools import partial
 from functools import wraps
+from inspect import signature
 from pyramid.threadlocal import get_current_request
+from threading import local
+from threading import Lock
+from time import monotonic
+from time import time
 
+from riskmatrix.instrumentation.metrics import cache_evictions
+from riskmatrix.instrumentation.metrics import cache_requests
 
-from typing import Any, TypeVar, TYPE_CHECKING
+
+from typing import cast, Any, NamedTuple, TypeVar, TYPE_CHECKING
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from collections.abc import Hashable
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from pyramid.config import Configurator
+    from pyramid.interfaces import IRequest
     from typing_extensions import ParamSpec
 
     _P = ParamSpec('_P')
+    BackendFactory = Callable[[str, int, float | None], 'CacheBackend']
 
 _T = TypeVar('_T')
 
@@ -69,6 +88,8 @@ def request_cache() -> 'Callable[[Callable[_P, _T]], Callable[_P, _T]]':
         user_function: 'Callable[_P, _T]'
     ) -> 'Callable[_P, _T]':
 
+        name = f'request:{user_function.__qualname__}'
+
         @wraps(user_function)
         def wrapper(*args: '_P.args', **kwds: '_P.kwargs') -> _T:
             request = get_current_request()
@@ -80,8 +101,11 @@ def request_cache() -> 'Callable[[Callable[_P, _T]], Callable[_P, _T]]':
             key = (user_function.__name__, args, frozenset(kwds.items()))
             result = cache.get(key, _EMPTY)
             if result is _EMPTY:
+                cache_requests.inc(cache=name, result='miss')
                 result = user_function(*args, **kwds)
                 cache[key] = result
+            else:
+                cache_requests.inc(cache=name, result='hit')
             return result
 
         def cache_clear() -> None:
@@ -93,3 +117,734 @@ def request_cache() -> 'Callable[[Callable[_P, _T]], Callable[_P, _T]]':
         return wrapper
 
     return decorating_function
+
+
+def request_bound_cache(
+) -> 'Callable[[Callable[_P, _T]], Callable[_P, _T]]':
+    """
+    Caches results on the request that is passed to the decorated
+    function as the `request` argument.
+
+    This is a cheaper alternative to :func:`request_cache` for functions
+    on the hot path: The request doesn't need to be looked up, each
+    function gets its own dictionary and the remaining arguments are
+    compared by identity, so they don't need to be hashable.
+
+    NOTE: We keep a reference to the arguments until the end of the
+          request, so their ids can't be reused by other objects.
+          Calls with keyword arguments are not cached.
+    """
+
+    def decorating_function(
+        user_function: 'Callable[_P, _T]'
+    ) -> 'Callable[_P, _T]':
+
+        name = f'request:{user_function.__qualname__}'
+        index = list(signature(user_function).parameters).index('request')
+        hits = cache_requests.labels(cache=name, result='hit')
+        misses = cache_requests.labels(cache=name, result='miss')
+
+        @wraps(user_function)
+        def wrapper(*args: '_P.args', **kwds: '_P.kwargs') -> _T:
+            if kwds:
+                return user_function(*args, **kwds)
+
+            request = cast('IRequest', args[index])
+            try:
+                cache = request.cache
+            except AttributeError:
+                cache = request.cache = {}
+
+            function_cache = cache.get(name)
+            if function_cache is None:
+                function_cache = cache[name] = {}
+
+            others = args[:index] + args[index + 1:]
+            key = tuple(map(id, others))
+            entry = function_cache.get(key)
+            if entry is not None:
+                hits.inc()
+                return entry[1]
+
+            misses.inc()
+            result = user_function(*args, **kwds)
+            function_cache[key] = (others, result)
+            return result
+
+        def cache_clear(request: 'IRequest') -> None:
+            cache = getattr(request, 'cache', None)
+            if cache is not None:
+                cache.pop(name, None)
+
+        wrapper.cache_clear = cache_clear  # type:ignore[attr-defined]
+        return wrapper
+
+    return decorating_function
+
+
+class CacheInfo(NamedTuple):
+    hits:      int
+    misses:    int
+    evictions: int
+    maxsize:   int
+    currsize:  int
+
+
+class _CacheEntry(NamedTuple):
+    value:   Any
+    expires: float | None
+    tags:    frozenset[str]
+
+
+class CacheBackend:
+    """
+    Storage for a single named cache.
+
+    Entries can be tagged, so they can be invalidated without knowing
+    their exact key.
+    """
+
+    name:    str
+    maxsize: int
+    ttl:     float | None
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes on every invalidation, so we can detect values that have
+        been computed while an invalidation happened.
+        """
+        raise NotImplementedError
+
+    def get(self, key: 'Hashable') -> Any:
+        """ Returns the cached value or `_EMPTY`. """
+        raise NotImplementedError
+
+    def set(
+        self,
+        key:        'Hashable',
+        value:      Any,
+        tags:       'Iterable[str]' = (),
+        generation: int | None = None
+    ) -> None:
+        """
+        Stores the value, unless the cache has been invalidated since
+        the given `generation`, in which case it may already be stale.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: 'Hashable') -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: 'Iterable[str]') -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def info(self) -> CacheInfo:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-memory cache with a maximum size and an optional
+    time to live.
+    """
+
+    def __init__(
+        self,
+        name:    str,
+        maxsize: int = 128,
+        ttl:     float | None = None
+    ):
+        assert maxsize > 0
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = self.misses = self.evictions = 0
+        self._generation = 0
+        self._lock = Lock()
+        self._entries: 'OrderedDict[Hashable, _CacheEntry]' = OrderedDict()
+        self._tags: 'dict[str, set[Hashable]]' = {}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: 'Hashable') -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.expires is None or entry.expires > monotonic()
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cache_requests.inc(cache=self.name, result='hit')
+                return entry.value
+
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            cache_requests.inc(cache=self.name, result='miss')
+            return _EMPTY
+
+    def set(
+        self,
+        key:        'Hashable',
+        value:      Any,
+        tags:       'Iterable[str]' = (),
+        generation: int | None = None
+    ) -> None:
+
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        entry = _CacheEntry(value, expires, frozenset(tags))
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                cache_evictions.inc(cache=self.name)
+
+    def _remove(self, key: 'Hashable') -> None:
+        # NOTE: Needs to be called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def delete(self, key: 'Hashable') -> None:
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, tags: 'Iterable[str]') -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.maxsize,
+                len(self._entries)
+            )
+
+
+class SQLiteStore:
+    """
+    A SQLite database in WAL mode which can be shared by all the worker
+    processes on the same host.
+
+    Entries are evicted oldest first once a cache exceeds its maximum
+    number of entries or the database exceeds `max_bytes`.
+
+    NOTE: Values are pickled, so the database file must only be writable
+          by the application itself.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100_000_000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = local()
+        with self.connection() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        # NOTE: Connections can't be shared between threads or
+        #       across a fork, so we open one per thread and process
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=5,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def enforce_max_bytes(self, conn: sqlite3.Connection) -> int:
+        (total,) = conn.execute('SELECT TOTAL(size) FROM entries').fetchone()
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        rows = conn.execute(
+            'SELECT namespace, key, size FROM entries ORDER BY stored'
+        ).fetchall()
+        for namespace, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            delete_entry(conn, namespace, key)
+            total -= size
+            evicted += 1
+        return evicted
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    stored REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_stored ON entries (namespace, stored);
+CREATE TABLE IF NOT EXISTS tags (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (namespace, tag, key)
+);
+CREATE INDEX IF NOT EXISTS tags_key ON tags (namespace, key);
+CREATE TABLE IF NOT EXISTS generations (
+    namespace TEXT NOT NULL PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+def delete_entry(conn: sqlite3.Connection, namespace: str, key: str) -> None:
+    conn.execute(
+        'DELETE FROM entries WHERE namespace = ? AND key = ?',
+        (namespace, key)
+    )
+    conn.execute(
+        'DELETE FROM tags WHERE namespace = ? AND key = ?',
+        (namespace, key)
+    )
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache backend which stores its entries in a :class:`SQLiteStore`,
+    so they are shared between all the worker processes.
+
+    Since all workers use the same database, invalidations published
+    by one of them apply to all of them.
+    """
+
+    def __init__(
+        self,
+        name:    str,
+        maxsize: int,
+        ttl:     float | None,
+        store:   SQLiteStore
+    ):
+        assert maxsize > 0
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def serialize_key(key: 'Hashable') -> str:
+        # NOTE: The key needs to be the same in every process, so we
+        #       can't use hash() which is randomized per process
+        return repr(key)
+
+    @property
+    def generation(self) -> int:
+        row = self.store.connection().execute(
+            'SELECT generation FROM generations WHERE namespace = ?',
+            (self.name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            'INSERT INTO generations (namespace, generation) VALUES (?, 1) '
+            'ON CONFLICT (namespace) '
+            'DO UPDATE SET generation = generation + 1',
+            (self.name,)
+        )
+
+    def get(self, key: 'Hashable') -> Any:
+        row = self.store.connection().execute(
+            'SELECT value FROM entries '
+            'WHERE namespace = ? AND key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.name, self.serialize_key(key), time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            cache_requests.inc(cache=self.name, result='miss')
+            return _EMPTY
+
+        self.hits += 1
+        cache_requests.inc(cache=self.name, result='hit')
+        return pickle.loads(row[0])  # nosec: B301
+
+    def set(
+        self,
+        key:        'Hashable',
+        value:      Any,
+        tags:       'Iterable[str]' = (),
+        generation: int | None = None
+    ) -> None:
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time()
+        expires = None if self.ttl is None else now + self.ttl
+        cache_key = self.serialize_key(key)
+        conn = self.store.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if generation is not None and generation != self.generation:
+                return
+
+            delete_entry(conn, self.name, cache_key)
+            conn.execute(
+                'INSERT INTO entries '
+                '(namespace, key, value, size, expires, stored) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.name, cache_key, data, len(data), expires, now)
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO tags (namespace, key, tag) '
+                'VALUES (?, ?, ?)',
+                [(self.name, cache_key, tag) for tag in set(tags)]
+            )
+
+            evicted = self.store.enforce_max_bytes(conn)
+            # expired entries are the first to go
+            conn.execute(
+                'DELETE FROM tags WHERE namespace = ? AND key IN ('
+                '  SELECT key FROM entries'
+                '  WHERE namespace = ? AND expires <= ?'
+                ')',
+                (self.name, self.name, now)
+            )
+            conn.execute(
+                'DELETE FROM entries WHERE namespace = ? AND expires <= ?',
+                (self.name, now)
+            )
+            (count,) = conn.execute(
+                'SELECT COUNT(*) FROM entries WHERE namespace = ?',
+                (self.name,)
+            ).fetchone()
+            if count > self.maxsize:
+                for (old_key,) in conn.execute(
+                    'SELECT key FROM entries WHERE namespace = ? '
+                    'ORDER BY stored LIMIT ?',
+                    (self.name, count - self.maxsize)
+                ).fetchall():
+                    delete_entry(conn, self.name, old_key)
+                    evicted += 1
+
+        if evicted:
+            self.evictions += evicted
+            cache_evictions.inc(evicted, cache=self.name)
+
+    def delete(self, key: 'Hashable') -> None:
+        conn = self.store.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            delete_entry(conn, self.name, self.serialize_key(key))
+
+    def invalidate_tags(self, tags: 'Iterable[str]') -> None:
+        tags = list(tags)
+        conn = self.store.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._bump_generation(conn)
+            for tag in tags:
+                keys = conn.execute(
+                    'SELECT key FROM tags WHERE namespace = ? AND tag = ?',
+                    (self.name, tag)
+                ).fetchall()
+                for (key,) in keys:
+                    delete_entry(conn, self.name, key)
+
+    def clear(self) -> None:
+        conn = self.store.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._bump_generation(conn)
+            conn.execute(
+                'DELETE FROM entries WHERE namespace = ?',
+                (self.name,)
+            )
+            conn.execute(
+                'DELETE FROM tags WHERE namespace = ?',
+                (self.name,)
+            )
+
+    def info(self) -> CacheInfo:
+        (count,) = self.store.connection().execute(
+            'SELECT COUNT(*) FROM entries WHERE namespace = ?',
+            (self.name,)
+        ).fetchone()
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.maxsize,
+            count
+        )
+
+
+_backend_factory: 'BackendFactory' = LRUCache
+_process_caches: dict[str, CacheBackend] = {}
+
+
+def set_backend_factory(factory: 'BackendFactory') -> None:
+    """
+    Replaces the backend of all the process caches, existing entries
+    are discarded.
+    """
+    global _backend_factory
+    _backend_factory = factory
+    for name, cache in list(_process_caches.items()):
+        _process_caches[name] = factory(name, cache.maxsize, cache.ttl)
+
+
+def process_cache(
+    maxsize:     int = 128,
+    ttl:         float | None = None,
+    key:         'Callable[..., Hashable] | None' = None,
+    tags:        'Callable[..., Iterable[str]] | Iterable[str]' = (),
+    result_tags: 'Callable[[Any], Iterable[str]] | None' = None,
+    bypass:      'Callable[..., bool] | None' = None
+) -> 'Callable[[Callable[_P, _T]], Callable[_P, _T]]':
+    """
+    Caches results across requests.
+
+    The cache holds at most `maxsize` entries and evicts the least
+    recently used one when it is full. With `ttl` entries expire after
+    the given number of seconds.
+
+    By default the arguments are used as the key, they need to be
+    hashable. A custom `key` function receives the same arguments as
+    the decorated function.
+
+    `tags` may be a static list of tags or a function which receives the
+    same arguments as the decorated function. All the entries with a
+    given tag can be invalidated with :func:`invalidate_tags`. Tags which
+    depend on the result can be added through `result_tags`.
+
+    If `bypass` returns `True` for the given arguments the cache is
+    neither read nor written, e.g. because the current transaction
+    contains uncommitted changes.
+
+    By default the entries are kept in memory, see :func:`includeme`
+    for sharing them between processes.
+
+    NOTE: The decorated function is called without holding the lock, so
+          concurrent misses for the same key may call it more than once.
+          Results computed while an invalidation took place are returned
+          but not stored, since they may already be stale.
+    """
+
+    def decorating_function(
+        user_function: 'Callable[_P, _T]'
+    ) -> 'Callable[_P, _T]':
+
+        name = (
+            f'process:{user_function.__module__}.'
+            f'{user_function.__qualname__}'
+        )
+        _process_caches[name] = _backend_factory(name, maxsize, ttl)
+
+        def make_key(*args: Any, **kwds: Any) -> 'Hashable':
+            if key is not None:
+                return key(*args, **kwds)
+            return (args, frozenset(kwds.items()))
+
+        @wraps(user_function)
+        def wrapper(*args: '_P.args', **kwds: '_P.kwargs') -> _T:
+            if bypass is not None and bypass(*args, **kwds):
+                return user_function(*args, **kwds)
+
+            cache = _process_caches[name]
+            cache_key = make_key(*args, **kwds)
+            result = cache.get(cache_key)
+            if result is _EMPTY:
+                generation = cache.generation
+                result = user_function(*args, **kwds)
+                entry_tags = set(
+                    tags(*args, **kwds) if callable(tags) else tags
+                )
+                if result_tags is not None:
+                    entry_tags.update(result_tags(result))
+                cache.set(cache_key, result, entry_tags, generation)
+            return result
+
+        def invalidate(*args: '_P.args', **kwds: '_P.kwargs') -> None:
+            _process_caches[name].delete(make_key(*args, **kwds))
+
+        def cache_info() -> CacheInfo:
+            return _process_caches[name].info()
+
+        def cache_clear() -> None:
+            _process_caches[name].clear()
+
+        wrapper.cache_info = cache_info  # type:ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type:ignore[attr-defined]
+        wrapper.invalidate = invalidate  # type:ignore[attr-defined]
+        return wrapper
+
+    return decorating_function
+
+
+def stream_cache(
+    maxsize: int = 128,
+    ttl:     float | None = None,
+    key:     'Callable[..., Hashable] | None' = None,
+    tags:    'Callable[..., Iterable[str]] | Iterable[str]' = ()
+) -> 'Callable[[Callable[_P, Iterator[_T]]], Callable[_P, Iterator[_T]]]':
+    """
+    Caches the items yielded by a generator function across requests,
+    see :func:`process_cache` for the arguments.
+
+    On a miss the items are passed on as soon as they are generated and
+    only stored once the generator is exhausted, so streams which fail
+    or are abandoned by the client are never cached. A hit replays the
+    stored items.
+    """
+
+    def decorating_function(
+        user_function: 'Callable[_P, Iterator[_T]]'
+    ) -> 'Callable[_P, Iterator[_T]]':
+
+        name = (
+            f'process:{user_function.__module__}.'
+            f'{user_function.__qualname__}'
+        )
+        _process_caches[name] = _backend_factory(name, maxsize, ttl)
+
+        def make_key(*args: Any, **kwds: Any) -> 'Hashable':
+            if key is not None:
+                return key(*args, **kwds)
+            return (args, frozenset(kwds.items()))
+
+        @wraps(user_function)
+        def wrapper(*args: '_P.args', **kwds: '_P.kwargs') -> 'Iterator[_T]':
+            cache = _process_caches[name]
+            cache_key = make_key(*args, **kwds)
+            items = cache.get(cache_key)
+            if items is not _EMPTY:
+                yield from items
+                return
+
+            generation = cache.generation
+            items = []
+            for item in user_function(*args, **kwds):
+                items.append(item)
+                yield item
+
+            entry_tags = tags(*args, **kwds) if callable(tags) else tags
+            cache.set(cache_key, tuple(items), entry_tags, generation)
+
+        def invalidate(*args: '_P.args', **kwds: '_P.kwargs') -> None:
+            _process_caches[name].delete(make_key(*args, **kwds))
+
+        def cache_info() -> CacheInfo:
+            return _process_caches[name].info()
+
+        def cache_clear() -> None:
+            _process_caches[name].clear()
+
+        wrapper.cache_info = cache_info  # type:ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type:ignore[attr-defined]
+        wrapper.invalidate = invalidate  # type:ignore[attr-defined]
+        return wrapper
+
+    return decorating_function
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Invalidates all the entries with any of the given tags in all the
+    process caches.
+    """
+    for cache in list(_process_caches.values()):
+        cache.invalidate_tags(tags)
+
+
+_subscribers: 'list[Callable[[frozenset[str]], None]]' = []
+
+
+def subscribe(subscriber: 'Callable[[frozenset[str]], None]') -> None:
+    """
+    Registers a function which gets called with the tags that should be
+    invalidated, whenever they are published.
+    """
+    if subscriber not in _subscribers:
+        _subscribers.append(subscriber)
+
+
+def unsubscribe(subscriber: 'Callable[[frozenset[str]], None]') -> None:
+    if subscriber in _subscribers:
+        _subscribers.remove(subscriber)
+
+
+def publish(tags: frozenset[str]) -> None:
+    """
+    Invalidates the given tags in all the subscribed cache layers.
+
+    This is called by :mod:`riskmatrix.orm.invalidation` once a
+    transaction has been committed.
+    """
+    for subscriber in list(_subscribers):
+        subscriber(tags)
+
+
+def _invalidate_process_caches(tags: frozenset[str]) -> None:
+    invalidate_tags(*tags)
+
+
+subscribe(_invalidate_process_caches)
+
+
+def includeme(config: 'Configurator') -> None:
+    """
+    Configures the backend for the process caches.
+
+    With ``cache.backend = sqlite`` the entries are stored in the SQLite
+    database at ``cache.path``, which is shared by all the processes on
+    the same host, the database is limited to ``cache.max_bytes``.
+    """
+    settings = config.get_settings()
+    backend = settings.get('cache.backend', 'memory')
+    if backend == 'memory':
+        set_backend_factory(LRUCache)
+    elif backend == 'sqlite':
+        store = SQLiteStore(
+            settings['cache.path'],
+            int(settings.get('cache.max_bytes', 100_000_000))
+        )
+        set_backend_factory(partial(SQLiteCache, store=store))
+    else:
+        raise ValueError(f'Unknown cache backend "{backend}"')
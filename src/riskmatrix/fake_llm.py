@@ -0,0 +1,132 @@
+"""
+Local stand-in for the LLM providers.
+
+Streams canned or template-generated markdown with a configurable latency
+and token rate, so the generation endpoints can be exercised and load
+tested without network access. It is selected through the settings::
+
+    llm.provider = fake
+    llm.fake.latency = 0.5
+    llm.fake.tokens_per_second = 50
+
+By default every catalog gets `llm.fake.risks` risks which are derived
+from the prompt, so the same prompt always produces the same output.
+`llm.fake.response` points to a markdown file which is streamed instead.
+"""
+import hashlib
+import re
+import time
+
+
+from typing import Any, NamedTuple, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from collections.abc import Sequence
+
+
+FAKE_MODEL = 'fake'
+
+SUBJECTS = (
+    'Backups', 'Access rights', 'Firewall rules', 'Customer data',
+    'Server room', 'Deployments', 'Passwords', 'Suppliers', 'Laptops',
+    'Log files', 'Certificates', 'Payments',
+)
+STATES = (
+    'are not tested regularly',
+    'are managed by a single person',
+    'are not documented',
+    'are shared with external parties',
+    'are not monitored',
+    'depend on an outdated system',
+    'are not reviewed after changes',
+    'can be accessed from the internet',
+)
+
+CATALOG_NAME = re.compile(r'Current Risk-Catalog:\s*- name:\s*(.*)')
+TOKEN = re.compile(r'\S+\s*|\s+')
+
+
+class FakeChunk(NamedTuple):
+    content: str
+
+
+class FakeChatModel:
+    """
+    Implements the part of the chat model interface we rely on, i.e.
+    streaming the response to a list of messages.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency:           float = 0.0,
+        tokens_per_second: float = 0.0,
+        risks:             int = 10,
+        response:          str | None = None
+    ) -> None:
+
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.risks = risks
+        self.response = response
+
+    def generate(self, prompt: str) -> str:
+        if self.response is not None:
+            return self.response
+
+        match = CATALOG_NAME.search(prompt)
+        catalog = match.group(1).strip() if match else 'Risks'
+        seed = hashlib.sha256(prompt.encode('utf-8')).digest()
+        lines = [f'#### {catalog}']
+        for index in range(self.risks):
+            subject = SUBJECTS[(seed[index % 32] + index) % len(SUBJECTS)]
+            state = STATES[(seed[-index % 32] + index) % len(STATES)]
+            lines.append(
+                f'- [ ] __{subject} {index + 1}__: '
+                f'{subject} of {catalog} {state}.'
+            )
+        return '\n'.join(lines) + '\n'
+
+    def stream(
+        self,
+        messages: 'Sequence[Any]',
+        config:   dict[str, Any] | None = None
+    ) -> 'Iterator[FakeChunk]':
+
+        # NOTE: Both langchain messages and plain strings are accepted
+        prompt = '\n'.join(
+            str(getattr(message, 'content', message))
+            for message in messages
+        )
+        text = self.generate(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for index, token in enumerate(TOKEN.findall(text)):
+            if delay and index:
+                time.sleep(delay)
+            yield FakeChunk(token)
+
+
+class NoopCallbackHandler:
+    """ Stands in for the Langfuse callback handler, it traces nothing. """
+
+    def flush(self) -> None:
+        pass
+
+
+def fake_client(settings: dict[str, Any]) -> FakeChatModel:
+    response = None
+    if path := settings.get('llm.fake.response'):
+        with open(path, encoding='utf-8') as fp:
+            response = fp.read()
+
+    return FakeChatModel(
+        latency=float(settings.get('llm.fake.latency', 0.0)),
+        tokens_per_second=float(
+            settings.get('llm.fake.tokens_per_second', 0.0)
+        ),
+        risks=int(settings.get('llm.fake.risks', 10)),
+        response=response
+    )
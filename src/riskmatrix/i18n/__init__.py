@@ -1,9 +1,18 @@
+from pyramid.events import ApplicationCreated
+
+from .core import load_localizers
 from .core import pluralize
+from .core import request_localizer
 from .core import translate
 from .locale_negotiator import LocaleNegotiator
 from .translation_string import TranslationStringFactory
 
 
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pyramid.config import Configurator
+
+
 _ = TranslationStringFactory('riskmatrix')
 
 __all__ = (
@@ -12,3 +21,8 @@ __all__ = (
     'pluralize',
     'translate'
 )
+
+
+def includeme(config: 'Configurator') -> None:
+    config.add_request_method(request_localizer, 'localizer', reify=True)
+    config.add_subscriber(load_localizers, ApplicationCreated)
@@ -0,0 +1,112 @@
+"""
+Compiles the gettext catalogs (.po) into their binary form (.mo).
+
+The catalogs are compiled when building the package, see `setup.py`.
+Catalogs without a compiled counterpart, e.g. in a checkout where the
+build step didn't run, are compiled in memory once they are needed.
+
+NOTE: This module is also loaded by `setup.py` directly, so it must not
+      import anything besides the standard library and Babel.
+"""
+from babel.messages.mofile import write_mo
+from babel.messages.pofile import read_po
+from babel.support import Translations
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from babel.messages.catalog import Catalog
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+
+LOCALE_DIR = Path(__file__).parent.parent / 'locale'
+DOMAIN = 'riskmatrix'
+
+
+def read_catalog(path: Path) -> 'Catalog':
+    # NOTE: Babel < 2.14 fails on the empty Language header that
+    #       pot-create generates for the template
+    data = path.read_bytes().replace(b'"Language: \\n"\n', b'')
+    return read_po(BytesIO(data))
+
+
+def compile_catalog(path: Path) -> bytes:
+    output = BytesIO()
+    write_mo(output, read_catalog(path))
+    return output.getvalue()
+
+
+def compile_catalogs(
+    locale_dir: Path = LOCALE_DIR,
+    force:      bool = False
+) -> list[Path]:
+    """
+    Writes a .mo file for every .po file which doesn't have an up to
+    date one yet and returns the written paths.
+    """
+    compiled = []
+    for po_path in sorted(locale_dir.glob('*/LC_MESSAGES/*.po')):
+        mo_path = po_path.with_suffix('.mo')
+        if (
+            not force
+            and mo_path.exists()
+            and mo_path.stat().st_mtime >= po_path.stat().st_mtime
+        ):
+            continue
+
+        mo_path.write_bytes(compile_catalog(po_path))
+        compiled.append(mo_path)
+    return compiled
+
+
+@lru_cache(maxsize=32)
+def compiled_in_memory(path: Path, mtime: float) -> bytes:
+    return compile_catalog(path)
+
+
+def uncompiled_translations(
+    locales:                 'Iterable[str]',
+    translation_directories: 'Iterable[str]'
+) -> 'Iterator[Translations]':
+    """
+    Yields the translations of the catalogs without a .mo file, the same
+    way pyramid would load them if they had been compiled.
+    """
+    for directory in translation_directories:
+        for locale in locales:
+            messages_dir = Path(directory) / locale / 'LC_MESSAGES'
+            for po_path in sorted(messages_dir.glob('*.po')):
+                if po_path.with_suffix('.mo').exists():
+                    continue
+
+                data = compiled_in_memory(po_path, po_path.stat().st_mtime)
+                yield Translations(BytesIO(data), po_path.stem)
+
+
+def msgids(catalog: 'Catalog') -> set[str]:
+    # NOTE: The id of a pluralized message is a tuple, we only compare
+    #       the singular form
+    return {
+        message.id if isinstance(message.id, str) else message.id[0]
+        for message in catalog
+        if message.id
+    }
+
+
+def missing_msgids(
+    locale_dir: Path = LOCALE_DIR,
+    domain:     str = DOMAIN
+) -> dict[str, set[str]]:
+    """
+    Returns the msgids of the template which are missing in the catalog
+    of each language.
+    """
+    template = msgids(read_catalog(locale_dir / f'{domain}.pot'))
+    return {
+        po_path.parent.parent.name: template - msgids(read_catalog(po_path))
+        for po_path in sorted(locale_dir.glob(f'*/LC_MESSAGES/{domain}.po'))
+    }
@@ -1,7 +1,125 @@
-from pyramid.i18n import make_localizer
+"""
+Localizers shared by all the requests.
+
+The localizers for the available languages are created once the
+application has been created, so the catalogs are loaded at startup
+rather than on first use. They are stored as :class:`ILocalizer`
+utilities, the same way pyramid stores the localizers it creates for
+`request.localizer`, so requests use them as well.
+"""
+from functools import lru_cache
+from pyramid.i18n import Localizer as BaseLocalizer
+from pyramid.i18n import make_localizer as make_base_localizer
+from pyramid.interfaces import ILocalizer
 from pyramid.interfaces import ITranslationDirectories
 from pyramid.threadlocal import get_current_registry
 from pyramid.threadlocal import get_current_request
+from threading import Lock
+from translationstring import Translator
+
+from .catalogs import uncompiled_translations
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from pyramid.events import ApplicationCreated
+    from pyramid.interfaces import IRequest
+    from pyramid.registry import Registry
+
+
+_localizer_lock = Lock()
+
+
+@lru_cache(maxsize=4096)
+def memoized_translate(
+    localizer: 'Localizer',
+    term:      str,
+    domain:    str | None,
+    # NOTE: The remaining arguments are only part of the key
+    context:   str | None,
+    default:   str | None,
+    term_type: type[str]
+) -> str:
+    return BaseLocalizer.translate(localizer, term, domain=domain)
+
+
+class Localizer(BaseLocalizer):
+    """
+    Localizer which memoizes translations of terms without a mapping.
+    """
+
+    def __init__(self, locale_name: str, translations: Any):
+        super().__init__(locale_name, translations)
+        self.translator = Translator(translations)
+
+    def translate(
+        self,
+        tstring: str,
+        domain:  str | None = None,
+        mapping: dict[str, Any] | None = None
+    ) -> str:
+
+        if mapping or getattr(tstring, 'mapping', None):
+            return super().translate(tstring, domain=domain, mapping=mapping)
+
+        return memoized_translate(
+            self,
+            tstring,
+            domain or getattr(tstring, 'domain', None),
+            getattr(tstring, 'context', None),
+            getattr(tstring, 'default', None),
+            type(tstring)
+        )
+
+
+def make_localizer(language: str, registry: 'Registry') -> Localizer:
+    tdirs: list[str]
+    tdirs = registry.queryUtility(ITranslationDirectories, default=[])
+    translations = make_base_localizer(language, tdirs).translations
+
+    locales = [language]
+    if '_' in language:
+        locales.insert(0, language.split('_')[0])
+    for catalog in uncompiled_translations(locales, tdirs):
+        translations.add(catalog)
+    return Localizer(language, translations)
+
+
+def get_localizer(
+    language: str,
+    registry: 'Registry | None' = None
+) -> BaseLocalizer:
+
+    if registry is None:
+        registry = get_current_registry()
+
+    localizer = registry.queryUtility(ILocalizer, name=language)
+    if localizer is None:
+        with _localizer_lock:
+            localizer = registry.queryUtility(ILocalizer, name=language)
+            if localizer is None:
+                localizer = make_localizer(language, registry)
+                registry.registerUtility(localizer, ILocalizer, name=language)
+    return localizer
+
+
+def request_localizer(request: 'IRequest') -> BaseLocalizer:
+    return get_localizer(request.locale_name, request.registry)
+
+
+def load_localizers(event: 'ApplicationCreated') -> None:
+    registry = event.app.registry
+    settings = registry.settings or {}
+    languages = set(settings.get('pyramid.available_languages', '').split())
+    languages.add(settings.get('pyramid.default_locale_name', 'en'))
+    for language in languages:
+        # NOTE: Replaces localizers which may have been created while
+        #       the translation directories were still being added
+        registry.registerUtility(
+            make_localizer(language, registry),
+            ILocalizer,
+            name=language
+        )
 
 
 def translate(
@@ -17,16 +135,7 @@ def translate(
             return term.interpolate()
         return term
     else:
-        reg = get_current_registry()
-        localizer_name = f'localizer_{language}'
-        localizer = getattr(reg, localizer_name, None)
-        if not localizer:
-            tdirs: list[str]
-            tdirs = reg.queryUtility(ITranslationDirectories, default=[])
-            localizer = make_localizer(language, tdirs)
-            setattr(reg, localizer_name, localizer)
-
-        return localizer.translate(term)
+        return get_localizer(language).translate(term)
 
 
 def pluralize(
@@ -48,13 +157,4 @@ def pluralize(
             return term.interpolate()
         return term
     else:
-        reg = get_current_registry()
-        localizer_name = f'localizer_{language}'
-        localizer = getattr(reg, localizer_name, None)
-        if not localizer:
-            tdirs: list[str]
-            tdirs = reg.queryUtility(ITranslationDirectories, default=[])
-            localizer = make_localizer(language, tdirs)
-            setattr(reg, localizer_name, localizer)
-
-        return localizer.pluralize(singular, plural, n)
+        return get_localizer(language).pluralize(singular, plural, n)
@@ -24,15 +24,19 @@ class LocaleNegotiator:
         return available[0] if available else 'en'
 
     def __call__(self, request: 'IRequest') -> str:
+        # NOTE: Importing this at module level causes a circular import
+        #       through the models and the security policy
+        from riskmatrix.security import authenticated_identity
+
         available = self.available_languages(request)
         default = self.default_language(request)
 
         locale: str | None
 
         # 1. Get language from user organization
-        user = request.user
-        if user:
-            locale = user.organization.locale
+        identity = authenticated_identity(request)
+        if identity:
+            locale = identity.locale
             if locale in available:
                 return locale
 
@@ -0,0 +1,31 @@
+from .queries import add_query_observer
+from .queries import count_queries
+from .queries import QueryStats
+from .queries import remove_query_observer
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pyramid.config import Configurator
+
+
+def includeme(config: 'Configurator') -> None:
+    """
+    Activates the instrumentation that has been enabled in the settings.
+
+    Activate this setup using ``config.include('riskmatrix.instrumentation')``.
+
+    """
+    config.include('.queries')
+    config.include('.metrics')
+    config.include('.profiler')
+    config.include('.slow_queries')
+
+
+__all__ = (
+    'add_query_observer',
+    'count_queries',
+    'includeme',
+    'QueryStats',
+    'remove_query_observer',
+)
@@ -0,0 +1,379 @@
+"""
+Minimal metrics collection with an exporter for the Prometheus text format.
+
+NOTE: Metrics are collected per process, so with multiple workers each
+      worker needs to be scraped individually.
+"""
+import secrets
+from bisect import bisect_left
+from math import inf
+from pyramid.httpexceptions import HTTPForbidden
+from pyramid.response import Response
+from pyramid.security import NO_PERMISSION_REQUIRED
+from pyramid.tweens import INGRESS
+from threading import Lock
+from time import perf_counter
+
+from .queries import add_query_observer
+
+
+from typing import Any, ClassVar, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterator
+    from collections.abc import Sequence
+    from pyramid.config import Configurator
+    from pyramid.interfaces import IRequest
+    from pyramid.interfaces import IResponse
+    from pyramid.registry import Registry
+    from sqlalchemy.engine import Engine
+
+    Handler = Callable[[IRequest], IResponse]
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def format_value(value: float) -> str:
+    if value == inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: 'Sequence[tuple[str, str]]') -> str:
+    if not labels:
+        return ''
+
+    def escape(value: str) -> str:
+        return (
+            value.replace('\\', r'\\')
+                 .replace('\n', r'\n')
+                 .replace('"', r'\"')
+        )
+
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels) + '}'
+
+
+class Metric:
+
+    type: ClassVar[str]
+
+    name:          str
+    documentation: str
+    labelnames:    tuple[str, ...]
+
+    def __init__(
+        self,
+        name:          str,
+        documentation: str,
+        labelnames:    'Sequence[str]' = (),
+        registry:      'MetricsRegistry | None' = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+        (registry or default_registry).register(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects the labels: {", ".join(self.labelnames)}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> list[tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> 'Iterator[str]':
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def labels(self, **labels: str) -> '_BoundCounter':
+        """
+        Returns the counter for the given labels, this avoids validating
+        the labels on every increment on hot paths.
+        """
+        return _BoundCounter(self, self._key(labels))
+
+    def samples(self) -> 'Iterator[str]':
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = format_labels(self._labels(key))
+            yield f'{self.name}{labels} {format_value(value)}'
+
+
+class _BoundCounter:
+
+    __slots__ = ('counter', 'key')
+
+    def __init__(self, counter: Counter, key: tuple[str, ...]):
+        self.counter = counter
+        self.key = key
+
+    def inc(self, amount: float = 1) -> None:
+        counter = self.counter
+        with counter._lock:
+            counter._values[self.key] = (
+                counter._values.get(self.key, 0) + amount
+            )
+
+
+class Histogram(Metric):
+
+    type = 'histogram'
+
+    buckets: tuple[float, ...]
+
+    def __init__(
+        self,
+        name:          str,
+        documentation: str,
+        labelnames:    'Sequence[str]' = (),
+        buckets:       'Sequence[float]' = DEFAULT_BUCKETS,
+        registry:      'MetricsRegistry | None' = None
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        # counts are not cumulative internally, that happens on export
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # bucket counts followed by the sum
+                entry = self._values[key] = [0] * (len(self.buckets) + 1)
+                entry.append(0.0)
+            entry[index] += 1
+            entry[-1] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[:-1]) if entry else 0
+
+    def sum(self, **labels: str) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[-1] if entry else 0.0
+
+    def time(self, **labels: str) -> '_Timer':
+        """
+        Context manager which observes the duration of its body.
+        """
+        return _Timer(self, labels)
+
+    def samples(self) -> 'Iterator[str]':
+        with self._lock:
+            values = sorted(
+                (key, list(entry)) for key, entry in self._values.items()
+            )
+        for key, entry in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, inf), entry[:-1]):
+                cumulative += count
+                bucket_labels = format_labels(
+                    [*labels, ('le', format_value(bound))]
+                )
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield (
+                f'{self.name}_sum{format_labels(labels)} '
+                f'{format_value(entry[-1])}'
+            )
+            yield f'{self.name}_count{format_labels(labels)} {cumulative}'
+
+
+class _Timer:
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f'Duplicate metric "{metric.name}"')
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        return '\n'.join(
+            metric.render() for metric in self._metrics.values()
+        ) + '\n'
+
+
+default_registry = MetricsRegistry()
+
+request_duration = Histogram(
+    'riskmatrix_request_duration_seconds',
+    'Time spent handling a request.',
+    ('route',)
+)
+db_pool_checkout_duration = Histogram(
+    'riskmatrix_db_pool_checkout_seconds',
+    'Time spent waiting for a connection from the pool.',
+)
+db_query_duration = Histogram(
+    'riskmatrix_db_query_duration_seconds',
+    'Time spent executing a single statement.',
+)
+cache_requests = Counter(
+    'riskmatrix_cache_requests_total',
+    'Number of cache lookups.',
+    ('cache', 'result')
+)
+cache_evictions = Counter(
+    'riskmatrix_cache_evictions_total',
+    'Number of entries evicted from a size limited cache.',
+    ('cache',)
+)
+mail_send_duration = Histogram(
+    'riskmatrix_mail_send_duration_seconds',
+    'Time spent sending mails through the mailer API.',
+    ('endpoint',)
+)
+llm_stream_duration = Histogram(
+    'riskmatrix_llm_stream_duration_seconds',
+    'Time spent streaming a response from the LLM provider.',
+    ('endpoint',),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+
+
+def observe_query(
+    conn:       Any,
+    statement:  str,
+    parameters: Any,
+    duration:   float,
+    context:    Any
+) -> None:
+    db_query_duration.observe(duration)
+
+
+def instrument_pool(engine: 'Engine') -> None:
+    """
+    Observes how long it takes to check out a connection from the pool.
+    """
+    pool = engine.pool
+    if getattr(pool, '_riskmatrix_instrumented', False):
+        return
+
+    # NOTE: There is no pool event that fires before the checkout, so
+    #       we have to wrap the method that is used by the engine.
+    connect = pool.connect
+
+    def timed_connect() -> Any:
+        with db_pool_checkout_duration.time():
+            return connect()
+
+    pool.connect = timed_connect  # type:ignore[method-assign]
+    pool._riskmatrix_instrumented = True  # type:ignore[attr-defined]
+
+
+def metrics_tween_factory(
+    handler:  'Handler',
+    registry: 'Registry'
+) -> 'Handler':
+
+    def metrics_tween(request: 'IRequest') -> 'IResponse':
+        start = perf_counter()
+        try:
+            return handler(request)
+        finally:
+            route = getattr(request.matched_route, 'name', None) or ''
+            request_duration.observe(perf_counter() - start, route=route)
+
+    return metrics_tween
+
+
+def metrics_view(request: 'IRequest') -> Response:
+    token = request.registry.settings.get('metrics.token', '')
+    authorization = request.headers.get('Authorization', '')
+    if not token or not secrets.compare_digest(
+        authorization.encode('utf-8'),
+        f'Bearer {token}'.encode('utf-8')
+    ):
+        raise HTTPForbidden()
+
+    response = Response(
+        text=default_registry.render(),
+        content_type='text/plain; version=0.0.4',
+        charset='utf-8'
+    )
+    response.cache_control = 'no-store'
+    return response
+
+
+def includeme(config: 'Configurator') -> None:
+    settings = config.get_settings()
+    if not settings.get('metrics.token'):
+        return
+
+    add_query_observer(observe_query)
+
+    session_factory = config.registry.get('dbsession_factory')
+    if session_factory is not None and 'bind' in session_factory.kw:
+        instrument_pool(session_factory.kw['bind'])
+
+    config.add_tween(
+        'riskmatrix.instrumentation.metrics.metrics_tween_factory',
+        under=INGRESS
+    )
+    config.add_route('metrics', settings.get('metrics.path', '/metrics'))
+    config.add_view(
+        metrics_view,
+        route_name='metrics',
+        request_method='GET',
+        permission=NO_PERMISSION_REQUIRED,
+        require_csrf=False
+    )
@@ -0,0 +1,145 @@
+"""
+Opt-in profiling of individual requests using cProfile.
+
+The resulting `.prof` files can be inspected using `pstats` or tools
+like `snakeviz`.
+"""
+import cProfile
+import logging
+import os
+import random
+import secrets
+from datetime import datetime
+from pathlib import Path
+from pyramid.interfaces import IRoutesMapper
+from pyramid.settings import aslist
+from pyramid.tweens import INGRESS
+from threading import Lock
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pyramid.config import Configurator
+    from pyramid.interfaces import IRequest
+    from pyramid.interfaces import IResponse
+    from pyramid.registry import Registry
+
+    Handler = Callable[[IRequest], IResponse]
+
+
+logger = logging.getLogger('riskmatrix.profiler')
+
+# NOTE: Only one profiler can be active at a time, so we never
+#       profile concurrent requests and skip them instead.
+_profiler_lock = Lock()
+
+
+class ProfilerSettings:
+
+    directory:   Path
+    routes:      frozenset[str]
+    users:       frozenset[str]
+    sample_rate: float
+    keep:        int
+    token:       str | None
+
+    def __init__(self, settings: dict[str, str]):
+        self.directory = Path(settings['profiler.directory'])
+        self.routes = frozenset(aslist(settings.get('profiler.routes', '')))
+        self.users = frozenset(aslist(settings.get('profiler.users', '')))
+        self.sample_rate = float(settings.get('profiler.sample_rate', 0))
+        self.keep = int(settings.get('profiler.keep', 100))
+        self.token = settings.get('profiler.token') or None
+
+
+def route_name(request: 'IRequest') -> str | None:
+    # NOTE: Tweens run before the router, so the route hasn't been
+    #       matched yet, we need to match it ourselves
+    mapper = request.registry.queryUtility(IRoutesMapper)
+    if mapper is None:
+        return None
+    route = mapper(request)['route']
+    return route.name if route is not None else None
+
+
+def should_profile(request: 'IRequest', settings: ProfilerSettings) -> bool:
+    if settings.token is not None:
+        token = request.headers.get('X-Profile', '')
+        if token and secrets.compare_digest(
+            token.encode('utf-8'),
+            settings.token.encode('utf-8')
+        ):
+            return True
+
+    if settings.routes and route_name(request) in settings.routes:
+        return True
+
+    if settings.users and request.authenticated_userid in settings.users:
+        return True
+
+    return random.random() < settings.sample_rate  # nosec: B311
+
+
+def rotate_profiles(directory: Path, keep: int) -> None:
+    profiles = sorted(
+        directory.glob('*.prof'),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for path in profiles[keep:]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # another worker already removed it
+            pass
+
+
+def profile_filename(request: 'IRequest') -> str:
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    name = getattr(request.matched_route, 'name', None) or 'none'
+    return f'{timestamp}-{os.getpid()}-{name}.prof'
+
+
+def profiler_tween_factory(
+    handler:  'Handler',
+    registry: 'Registry'
+) -> 'Handler':
+
+    settings = ProfilerSettings(registry.settings)
+    settings.directory.mkdir(parents=True, exist_ok=True)
+
+    def profiler_tween(request: 'IRequest') -> 'IResponse':
+        if not should_profile(request, settings):
+            return handler(request)
+
+        if not _profiler_lock.acquire(blocking=False):
+            logger.debug(f'Skipped profiling {request.path}, profiler busy')
+            return handler(request)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                return handler(request)
+            finally:
+                profile.disable()
+        finally:
+            _profiler_lock.release()
+            path = settings.directory / profile_filename(request)
+            profile.dump_stats(path)
+            logger.info(f'Stored profile for {request.path} in {path}')
+            rotate_profiles(settings.directory, settings.keep)
+
+    return profiler_tween
+
+
+def includeme(config: 'Configurator') -> None:
+    settings = config.get_settings()
+    if not settings.get('profiler.directory'):
+        return
+
+    config.add_tween(
+        'riskmatrix.instrumentation.profiler.profiler_tween_factory',
+        under=INGRESS
+    )
@@ -0,0 +1,233 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pyramid.settings import asbool
+from pyramid.tweens import INGRESS
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from time import perf_counter
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterator
+    from pyramid.config import Configurator
+    from pyramid.interfaces import IRequest
+    from pyramid.interfaces import IResponse
+    from pyramid.registry import Registry
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.engine.interfaces import DBAPICursor
+    from sqlalchemy.engine.interfaces import ExecutionContext
+    from typing_extensions import TypeAlias
+
+    Handler: TypeAlias = Callable[[IRequest], IResponse]
+    QueryObserver: TypeAlias = Callable[
+        [Connection, str, Any, float, 'ExecutionContext | None'],
+        None
+    ]
+
+
+logger = logging.getLogger('riskmatrix.queries')
+
+_whitespace_regex = re.compile(r'\s+')
+# NOTE: Expanding IN parameters produces a varying number of placeholders
+#       so we collapse them, otherwise `IN (?, ?)` and `IN (?, ?, ?)`
+#       would be reported as two different statements.
+_placeholder_list_regex = re.compile(
+    r'\(\s*(\?|%\(\w+\)s|:\w+)(\s*,\s*(\?|%\(\w+\)s|:\w+))+\s*\)'
+)
+_numbered_param_regex = re.compile(r'(%\(|:)(\w+?)_\d+(\)s)?')
+
+_current_stats: ContextVar['QueryStats | None'] = ContextVar(
+    'riskmatrix_query_stats',
+    default=None
+)
+_query_observers: list['QueryObserver'] = []
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalizes a SQL statement, so that statements which only differ
+    in their bound parameters end up with the same shape.
+    """
+    shape = _whitespace_regex.sub(' ', statement).strip()
+    shape = _placeholder_list_regex.sub('(?)', shape)
+    return _numbered_param_regex.sub(r'\1\2\3', shape)
+
+
+class QueryStats:
+    """
+    Collects the executed statements and the time spent in the database.
+    """
+
+    __slots__ = ('count', 'duration', 'shapes')
+
+    count:    int
+    duration: float
+    shapes:   Counter[str]
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Returns the statements that have been executed at least
+        `threshold` times, these are likely N+1 query candidates.
+        """
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def _before_cursor_execute(
+    conn:        'Connection',
+    cursor:      'DBAPICursor',
+    statement:   str,
+    parameters:  Any,
+    context:     'ExecutionContext | None',
+    executemany: bool
+) -> None:
+
+    conn.info.setdefault('query_start_time', []).append(perf_counter())
+
+
+def _after_cursor_execute(
+    conn:        'Connection',
+    cursor:      'DBAPICursor',
+    statement:   str,
+    parameters:  Any,
+    context:     'ExecutionContext | None',
+    executemany: bool
+) -> None:
+
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+
+    duration = perf_counter() - start_times.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    for observer in _query_observers:
+        observer(conn, statement, parameters, duration, context)
+
+
+def _handle_error(exception_context: Any) -> None:
+    # after_cursor_execute will not be called for failed statements
+    # so we need to clean up after ourselves
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start_time'):
+        conn.info['query_start_time'].pop()
+
+
+def instrument_queries() -> None:
+    """
+    Installs the engine event listeners which time every statement.
+
+    This is idempotent and applies to every engine.
+    """
+    if event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+
+
+def add_query_observer(observer: 'QueryObserver') -> None:
+    """
+    Registers a callback which is called after every statement with
+    the connection, statement, parameters and duration in seconds.
+    """
+    instrument_queries()
+    if observer not in _query_observers:
+        _query_observers.append(observer)
+
+
+def remove_query_observer(observer: 'QueryObserver') -> None:
+    if observer in _query_observers:
+        _query_observers.remove(observer)
+
+
+@contextmanager
+def count_queries() -> 'Iterator[QueryStats]':
+    """
+    Counts all the statements executed within the context.
+
+    Usage::
+
+        with count_queries() as stats:
+            do_something()
+
+        assert stats.count <= 3
+
+    """
+    instrument_queries()
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def query_counter_tween_factory(
+    handler:  'Handler',
+    registry: 'Registry'
+) -> 'Handler':
+
+    settings = registry.settings
+    threshold = int(settings.get('debug.query_counter.threshold', 5))
+
+    def query_counter_tween(request: 'IRequest') -> 'IResponse':
+        with count_queries() as stats:
+            response = handler(request)
+
+        duration = stats.duration * 1000
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Duration'] = f'{duration:.2f}ms'
+
+        route = getattr(request.matched_route, 'name', None)
+        logger.debug(
+            f'{request.method} {request.path} [{route}]: '
+            f'{stats.count} queries in {duration:.2f}ms'
+        )
+
+        if candidates := stats.repeated(threshold):
+            response.headers['X-Query-Repeated'] = str(len(candidates))
+            for shape, count in candidates:
+                logger.warning(
+                    f'Possible N+1 query in {request.method} {request.path} '
+                    f'[{route}]: executed {count} times: {shape}'
+                )
+
+        return response
+
+    return query_counter_tween
+
+
+def includeme(config: 'Configurator') -> None:
+    settings = config.get_settings()
+    if not asbool(settings.get('debug.query_counter', False)):
+        return
+
+    instrument_queries()
+    # we want to be the outermost tween, so we also count the
+    # statements that are emitted when pyramid_tm commits
+    config.add_tween(
+        'riskmatrix.instrumentation.queries.query_counter_tween_factory',
+        under=INGRESS
+    )
@@ -0,0 +1,161 @@
+import logging
+from logging.handlers import RotatingFileHandler
+from pyramid.settings import asbool
+from pyramid.threadlocal import get_current_request
+
+from .queries import add_query_observer
+from .queries import remove_query_observer
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from pyramid.config import Configurator
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.engine.interfaces import ExecutionContext
+
+
+logger = logging.getLogger('riskmatrix.slow_queries')
+
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+
+
+def parameter_shape(parameters: Any) -> str:
+    """
+    Describes the bound parameters without revealing their values.
+    """
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(
+            f'{key}: {type(value).__name__}'
+            for key, value in parameters.items()
+        ) + '}'
+    elif isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return f'{len(parameters)} x {parameter_shape(parameters[0])}'
+        return '(' + ', '.join(
+            type(value).__name__ for value in parameters
+        ) + ')'
+    return type(parameters).__name__
+
+
+def current_route() -> str | None:
+    request = get_current_request()
+    if request is None:
+        return None
+    return getattr(request.matched_route, 'name', None)
+
+
+def explain(conn: 'Connection', statement: str, parameters: Any) -> str:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return f'EXPLAIN is not supported for {conn.dialect.name}'
+
+    is_postgres = conn.dialect.name == 'postgresql'
+    # NOTE: We use the DBAPI cursor directly, so we don't end up
+    #       observing our own EXPLAIN statements.
+    cursor = conn.connection.cursor()
+    try:
+        if is_postgres:
+            # a failed statement would abort the surrounding transaction
+            cursor.execute('SAVEPOINT riskmatrix_explain')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as exception:
+            if is_postgres:
+                cursor.execute('ROLLBACK TO SAVEPOINT riskmatrix_explain')
+            return f'EXPLAIN failed: {exception}'
+        if is_postgres:
+            cursor.execute('RELEASE SAVEPOINT riskmatrix_explain')
+    finally:
+        cursor.close()
+
+    # postgres returns a single column, sqlite returns the detail last
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+class SlowQueryLogger:
+
+    threshold: float
+    explain:   bool
+
+    def __init__(self, threshold: float, explain: bool = False):
+        # the threshold is configured in milliseconds
+        self.threshold = threshold / 1000
+        self.explain = explain
+
+    def __call__(
+        self,
+        conn:       'Connection',
+        statement:  str,
+        parameters: Any,
+        duration:   float,
+        context:    'ExecutionContext | None'
+    ) -> None:
+
+        if duration < self.threshold:
+            return
+
+        message = (
+            f'Slow query ({duration * 1000:.2f}ms) '
+            f'[{current_route()}] '
+            f'parameters {parameter_shape(parameters)}: '
+            f'{statement}'
+        )
+
+        executemany = context is not None and context.executemany
+        keyword = statement.lstrip()[:6].upper()
+        if (
+            self.explain
+            and not executemany
+            and keyword.startswith(('SELECT', 'WITH'))
+        ):
+            message += '\n' + explain(conn, statement, parameters)
+
+        logger.warning(message)
+
+
+_handler: RotatingFileHandler | None = None
+_observer: SlowQueryLogger | None = None
+
+
+def includeme(config: 'Configurator') -> None:
+    global _handler, _observer
+
+    # NOTE: Creating the application again in the same process, e.g. in
+    #       tests or pshell, replaces the setup of the previous one, so
+    #       slow queries don't get logged more than once
+    if _handler is not None:
+        logger.removeHandler(_handler)
+        _handler.close()
+        _handler = None
+    if _observer is not None:
+        remove_query_observer(_observer)
+        _observer = None
+
+    settings = config.get_settings()
+    threshold = settings.get('slow_query.threshold')
+    if not threshold:
+        return
+
+    if log_file := settings.get('slow_query.log_file'):
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=int(settings.get('slow_query.log_max_bytes', 10_000_000)),
+            backupCount=int(settings.get('slow_query.log_backups', 5)),
+            encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(process)d %(message)s'
+        ))
+        logger.addHandler(handler)
+        _handler = handler
+
+    _observer = SlowQueryLogger(
+        float(threshold),
+        asbool(settings.get('slow_query.explain', False))
+    )
+    add_query_observer(_observer)
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 from .flash import flash
+from .fragments import cached_panel
 from .layout import Layout
 from .navbar import navbar
 from .steps import steps
@@ -23,13 +24,11 @@ def includeme(config: 'Configurator') -> None:
     )
 
     config.add_panel(
-        panel=navbar,
-        name='navbar',
-        renderer='navbar.pt'
+        panel=cached_panel(navbar, 'riskmatrix:layouts/navbar.pt'),
+        name='navbar'
     )
 
     config.add_panel(
-        panel=steps,
-        name='steps',
-        renderer='steps.pt'
+        panel=cached_panel(steps, 'riskmatrix:layouts/steps.pt'),
+        name='steps'
     )
@@ -0,0 +1,70 @@
+"""
+Caches the rendered output of panels across requests.
+
+Most of the layout chrome (navigation, assessment steps) looks the same
+for every request to the same URL, so it only needs to be rendered once.
+Panels which depend on anything else than the key, e.g. the current user
+or the contents of the session, must not be cached.
+"""
+from pyramid.renderers import render
+
+from riskmatrix.cache import process_cache
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Hashable
+    from pyramid.interfaces import IRequest
+
+    from riskmatrix.types import RenderData
+
+    Panel = Callable[[Any, IRequest], RenderData]
+    KeyFunc = Callable[[Any, IRequest], Hashable]
+
+
+def fragment_key(context: Any, request: 'IRequest') -> 'Hashable':
+    # NOTE: The path includes the matched route and its parameters, the
+    #       application url the scheme and host the links point to
+    return (
+        request.application_url,
+        request.path_url,
+        request.locale_name,
+        request.is_authenticated
+    )
+
+
+@process_cache(maxsize=1024, key=lambda name, key, factory: (name, key))
+def cached_fragment(
+    name:    str,
+    key:     'Hashable',
+    factory: 'Callable[[], str]'
+) -> str:
+    return factory()
+
+
+def cached_panel(
+    panel:    'Panel',
+    renderer: str,
+    key:      'KeyFunc' = fragment_key
+) -> 'Callable[[Any, IRequest], str]':
+    """
+    Wraps a panel so its rendered output is cached by the given key.
+
+    The panel needs to be registered without a renderer, the given
+    renderer is used instead.
+    """
+    name = f'{panel.__module__}.{panel.__qualname__}'
+
+    def render_panel(context: Any, request: 'IRequest') -> str:
+        return render(renderer, panel(context, request), request=request)
+
+    def wrapper(context: Any, request: 'IRequest') -> str:
+        return cached_fragment(
+            name,
+            key(context, request),
+            lambda: render_panel(context, request)
+        )
+
+    wrapper.__wrapped__ = panel  # type:ignore[attr-defined]
+    return wrapper
@@ -3,9 +3,6 @@ from riskmatrix.i18n import _
 
 from typing import NamedTuple
 from typing import TYPE_CHECKING
-
-from riskmatrix.models.risk_assessment import RiskAssessment
-from riskmatrix.models.risk_assessment_info import RiskAssessmentInfo, RiskAssessmentState
 if TYPE_CHECKING:
     from pyramid.interfaces import IRequest
 
@@ -20,12 +17,8 @@ class Step(NamedTuple):
 
 
 def steps(context: 'Organization', request: 'IRequest') -> 'RenderData':
-    assessments = request.dbsession.query(RiskAssessmentInfo).filter(
-        RiskAssessmentInfo.organization_id == context.id,
-        RiskAssessmentInfo.state == RiskAssessmentState.OPEN,
-    ).all()
-
-    t = request.dbsession.query(RiskAssessment).filter(RiskAssessment.risk_assessment_info_id.in_([a.id for a in assessments]), RiskAssessment.likelihood == None, RiskAssessment.impact == None).count()
+    # NOTE: The steps don't depend on the state of the organization,
+    #       so the panel can be cached, see `layouts.fragments`
     return {
         'steps': [
             Step(
@@ -49,7 +42,10 @@ def steps(context: 'Organization', request: 'IRequest') -> 'RenderData':
                 '#',
                 disabled=True
             ),
-            Step(_("Finish Assessment"), request.route_url('finish_assessment'), disabled=False),#t > 0 or len(assessments) == 0),
+            Step(
+                _('Finish Assessment'),
+                request.route_url('finish_assessment')
+            ),
         ]
     }
 
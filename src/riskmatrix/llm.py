@@ -0,0 +1,275 @@
+"""
+Lazily constructed clients for the LLM providers.
+
+The provider libraries are expensive to import, so they are only imported
+once the client is used for the first time. This keeps startup times of
+the workers and console scripts low, especially when no provider is
+configured at all.
+
+Multiple generations can be streamed concurrently through the bounded
+:class:`GenerationPool`.
+
+Setting `llm.provider = fake` selects the local stand-in provider from
+:mod:`riskmatrix.fake_llm` instead, e.g. for load testing.
+"""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from queue import Empty
+from queue import Queue
+from threading import Event
+from threading import Lock
+
+
+from typing import Any, Generic, NamedTuple, TypeVar, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Hashable
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+    from langchain_core.language_models import BaseChatModel
+    from langfuse.callback import CallbackHandler
+    from pyramid.config import Configurator
+    from pyramid.interfaces import IRequest
+
+
+_K = TypeVar('_K', bound='Hashable')
+_T = TypeVar('_T')
+
+OPENAI_MODEL = 'gpt-4o-mini'
+ANTHROPIC_MODEL = 'claude-3-5-sonnet-20240620'
+
+
+class LazyClient(Generic[_T]):
+    """
+    Request method which creates the client on first access and then
+    shares it between all requests.
+    """
+
+    def __init__(self, factory: 'Callable[[], _T]'):
+        self.factory = factory
+        self.client: _T | None = None
+        self._lock = Lock()
+
+    def __call__(self, request: 'IRequest | None' = None) -> _T:
+        if self.client is None:
+            with self._lock:
+                if self.client is None:
+                    self.client = self.factory()
+        return self.client
+
+
+def openai_client(settings: dict[str, Any]) -> 'BaseChatModel':
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        api_key=settings['openai_api_key'],
+        model=OPENAI_MODEL,
+        temperature=0.7
+    )
+
+
+def anthropic_client(settings: dict[str, Any]) -> 'BaseChatModel':
+    from langchain_anthropic import ChatAnthropic
+    # NOTE: mypy doesn't understand that the aliased `timeout` field
+    #       has a default value
+    return ChatAnthropic(  # type:ignore[call-arg]
+        api_key=settings['anthropic_api_key'],
+        model_name=ANTHROPIC_MODEL,
+        temperature=0.7
+    )
+
+
+def langfuse_handler(settings: dict[str, Any]) -> 'CallbackHandler':
+    from langfuse.callback import CallbackHandler
+    return CallbackHandler(
+        secret_key=settings.get('langfuse_secret_key'),
+        public_key=settings.get('langfuse_public_key'),
+        host=settings['langfuse_host'],
+    )
+
+
+def llm_factory(
+    settings: dict[str, Any]
+) -> 'Callable[[], BaseChatModel] | None':
+
+    if settings.get('llm.provider') == 'fake':
+        from riskmatrix.fake_llm import fake_client
+        return partial(fake_client, settings)  # type:ignore[return-value]
+    elif settings.get('openai_api_key'):
+        return partial(openai_client, settings)
+    elif settings.get('anthropic_api_key'):
+        return partial(anthropic_client, settings)
+    return None
+
+
+def llm_model(settings: dict[str, Any]) -> str | None:
+    """ Returns the name of the model used by the configured client. """
+    if settings.get('llm.provider') == 'fake':
+        from riskmatrix.fake_llm import FAKE_MODEL
+        return FAKE_MODEL
+    elif settings.get('openai_api_key'):
+        return OPENAI_MODEL
+    elif settings.get('anthropic_api_key'):
+        return ANTHROPIC_MODEL
+    return None
+
+
+def generation_key(model: str | None, prompt: str, **context: Any) -> str:
+    """
+    Returns a stable key for caching a generation, the context needs
+    to be serializable to JSON.
+    """
+    data = json.dumps(
+        [model, prompt, context],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class StreamEvent(NamedTuple):
+    """
+    An item of one of the streams multiplexed by :class:`GenerationPool`.
+
+    The last event of every stream is either `done` or `error`.
+    """
+    key:   'Hashable'
+    event: str  # chunk, done or error
+    data:  Any = None
+
+
+class GenerationPool:
+    """
+    Runs streaming generations in a bounded thread pool, which is shared
+    by all the requests of the process, so the number of concurrent
+    generations per process never exceeds `max_concurrency`.
+
+    Streams which don't produce anything for `timeout` seconds are given
+    up on, this includes the time spent waiting for a free thread.
+    """
+
+    max_concurrency: int
+    timeout: float | None
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        timeout:         float | None = 120.0
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.timeout = timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # NOTE: The executor is created lazily, so its threads are
+        #       started after the application server forked
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix='llm'
+                    )
+        return self._executor
+
+    def multiplex(
+        self,
+        streams: 'Mapping[_K, Callable[[], Iterable[_T]]]'
+    ) -> 'Iterator[StreamEvent]':
+        """
+        Consumes the given streams concurrently and yields their items
+        as soon as they arrive, tagged by the key of their stream.
+
+        If no item arrives within the timeout of the pool, every stream
+        which hasn't finished yet gets an `error` event with a
+        :class:`TimeoutError`.
+
+        Streams that haven't started yet are skipped and the others are
+        stopped at their next item, once the iterator is closed, e.g.
+        because the client went away.
+        """
+        events: Queue[StreamEvent] = Queue()
+        cancelled = Event()
+
+        def consume(key: _K, stream: 'Callable[[], Iterable[_T]]') -> None:
+            if cancelled.is_set():
+                return
+
+            try:
+                for item in stream():
+                    if cancelled.is_set():
+                        return
+                    events.put(StreamEvent(key, 'chunk', item))
+            except Exception as exception:
+                events.put(StreamEvent(key, 'error', exception))
+            else:
+                events.put(StreamEvent(key, 'done'))
+
+        for key, stream in streams.items():
+            self.executor.submit(consume, key, stream)
+
+        remaining: 'dict[Hashable, None]' = dict.fromkeys(streams)
+        try:
+            while remaining:
+                try:
+                    event = events.get(timeout=self.timeout)
+                except Empty:
+                    for pending in remaining:
+                        yield StreamEvent(pending, 'error', TimeoutError(
+                            f'No response within {self.timeout} seconds'
+                        ))
+                    return
+
+                if event.event != 'chunk':
+                    remaining.pop(event.key, None)
+                yield event
+        finally:
+            cancelled.set()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+generation_pool = GenerationPool()
+
+
+def configure_generation_pool(pool: GenerationPool) -> None:
+    global generation_pool
+    generation_pool.shutdown()
+    generation_pool = pool
+
+
+def get_generation_pool() -> GenerationPool:
+    return generation_pool
+
+
+def includeme(config: 'Configurator') -> None:
+    settings = config.get_settings()
+    configure_generation_pool(GenerationPool(
+        int(settings.get('llm.max_concurrency', 4)),
+        float(settings.get('llm.stream_timeout', 120.0))
+    ))
+
+    if (factory := llm_factory(settings)) is not None:
+        config.add_request_method(LazyClient(factory), 'llm', reify=True)
+
+    if settings.get('langfuse_host'):
+        config.add_request_method(
+            LazyClient(partial(langfuse_handler, settings)),
+            'langfuse',
+            reify=True
+        )
+    elif settings.get('llm.provider') == 'fake':
+        # NOTE: The generation views always pass the tracing handler
+        from riskmatrix.fake_llm import NoopCallbackHandler
+        config.add_request_method(
+            lambda request: NoopCallbackHandler(),
+            'langfuse',
+            reify=True
+        )
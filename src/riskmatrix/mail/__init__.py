@@ -3,6 +3,7 @@ from .exceptions import MailConnectionError
 from .exceptions import MailError
 from .interfaces import IMailer
 from .mailer import PostmarkMailer
+from .types import MailFailure
 from .types import MailState
 
 __all__ = (
@@ -10,6 +11,7 @@ __all__ = (
     'InactiveRecipient',
     'MailConnectionError',
     'MailError',
+    'MailFailure',
     'MailState',
     'PostmarkMailer',
 )
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+In-process stand-in for the Postmark API.
+
+Implements the endpoints used for sending mails, so the mailer can be
+tested and benchmarked without talking to the real API::
+
+    with FakePostmarkServer(latency=0.05) as server:
+        mailer = PostmarkMailer(sender, 'token', 'test', api_url=server.url)
+
+Recipients in `inactive_recipients` are rejected with error code 406, like
+Postmark does for hard bounces, the next `fail_requests` requests fail
+with the `fail_status` server error and the next `slow_requests` requests
+take an additional `slow_latency` seconds.
+
+It can also be run on its own and used through `mail.postmark_api_url`::
+
+    python -m riskmatrix.mail.fake_postmark --port 8025 --latency 0.1
+"""
+import argparse
+import json
+import time
+import uuid
+from collections import Counter
+from email.utils import getaddresses
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from sedate import utcnow
+from threading import Lock
+from threading import Thread
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing_extensions import Self
+
+    from ..types import JSON, JSONObject
+
+
+SINGLE_ENDPOINTS = frozenset(('/email', '/email/withTemplate'))
+BATCH_ENDPOINTS = frozenset(('/email/batch', '/email/batchWithTemplates'))
+
+
+class FakePostmarkServer:
+
+    def __init__(
+        self,
+        host:                str = '127.0.0.1',
+        port:                int = 0,
+        *,
+        latency:             float = 0.0,
+        inactive_recipients: 'Iterable[str]' = (),
+        fail_requests:       int = 0,
+        fail_status:         int = 503,
+        slow_requests:       int = 0,
+        slow_latency:        float = 30.0
+    ) -> None:
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.inactive_recipients = set(inactive_recipients)
+        self.fail_requests = fail_requests
+        self.fail_status = fail_status
+        self.slow_requests = slow_requests
+        self.slow_latency = slow_latency
+        # number of requests and messages by endpoint
+        self.requests: Counter[str] = Counter()
+        self.messages: Counter[str] = Counter()
+        self._lock = Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    def start(self) -> None:
+        assert self._server is None, 'Server is already running'
+        server = ThreadingHTTPServer((self.host, self.port), RequestHandler)
+        server.daemon_threads = True
+        server.fake = self  # type:ignore[attr-defined]
+        # in case we were asked to pick a free port
+        self.port = server.server_address[1]
+        self._server = server
+        self._thread = Thread(
+            target=server.serve_forever,
+            name='fake-postmark',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        assert self._thread is not None
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> 'Self':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def request_latency(self) -> float:
+        with self._lock:
+            if self.slow_requests > 0:
+                self.slow_requests -= 1
+                return self.latency + self.slow_latency
+        return self.latency
+
+    def message_result(self, message: 'JSONObject') -> 'JSONObject':
+        to = message.get('To')
+        if not isinstance(to, str):
+            return {'ErrorCode': 300, 'Message': 'Invalid email request'}
+
+        addresses = [address for name, address in getaddresses([to])]
+        if self.inactive_recipients.intersection(addresses):
+            return {
+                'ErrorCode': 406,
+                'Message': (
+                    'You tried to send to a recipient that has been '
+                    'marked as inactive.'
+                )
+            }
+
+        return {
+            'To': to,
+            'SubmittedAt': utcnow().isoformat(),
+            'MessageID': str(uuid.uuid4()),
+            'ErrorCode': 0,
+            'Message': 'OK'
+        }
+
+    def handle(
+        self,
+        path:    str,
+        headers: dict[str, str],
+        body:    bytes
+    ) -> tuple[int, 'JSON']:
+        """ Returns the status code and the JSON data of the response. """
+
+        if path not in SINGLE_ENDPOINTS and path not in BATCH_ENDPOINTS:
+            return 404, {'ErrorCode': 404, 'Message': 'Not found'}
+
+        with self._lock:
+            self.requests[path] += 1
+            if self.fail_requests > 0:
+                self.fail_requests -= 1
+                return self.fail_status, {
+                    'ErrorCode': self.fail_status,
+                    'Message': 'Internal Server Error'
+                }
+
+        if not headers.get('X-Postmark-Server-Token'):
+            return 401, {
+                'ErrorCode': 10,
+                'Message': 'No Account or Server API tokens were supplied.'
+            }
+
+        try:
+            data: Any = json.loads(body)
+        except ValueError:
+            return 422, {'ErrorCode': 402, 'Message': 'Invalid JSON'}
+
+        if path in SINGLE_ENDPOINTS:
+            if not isinstance(data, dict):
+                return 422, {'ErrorCode': 402, 'Message': 'Invalid JSON'}
+
+            with self._lock:
+                self.messages[path] += 1
+            result = self.message_result(data)
+            return (200 if result['ErrorCode'] == 0 else 422), result
+
+        # NOTE: Only the batch with templates is wrapped in an object
+        if isinstance(data, dict):
+            data = data.get('Messages')
+        if not isinstance(data, list):
+            return 422, {'ErrorCode': 402, 'Message': 'Invalid JSON'}
+        if len(data) > 500:
+            return 422, {
+                'ErrorCode': 300,
+                'Message': 'Too many messages in batch'
+            }
+
+        with self._lock:
+            self.messages[path] += len(data)
+        return 200, [self.message_result(message) for message in data]
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    server: ThreadingHTTPServer
+
+    def do_POST(self) -> None:
+        fake: FakePostmarkServer = self.server.fake  # type:ignore
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if latency := fake.request_latency():
+            time.sleep(latency)
+
+        status, data = fake.handle(self.path, dict(self.headers), body)
+        payload = json.dumps(data).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up waiting for a slow response
+            pass
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # we don't want to clutter the output of tests and benchmarks
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Runs a stand-in server for the Postmark API'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.0,
+        help='Seconds to wait before answering each request'
+    )
+    parser.add_argument(
+        '--inactive',
+        action='append',
+        default=[],
+        metavar='ADDRESS',
+        help='Recipient which is rejected as inactive (406)'
+    )
+    args = parser.parse_args()
+
+    server = FakePostmarkServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        inactive_recipients=args.inactive
+    )
+    server.start()
+    print(f'Fake Postmark API listening on {server.url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
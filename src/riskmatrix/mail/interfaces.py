@@ -4,6 +4,7 @@ from zope.interface import Interface
 if TYPE_CHECKING:
     from collections.abc import Sequence
     from email.headerregistry import Address
+    from .types import MailFailure
     from .types import MailState
     from .types import MailParams
     from .types import TemplateMailParams
@@ -30,13 +31,14 @@ class IMailer(Interface):  # pragma: no cover
         pass
 
     def bulk_send(mails: list['MailParams']
-                  ) -> list['MailID | MailState']:
+                  ) -> list['MailID | MailState | MailFailure']:
         """
         Send multiple emails. "mails" is a list of dicts containing
         the arguments to an individual send call.
 
         Returns a list of message uuids and their success/failure states
-        in the same order as the sending list.
+        in the same order as the sending list. A failure state may come
+        with the error reported for the message as a MailFailure.
         """
         pass
 
@@ -57,12 +59,12 @@ class IMailer(Interface):  # pragma: no cover
 
     def bulk_send_template(mails:            list['TemplateMailParams'],
                            default_template: str | None = None,
-                           ) -> list['MailID | MailState']:
+                           ) -> list['MailID | MailState | MailFailure']:
         """
         Send multiple template emails using the same template.
 
         Returns a list of message uuids. If a message failed to be sent
-        the uuid will be replaced by a MailState value.
+        the uuid will be replaced by a MailState value or a MailFailure.
         """
         pass
 
@@ -1,26 +1,38 @@
 import base64
 import io
 import json
+import os
 import re
 import requests
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from email.headerregistry import Address
+from functools import partial
 from markupsafe import Markup
+from requests.adapters import HTTPAdapter
 from string import ascii_letters
 from string import digits
+from threading import Lock
 from zope.interface import implementer
 
+from ..instrumentation.metrics import mail_send_duration
 from .exceptions import InactiveRecipient
 from .exceptions import MailConnectionError
 from .exceptions import MailError
 from .interfaces import IMailer
+from .types import MailFailure
 from .types import MailState
 
 from typing import cast, overload, Any, ClassVar, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from collections.abc import Sequence
+    from concurrent.futures import Future
     from requests import Response
+    from typing import IO
+    from .types import AttachmentContent
     from .types import MailAttachment
     from .types import MailParams
     from .types import TemplateMailParams
@@ -29,6 +41,7 @@ if TYPE_CHECKING:
     from ..types import JSON, JSONArray, JSONObject
     MailID = str
     AnyMailParams = MailParams | TemplateMailParams
+    MailResult = MailID | MailState | MailFailure
 
 
 domain_regex = re.compile(r'@[A-Za-z0-9][A-Za-z0-9.-]*[.][A-Za-z]{2,10}')
@@ -41,6 +54,9 @@ QP_PREFIX_LENGTH = len(qp_prefix)
 QP_SUFFIX_LENGTH = len(qp_suffix)
 QP_MAX_WORD_LENGTH = 75
 QP_CONTENT_LENGTH = QP_MAX_WORD_LENGTH - QP_PREFIX_LENGTH - QP_SUFFIX_LENGTH
+# NOTE: A multiple of 3 bytes encodes to base64 without padding, so
+#       chunks of this size can be encoded independently
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
 
 
 def needs_header_encode(name: str) -> bool:
@@ -123,29 +139,211 @@ def format_address(addresses: 'Address | Sequence[Address]') -> str:
     return ', '.join(format_single_address(a) for a in addresses)
 
 
+def attachment_size(content: 'AttachmentContent') -> int | None:
+    """ Returns the number of bytes left to read, if it is known. """
+    if isinstance(content, bytes):
+        return len(content)
+    if isinstance(content, (str, os.PathLike)):
+        return os.path.getsize(content)
+    if not content.seekable():
+        return None
+    position = content.tell()
+    size = content.seek(0, os.SEEK_END) - position
+    content.seek(position)
+    return size
+
+
+def iter_attachment(
+    content:    'AttachmentContent',
+    chunk_size: int = BASE64_CHUNK_SIZE
+) -> 'Iterator[bytes | memoryview]':
+
+    if isinstance(content, bytes):
+        view = memoryview(content)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    elif isinstance(content, (str, os.PathLike)):
+        with open(content, 'rb') as fp:
+            yield from iter(partial(fp.read, chunk_size), b'')
+    else:
+        yield from iter(partial(content.read, chunk_size), b'')
+
+
+def read_attachment(content: 'AttachmentContent') -> bytes:
+    if isinstance(content, bytes):
+        return content
+    return b''.join(iter_attachment(content))
+
+
+def base64_size(size: int) -> int:
+    return (size + 2) // 3 * 4
+
+
+def write_base64(buffer: 'IO[bytes]', content: 'AttachmentContent') -> int:
+    """
+    Encodes the content into the buffer chunk by chunk and returns the
+    number of bytes that have been written.
+
+    """
+    written = 0
+    remainder = b''
+    for chunk in iter_attachment(content):
+        if remainder:
+            chunk = remainder + chunk
+        # NOTE: Streams may return less than we asked for, so we hold
+        #       back what doesn't fit into a multiple of 3 bytes
+        cut = len(chunk) - len(chunk) % 3
+        written += buffer.write(base64.b64encode(chunk[:cut]))
+        remainder = bytes(chunk[cut:])
+    written += buffer.write(base64.b64encode(remainder))
+    return written
+
+
+class BatchMessage:
+    """
+    A message serialized for a batch request. The attachments are only
+    encoded once the message is written into the batch, so they are
+    never held in memory as a whole.
+
+    """
+
+    def __init__(
+        self,
+        message:     'JSONObject',
+        attachments: list[tuple['JSONObject', 'AttachmentContent']]
+    ) -> None:
+
+        self.payload = json.dumps(message).encode('utf-8')
+        self.size = len(self.payload)
+        self.attachments: 'list[tuple[bytes, AttachmentContent]]' = []
+        if attachments:
+            # `, "Attachments": [` ... `]` and the commas in between
+            self.size += 18 + len(attachments)
+
+        for metadata, content in attachments:
+            size = attachment_size(content)
+            if size is None:
+                # we can't tell the size of the stream without reading it
+                content = read_attachment(content)
+                size = len(content)
+
+            # the content is written between the head and `"}`
+            head = json.dumps(metadata).encode('utf-8')[:-1]
+            head += b', "Content": "'
+            self.attachments.append((head, content))
+            self.size += len(head) + base64_size(size) + 2
+
+    def write(self, buffer: 'IO[bytes]') -> None:
+        if not self.attachments:
+            buffer.write(self.payload)
+            return
+
+        buffer.write(self.payload[:-1])
+        buffer.write(b', "Attachments": [')
+        for index, (head, content) in enumerate(self.attachments):
+            if index:
+                buffer.write(b',')
+            buffer.write(head)
+            write_base64(buffer, content)
+            buffer.write(b'"}')
+        buffer.write(b']}')
+
+
 @implementer(IMailer)
 class PostmarkMailer:
-    api_url:        ClassVar[str] = 'https://api.postmarkapp.com'
-    default_sender: Address
-    server_token:   str
-    stream:         str
-    blackhole:      bool
+    default_api_url: ClassVar[str] = 'https://api.postmarkapp.com'
+    batch_limit:     ClassVar[int] = 500
+    # NOTE: The API specifies MB, so let's not chance it
+    #       by assuming they meant MiB and just go with
+    #       lower size limit.
+    size_limit:      ClassVar[int] = 50_000_000  # 50MB
+    # connect and read timeout for sending a batch
+    batch_timeout:   ClassVar[tuple[float, float]] = (5, 60)
+    api_url:         str
+    default_sender:  Address
+    server_token:    str
+    stream:          str
+    blackhole:       bool
+    max_workers:     int
 
     def __init__(self,
                  default_sender: Address,
                  server_token:   str,
                  stream:         str,
-                 blackhole:      bool = False) -> None:
+                 blackhole:      bool = False,
+                 max_workers:    int = 4,
+                 api_url:        str | None = None) -> None:
 
+        # NOTE: The API URL can be changed to talk to a stand-in server
+        #       see :mod:`riskmatrix.mail.fake_postmark`
+        self.api_url = (api_url or self.default_api_url).rstrip('/')
         self.default_sender = default_sender
         self.server_token = server_token
         self.stream = stream
         self.blackhole = blackhole
+        self.max_workers = max(max_workers, 1)
+        self._session: requests.Session | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._lock = Lock()
+
+    def _ensure_process(self) -> None:
+        # NOTE: Connections and threads can't be shared with a forked
+        #       child process, so we start over in the child
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._session = None
+                    self._executor = None
+                    self._pid = os.getpid()
+
+    @property
+    def session(self) -> requests.Session:
+        """ HTTP session which keeps the connections to the API alive. """
+        self._ensure_process()
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # one connection for each concurrent batch
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.max_workers
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        self._ensure_process()
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='postmark'
+                    )
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def request_headers(self) -> dict[str, str]:
         return {'X-Postmark-Server-Token': self.server_token}
 
-    def prepare_message(self, params: 'AnyMailParams') -> 'JSONObject':
+    def prepare_message(
+        self,
+        params:              'AnyMailParams',
+        include_attachments: bool = True
+    ) -> 'JSONObject':
+
         receivers = format_address(params['receivers'])
         # Strip plus addressing, so it can be used regardless of provider
         # support to disambiguate multiple participants with the same
@@ -194,31 +392,51 @@ class PostmarkMailer:
         if 'tag' in params:
             message['Tag'] = params['tag']
 
-        if 'attachments' in params:
+        if include_attachments and 'attachments' in params:
             message['Attachments'] = self.prepare_attachments(
                 params['attachments']
             )
         return message
 
-    def prepare_attachments(self, attachments: list['MailAttachment']
+    def prepare_attachments(self,
+                            attachments:     list['MailAttachment'],
+                            include_content: bool = True
                             ) -> 'JSONArray':
         result: 'JSONArray' = []
         for attachment in attachments:
-            content = base64.b64encode(attachment['content'])
             payload: 'JSONObject' = {
                 'Name': attachment['filename'],
-                'Content': content.decode('ascii'),
                 'ContentType': attachment['content_type'],
             }
+            if include_content:
+                content = read_attachment(attachment['content'])
+                payload['Content'] = base64.b64encode(content).decode('ascii')
             if 'content_id' in attachment:
                 payload['ContentID'] = 'cid:' + attachment['content_id']
             result.append(payload)
         return result
 
+    def prepare_batch_message(self, params: 'AnyMailParams') -> BatchMessage:
+        message = self.prepare_message(params, include_attachments=False)
+        attachments = params.get('attachments', [])
+        # NOTE: prepare_attachments only ever produces objects
+        metadata = cast('list[JSONObject]', self.prepare_attachments(
+            attachments,
+            include_content=False
+        ))
+        return BatchMessage(message, list(zip(
+            metadata,
+            (attachment['content'] for attachment in attachments)
+        )))
+
     def get_response_data(self, response: 'Response') -> 'JSON':
         try:
             data: 'JSON' = response.json()
             if not response.ok:
+                # NOTE: Single sends report an inactive recipient using
+                #       an error response, batches report them per message
+                if isinstance(data, dict) and data.get('ErrorCode') == 406:
+                    raise InactiveRecipient()
                 if (
                     isinstance(data, dict)
                     and isinstance((msg := data.get('Message')), str)
@@ -235,13 +453,14 @@ class PostmarkMailer:
         send_data = self.prepare_message(params)
         headers = self.request_headers()
         try:
-            response = requests.post(
-                send_url,
-                json=send_data,
-                headers=headers,
-                timeout=(5, 30)
-            )
-        except ConnectionError:
+            with mail_send_duration.time(endpoint=api_path):
+                response = self.session.post(
+                    send_url,
+                    json=send_data,
+                    headers=headers,
+                    timeout=(5, 30)
+                )
+        except requests.RequestException:
             raise MailConnectionError(
                 'Failed to connect to Postmark API'
             ) from None
@@ -317,7 +536,7 @@ class PostmarkMailer:
                        *,
                        preamble: bytes = b'{"messages":[',
                        postamble: bytes = b']}'
-                       ) -> list['MailID | MailState']: ...
+                       ) -> list['MailResult']: ...
     @overload  # noqa: E301
     def _raw_bulk_send(self,
                        api_path: str,
@@ -326,7 +545,7 @@ class PostmarkMailer:
                        *,
                        preamble: bytes = b'{"messages":[',
                        postamble: bytes = b']}'
-                       ) -> list['MailID | MailState']: ...
+                       ) -> list['MailResult']: ...
     def _raw_bulk_send(self,  # noqa: E301
                        api_path: str,
                        mails:    'Sequence[AnyMailParams]',
@@ -338,100 +557,91 @@ class PostmarkMailer:
                        #       these arguments
                        preamble: bytes = b'{"Messages": [',
                        postamble: bytes = b']}'
-                       ) -> list['MailID | MailState']:
+                       ) -> list['MailResult']:
 
-        messages: 'JSONArray' = []
-        for mail in mails:
-            if template:
-                mail = cast('TemplateMailParams', mail)
-                # NOTE: This modifies the original dict, which could
-                #       be a source for errors, but it's also faster...
-                mail.setdefault('template', template)
-            messages.append(self.prepare_message(mail))
-
-        bulk_url = self.api_url + api_path
         headers = self.request_headers()
         # We generate the payload ourselves so we set the headers manually
         headers['Accept'] = 'application/json'
         headers['Content-Type'] = 'application/json'
-        BATCH_LIMIT = 500
-        # NOTE: The API specifies MB, so let's not chance it
-        #       by assuming they meant MiB and just go with
-        #       lower size limit.
-        SIZE_LIMIT = 50_000_000  # 50MB
+        BATCH_LIMIT = self.batch_limit
+        SIZE_LIMIT = self.size_limit
         # NOTE: We use a buffer to be a bit more memory efficient
         #       we don't initialize the buffer, so tell gives us
         #       the exact size of the buffer.
         buffer = io.BytesIO()
         buffer.write(preamble)
         num_included = 0
-        result: list['MailID | MailState'] = []
+        result: list['MailResult'] = []
+
+        # NOTE: Batches are sent concurrently, but we wait for the oldest
+        #       one when all the workers are busy, or when the batches in
+        #       flight would add up to more than a full batch, so we
+        #       don't hold on to too many of them at the same time
+        pending: 'deque[tuple[Future[list[MailResult]], int]]'
+        pending = deque()
+        pending_size = 0
+
+        def wait_for_oldest() -> None:
+            nonlocal pending_size
+
+            future, size = pending.popleft()
+            result.extend(future.result())
+            pending_size -= size
 
         def finish_batch() -> None:
             nonlocal buffer
             nonlocal num_included
+            nonlocal pending_size
 
             buffer.write(postamble)
 
             # if the batch is empty we just skip it
             if num_included > 0:
                 assert num_included <= BATCH_LIMIT
-                assert buffer.tell() <= SIZE_LIMIT
-
-                try:
-                    response = requests.post(
-                        bulk_url,
-                        data=buffer.getvalue(),
-                        headers=headers,
-                        timeout=(5, 60)
-                    )
-                    data = self.get_response_data(response)
-                    if not isinstance(data, list) or len(data) != num_included:
-                        # TODO: should probably log this as a warning
-                        raise MailError('Invalid API data.')
-
-                    for message in data:
-                        if (
-                            not isinstance(message, dict)
-                            or 'ErrorCode' not in message
-                            or 'MessageID' not in message
-                        ):
-                            # TODO: should probably log this as a warning
-                            result.append(MailState.failed)
-                            continue
-
-                        error_code = message['ErrorCode']
-                        if error_code == 406:
-                            result.append(MailState.inactive_recipient)
-                        elif error_code != 0:
-                            result.append(MailState.failed)
-                        else:
-                            # if we don't get an ID we don't want to fail hard
-                            # so we just pretend the mail has been delivered
-                            result.append(message['MessageID'])
-
-                except ConnectionError:
-                    # we'll treat these as a temporary failures
-                    result.extend([MailState.temporary_failure]*num_included)
-                except MailError:
-                    # we'll treat these as more permanent failures for now
-                    result.extend([MailState.failed]*num_included)
+                size = buffer.tell()
+                assert size <= SIZE_LIMIT
+
+                while pending and (
+                    len(pending) >= self.max_workers
+                    or pending_size + size > SIZE_LIMIT
+                ):
+                    wait_for_oldest()
+
+                # NOTE: The buffer is sent as is rather than a copy of
+                #       its value and closed once it has been sent
+                buffer.seek(0)
+                pending.append((self.executor.submit(
+                    self._send_batch,
+                    api_path,
+                    buffer,
+                    num_included,
+                    headers
+                ), size))
+                pending_size += size
+            else:
+                buffer.close()
 
             # prepare vars for next batch
-            buffer.close()
             buffer = io.BytesIO()
             buffer.write(preamble)
             num_included = 0
 
-        for message in messages:
-            payload = json.dumps(message).encode('utf-8')
-            if buffer.tell() + len(payload) + len(postamble) >= SIZE_LIMIT:
+        # NOTE: Messages are serialized one at a time, so we only keep
+        #       the batch that is being filled and the ones in flight
+        for mail in mails:
+            if template:
+                mail = cast('TemplateMailParams', mail)
+                # NOTE: This modifies the original dict, which could
+                #       be a source for errors, but it's also faster...
+                mail.setdefault('template', template)
+            message = self.prepare_batch_message(mail)
+            if buffer.tell() + message.size + len(postamble) >= SIZE_LIMIT:
                 finish_batch()
 
             if num_included:
                 buffer.write(b',')
 
-            buffer.write(payload)
+            message.write(buffer)
             num_included += 1
 
             if num_included == BATCH_LIMIT:
@@ -439,17 +649,90 @@ class PostmarkMailer:
 
         # finish final partially full batch
         finish_batch()
+        while pending:
+            wait_for_oldest()
+        return result
+
+    def _send_batch(
+        self,
+        api_path: str,
+        payload:  'IO[bytes]',
+        count:    int,
+        headers:  dict[str, str]
+    ) -> list['MailResult']:
+
+        result: list['MailResult'] = []
+        try:
+            with payload, mail_send_duration.time(endpoint=api_path):
+                response = self.session.post(
+                    self.api_url + api_path,
+                    data=payload,
+                    headers=headers,
+                    timeout=self.batch_timeout
+                )
+            if response.status_code >= 500:
+                # the API is having problems, so we should try again later
+                return [MailState.temporary_failure] * count
+            data = self.get_response_data(response)
+            if not isinstance(data, list) or len(data) != count:
+                # TODO: should probably log this as a warning
+                raise MailError('Invalid API data.')
+
+            for message in data:
+                # NOTE: Only messages without an error come with an ID
+                if (
+                    not isinstance(message, dict)
+                    or 'ErrorCode' not in message
+                ):
+                    # TODO: should probably log this as a warning
+                    result.append(
+                        MailFailure(MailState.failed, 'Invalid API data.')
+                    )
+                    continue
+
+                error_code = message['ErrorCode']
+                if error_code == 0:
+                    # if we don't get an ID we don't want to fail hard
+                    # so we just pretend the mail has been delivered
+                    message_id = message.get('MessageID')
+                    result.append(
+                        message_id if isinstance(message_id, str) else ''
+                    )
+                    continue
+
+                if error_code == 406:
+                    state = MailState.inactive_recipient
+                else:
+                    state = MailState.failed
+                error = f'{error_code}: {message.get("Message", "")}'
+                result.append(MailFailure(state, error))
+
+        except requests.ConnectionError:
+            # the batch never reached the API, including connect timeouts,
+            # so it's safe to send it again later
+            return [MailState.temporary_failure] * count
+        except requests.RequestException:
+            # NOTE: After a read timeout the API may already have accepted
+            #       the batch, so sending it again could deliver every mail
+            #       in it twice
+            return [MailFailure(
+                MailState.failed,
+                'No response from the API, the mails may have been sent'
+            )] * count
+        except MailError as exception:
+            # we'll treat these as more permanent failures for now
+            return [MailFailure(MailState.failed, str(exception))] * count
         return result
 
     def bulk_send(self, mails: list['MailParams']
-                  ) -> list['MailID | MailState']:
+                  ) -> list['MailResult']:
         return self._raw_bulk_send('/email/batch', mails,
                                    preamble=b'[', postamble=b']')
 
     def bulk_send_template(self,
                            mails: list['TemplateMailParams'],
                            default_template: str | None = None,
-                           ) -> list['MailID | MailState']:
+                           ) -> list['MailResult']:
         return self._raw_bulk_send(
             '/email/batchWithTemplates', mails, default_template
         )
@@ -459,10 +742,10 @@ class PostmarkMailer:
         headers = self.request_headers()
         headers['Accept'] = 'application/json'
         try:
-            response = requests.get(
+            response = self.session.get(
                 details_url, headers=headers, timeout=(5, 10)
             )
-        except ConnectionError:
+        except requests.RequestException:
             raise MailConnectionError(
                 'Failed to connect to Postmark API'
             ) from None
@@ -491,7 +774,7 @@ class PostmarkMailer:
     def validate_template(self, template_data: dict[str, str]) -> list[str]:
         validate_url = self.api_url + '/templates/validate'
         try:
-            response = requests.post(
+            response = self.session.post(
                 validate_url,
                 json=template_data,
                 headers=self.request_headers(),
@@ -513,7 +796,7 @@ class PostmarkMailer:
                 for location in ('Subject', 'HtmlBody', 'TextBody')
                 for error in data[location]['ValidationErrors']
             ]
-        except ConnectionError:
+        except requests.RequestException:
             raise MailConnectionError(
                 'Failed to connect to Postmark API'
             ) from None
@@ -523,13 +806,13 @@ class PostmarkMailer:
         try:
             headers = self.request_headers()
             headers['Accept'] = 'application/json'
-            response = requests.get(
+            response = self.session.get(
                 template_url,
                 headers=headers,
                 timeout=(5, 10)
             )
             return response.ok
-        except ConnectionError:
+        except requests.RequestException:
             raise MailConnectionError(
                 'Failed to connect to Postmark API'
             ) from None
@@ -582,7 +865,7 @@ class PostmarkMailer:
             template_url = self.api_url + '/templates'
 
         try:
-            response = requests.request(
+            response = self.session.request(
                 method,
                 template_url,
                 json=template_data,
@@ -592,7 +875,7 @@ class PostmarkMailer:
             if not response.ok:
                 return [f'Failed to {action} template.']
             return []
-        except ConnectionError:
+        except requests.RequestException:
             # Let's not force people to catch an exception
             return ['Failed to connect to Postmark API.']
 
@@ -604,7 +887,7 @@ class PostmarkMailer:
         try:
             headers = self.request_headers()
             headers['Accept'] = 'application/json'
-            response = requests.delete(
+            response = self.session.delete(
                 self.api_url + '/templates/' + alias,
                 headers=headers,
                 timeout=(5, 10)
@@ -612,7 +895,7 @@ class PostmarkMailer:
             if not response.ok:
                 return ['Failed to delete template.']
             return []
-        except ConnectionError:
+        except requests.RequestException:
             # Let's not force people to catch an exception
             return ['Failed to connect to Postmark API.']
 
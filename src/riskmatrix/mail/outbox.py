@@ -0,0 +1,214 @@
+"""
+Transactional outbox for outgoing mails.
+
+Instead of talking to the mail API while handling a request, mails are
+stored in the database in the same transaction as the change which
+caused them. The `drain-outbox` console script then sends them in bulk.
+
+Temporary failures are retried with an exponential backoff, mails which
+fail permanently or too often are kept as dead letters, i.e. with
+a state of `failed` or `inactive_recipient` and the last error.
+"""
+import base64
+import logging
+from datetime import timedelta
+from email.headerregistry import Address
+from itertools import groupby
+from sedate import utcnow
+from sqlalchemy import select
+
+from ..instrumentation.metrics import Counter
+from ..models import OutgoingMail
+from .mailer import read_attachment
+from .types import MailFailure
+from .types import MailState
+
+
+from typing import Any, NamedTuple, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+
+    from .interfaces import IMailer
+    from .types import MailParams
+    from .types import TemplateMailParams
+
+    AnyMailParams = MailParams | TemplateMailParams
+
+
+logger = logging.getLogger('riskmatrix.mail.outbox')
+
+outbox_mails = Counter(
+    'riskmatrix_outbox_mails_total',
+    'Number of mails processed by the outbox by resulting state.',
+    ('state',)
+)
+
+PENDING_STATES = (MailState.queued, MailState.temporary_failure)
+
+
+class OutboxSettings(NamedTuple):
+    batch_size:   int = 500
+    max_attempts: int = 8
+    # the delay after the first temporary failure in seconds, it
+    # doubles with every further attempt up to max_delay
+    base_delay:   float = 60
+    max_delay:    float = 6 * 60 * 60
+
+
+def serialize_address(address: Address) -> list[str]:
+    return [address.display_name, address.addr_spec]
+
+
+def deserialize_address(data: list[str]) -> Address:
+    display_name, addr_spec = data
+    return Address(display_name, addr_spec=addr_spec)
+
+
+def serialize_params(params: 'AnyMailParams') -> dict[str, Any]:
+    data: dict[str, Any] = dict(params)
+    receivers = params['receivers']
+    if isinstance(receivers, Address):
+        receivers = [receivers]
+    data['receivers'] = [serialize_address(a) for a in receivers]
+    if 'sender' in params:
+        data['sender'] = serialize_address(params['sender'])
+    if 'attachments' in params:
+        data['attachments'] = [
+            {
+                **attachment,
+                'content': base64.b64encode(
+                    read_attachment(attachment['content'])
+                ).decode('ascii')
+            }
+            for attachment in params['attachments']
+        ]
+    return data
+
+
+def deserialize_params(data: dict[str, Any]) -> 'AnyMailParams':
+    params: Any = dict(data)
+    params['receivers'] = [deserialize_address(a) for a in data['receivers']]
+    if 'sender' in data:
+        params['sender'] = deserialize_address(data['sender'])
+    if 'attachments' in data:
+        params['attachments'] = [
+            {
+                **attachment,
+                'content': base64.b64decode(attachment['content'])
+            }
+            for attachment in data['attachments']
+        ]
+    return params
+
+
+def enqueue_mail(session: 'Session', params: 'MailParams') -> OutgoingMail:
+    mail = OutgoingMail(serialize_params(params))
+    session.add(mail)
+    return mail
+
+
+def enqueue_template_mail(
+    session: 'Session',
+    params:  'TemplateMailParams'
+) -> OutgoingMail:
+
+    mail = OutgoingMail(serialize_params(params), template=params['template'])
+    session.add(mail)
+    return mail
+
+
+def pending_mails(
+    session: 'Session',
+    limit:   int,
+    now:     'datetime'
+) -> 'Sequence[OutgoingMail]':
+
+    query = select(OutgoingMail).where(
+        OutgoingMail.state.in_(PENDING_STATES),
+        OutgoingMail.next_attempt <= now
+    ).order_by(
+        OutgoingMail.next_attempt
+    ).limit(limit)
+    # NOTE: Allows running multiple workers, each of them only gets the
+    #       rows the others haven't locked yet. This is ignored by sqlite
+    query = query.with_for_update(skip_locked=True)
+    return session.scalars(query).all()
+
+
+def record_result(
+    mail:     OutgoingMail,
+    result:   str | MailState | MailFailure,
+    now:      'datetime',
+    settings: OutboxSettings
+) -> None:
+
+    mail.attempts += 1
+    error = None
+    if isinstance(result, MailFailure):
+        result, error = result
+
+    if isinstance(result, str):
+        mail.state = MailState.submitted
+        mail.message_id = result
+        mail.sent = now
+        mail.last_error = None
+    elif result == MailState.temporary_failure:
+        if mail.attempts >= settings.max_attempts:
+            mail.state = MailState.failed
+            mail.last_error = f'Gave up after {mail.attempts} attempts'
+        else:
+            mail.state = MailState.temporary_failure
+            mail.last_error = error or 'Temporary failure'
+            delay = min(
+                settings.base_delay * 2 ** (mail.attempts - 1),
+                settings.max_delay
+            )
+            mail.next_attempt = now + timedelta(seconds=delay)
+    else:
+        mail.state = result
+        mail.last_error = error
+
+    outbox_mails.inc(state=mail.state.name)
+
+
+def drain_outbox(
+    session:  'Session',
+    mailer:   'IMailer',
+    settings: OutboxSettings | None = None,
+    now:      'datetime | None' = None
+) -> int:
+    """
+    Sends one batch of pending mails and returns the number of mails
+    that have been processed.
+
+    The caller is responsible for committing the transaction.
+    """
+    if settings is None:
+        settings = OutboxSettings()
+    if now is None:
+        now = utcnow()
+
+    mails = pending_mails(session, settings.batch_size, now)
+
+    def is_template(mail: OutgoingMail) -> bool:
+        return mail.template is not None
+
+    for template, group in groupby(
+        sorted(mails, key=is_template),
+        key=is_template
+    ):
+        batch = list(group)
+        params: Any = [deserialize_params(mail.params) for mail in batch]
+        if template:
+            results = mailer.bulk_send_template(params)
+        else:
+            results = mailer.bulk_send(params)
+
+        for mail, result in zip(batch, results, strict=True):
+            record_result(mail, result, now, settings)
+
+    if mails:
+        logger.info(f'Processed {len(mails)} outgoing mails')
+    return len(mails)
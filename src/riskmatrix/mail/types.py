@@ -1,13 +1,22 @@
 import enum
 
 
-from typing import TypedDict, TYPE_CHECKING
+from typing import NamedTuple, TypedDict, TYPE_CHECKING
 if TYPE_CHECKING:
     from collections.abc import Sequence
     from email.headerregistry import Address
+    from os import PathLike
+    from typing import IO
+    from typing_extensions import TypeAlias
 
     from ..types import JSONObject
 
+    # NOTE: Attachments can also be passed as a path or a binary stream,
+    #       so large files are encoded straight into the request, without
+    #       loading them into memory first. A stream is read from its
+    #       current position and is consumed by sending the mail.
+    AttachmentContent: TypeAlias = bytes | str | PathLike[str] | IO[bytes]
+
 
 class MailState(enum.IntEnum):
     not_queued = 0
@@ -21,9 +30,15 @@ class MailState(enum.IntEnum):
     read = 70
 
 
+class MailFailure(NamedTuple):
+    """ A mail which couldn't be sent and the error reported for it. """
+    state: MailState
+    error: str
+
+
 class _BaseMailAttachment(TypedDict):
     filename:     str
-    content:      bytes
+    content:      'AttachmentContent'
     content_type: str
 
 
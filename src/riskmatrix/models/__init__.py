@@ -8,6 +8,7 @@ from riskmatrix.orm import get_tm_session
 # Base.metadata prior to any initialization routines
 from .asset import Asset
 from .organization import Organization
+from .outgoing_mail import OutgoingMail
 from .risk import Risk
 from .risk_assessment import RiskAssessment, RiskMatrixAssessment
 from .risk_catalog import RiskCatalog
@@ -43,7 +44,7 @@ def includeme(config: 'Configurator') -> None:
     config.include('pyramid_retry')
 
     session_factory = get_session_factory(get_engine(settings))
-    config.registry['dbsession_factory'] = session_factory  # type:ignore
+    config.registry['dbsession_factory'] = session_factory
 
     # make request.dbsession available for use in Pyramid
     config.add_request_method(
@@ -58,6 +59,7 @@ __all__ = (
     'includeme',
     'Asset',
     'Organization',
+    'OutgoingMail',
     'Risk',
     'RiskAssessment',
     'RiskCatalog',
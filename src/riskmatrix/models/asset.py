@@ -1,5 +1,4 @@
 from datetime import datetime
-from pyramid.authorization import Allow
 from sedate import utcnow
 from riskmatrix.orm.softdelete_base import SoftDeleteMixin
 from sqlalchemy import ForeignKey
@@ -10,6 +9,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped
 from uuid import uuid4
 
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import str_256
 from riskmatrix.orm.meta import Text
@@ -24,11 +24,10 @@ if TYPE_CHECKING:
 
     from riskmatrix.models import Organization
     from riskmatrix.models import RiskAssessment
-    from riskmatrix.types import ACL
 
 from sqlalchemy_serializer import SerializerMixin
 
-class Asset(Base, SoftDeleteMixin, SerializerMixin):
+class Asset(Base, SoftDeleteMixin, SerializerMixin, OrganizationACLMixin):
 
     __tablename__ = 'asset'
     __table_args__ = (
@@ -69,6 +68,10 @@ class Asset(Base, SoftDeleteMixin, SerializerMixin):
         self.organization = organization
         self.meta = meta
 
+    @property
+    def acl_organization_id(self) -> str:
+        return self.organization_id
+
     @hybrid_property
     def catalog_ids(self) -> list[str]:
         return self.meta.get('catalogs', [])
@@ -81,8 +84,3 @@ class Asset(Base, SoftDeleteMixin, SerializerMixin):
     @classmethod
     def _catalog_ids_expression(cls) -> 'ColumnElement[list[str]]':
         return cls.meta['catalogs']
-
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.organization_id}', ['view']),
-        ]
@@ -1,9 +1,9 @@
-from pyramid.authorization import Allow
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped
 from uuid import uuid4
 from riskmatrix.models.risk_catalog import RiskCatalog
 
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import str_256
 from riskmatrix.orm.meta import str_32
@@ -15,10 +15,9 @@ if TYPE_CHECKING:
     from riskmatrix.models import Asset
     from riskmatrix.models import Risk
     from riskmatrix.models import User
-    from riskmatrix.types import ACL
 
 
-class Organization(Base):
+class Organization(Base, OrganizationACLMixin):
 
     __tablename__ = 'organization'
 
@@ -51,9 +50,8 @@ class Organization(Base):
         self.email = email
         self.locale = locale
 
-    # TODO: Validate locale
+    @property
+    def acl_organization_id(self) -> str:
+        return self.id
 
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.id}', ['view']),
-        ]
+    # TODO: Validate locale
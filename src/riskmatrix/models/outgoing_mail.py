@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+from sedate import utcnow
+from sqlalchemy import Enum
+from sqlalchemy import Index
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Mapped
+
+from ..mail.types import MailState
+from ..orm.meta import Base
+from ..orm.meta import UUIDStrPK
+
+
+from typing import Any
+
+
+class OutgoingMail(Base):
+    """
+    A mail waiting to be sent, see :mod:`riskmatrix.mail.outbox`.
+
+    Mails are added in the same transaction as the change which caused
+    them, so they are only sent if that change has been committed.
+    """
+
+    __tablename__ = 'outgoing_mail'
+    __table_args__ = (
+        Index('ix_outgoing_mail_pending', 'state', 'next_attempt'),
+    )
+
+    id: Mapped[UUIDStrPK]
+    # the name of the template or None for a plain mail
+    template: Mapped[str | None]
+    params: Mapped[dict[str, Any]]
+    state: Mapped[MailState] = mapped_column(
+        Enum(MailState),
+        default=MailState.queued
+    )
+    attempts: Mapped[int] = mapped_column(default=0)
+    created: Mapped[datetime] = mapped_column(default=utcnow)
+    next_attempt: Mapped[datetime] = mapped_column(default=utcnow)
+    sent: Mapped[datetime | None]
+    message_id: Mapped[str | None]
+    last_error: Mapped[str | None]
+
+    def __init__(
+        self,
+        params:   dict[str, Any],
+        template: str | None = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.params = params
+        self.template = template
+        self.state = MailState.queued
+        self.attempts = 0
+        self.created = self.next_attempt = utcnow()
+        self.sent = None
+        self.message_id = None
+        self.last_error = None
@@ -1,5 +1,4 @@
 from datetime import datetime
-from pyramid.authorization import Allow
 from sedate import utcnow
 from riskmatrix.orm.softdelete_base import SoftDeleteMixin
 from sqlalchemy import ForeignKey
@@ -10,6 +9,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped
 from uuid import uuid4
 
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import str_128
 from riskmatrix.orm.meta import str_256
@@ -24,11 +24,10 @@ if TYPE_CHECKING:
     from riskmatrix.models import Organization
     from riskmatrix.models import RiskAssessment
     from riskmatrix.models import RiskCatalog
-    from riskmatrix.types import ACL
 
 from sqlalchemy_serializer import SerializerMixin
 
-class Risk(SoftDeleteMixin, Base, SerializerMixin):
+class Risk(SoftDeleteMixin, Base, SerializerMixin, OrganizationACLMixin):
 
     __tablename__ = 'risk'
     __table_args__ = (
@@ -80,7 +79,6 @@ class Risk(SoftDeleteMixin, Base, SerializerMixin):
         self.category = category
         self.meta = meta
 
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.organization_id}', ['view']),
-        ]
+    @property
+    def acl_organization_id(self) -> str:
+        return self.organization_id
@@ -1,5 +1,4 @@
 from datetime import datetime
-from pyramid.authorization import Allow
 from sedate import utcnow
 from riskmatrix.orm.softdelete_base import SoftDeleteMixin
 from sqlalchemy import ForeignKey
@@ -14,6 +13,7 @@ from uuid import uuid4
 from riskmatrix.models import Asset
 from riskmatrix.models import Risk
 from riskmatrix.models.risk_assessment_info import RiskAssessmentInfo
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import UUIDStr
 from riskmatrix.orm.meta import UUIDStrPK
@@ -22,12 +22,14 @@ from dataclasses import dataclass
 from sqlalchemy_serializer import SerializerMixin
 
 from typing import Any, ClassVar
-from typing import TYPE_CHECKING
-if TYPE_CHECKING:
-    from riskmatrix.types import ACL
 
 
-class RiskAssessment(SoftDeleteMixin, Base, SerializerMixin):
+class RiskAssessment(
+    SoftDeleteMixin,
+    Base,
+    SerializerMixin,
+    OrganizationACLMixin
+):
 
     __tablename__ = 'risk_assessment'
     __table_args__ = (
@@ -166,10 +168,9 @@ class RiskAssessment(SoftDeleteMixin, Base, SerializerMixin):
     def _organization_id_expression(cls) -> Mapped[str]:
         return Risk.organization_id
 
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.risk.organization_id}', ['view']),
-        ]
+    @property
+    def acl_organization_id(self) -> str:
+        return self.organization_id
 
 
 class RiskMatrixAssessment(RiskAssessment):
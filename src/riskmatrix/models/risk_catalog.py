@@ -1,5 +1,4 @@
 from datetime import datetime
-from pyramid.authorization import Allow
 from sedate import utcnow
 from riskmatrix.orm.softdelete_base import SoftDeleteMixin
 from sqlalchemy import ForeignKey
@@ -10,6 +9,7 @@ from sqlalchemy.orm import validates
 from sqlalchemy.orm import Mapped
 from uuid import uuid4
 
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import str_128
 from riskmatrix.orm.meta import Text
@@ -22,10 +22,14 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from riskmatrix.models import Organization
     from riskmatrix.models import Risk
-    from riskmatrix.types import ACL
 
 
-class RiskCatalog(Base, SoftDeleteMixin, SerializerMixin):
+class RiskCatalog(
+    Base,
+    SoftDeleteMixin,
+    SerializerMixin,
+    OrganizationACLMixin
+):
 
     __tablename__ = 'risk_catalog'
     __table_args__ = (
@@ -74,6 +78,10 @@ class RiskCatalog(Base, SoftDeleteMixin, SerializerMixin):
         self.organization = organization
         self.parent = parent
 
+    @property
+    def acl_organization_id(self) -> str:
+        return self.organization_id
+
     @validates('parent')
     def ensure_consistent_organization(
         self,
@@ -87,8 +95,3 @@ class RiskCatalog(Base, SoftDeleteMixin, SerializerMixin):
             )
 
         return parent
-
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.organization_id}', ['view']),
-        ]
@@ -1,5 +1,4 @@
 from datetime import datetime
-from pyramid.authorization import Allow
 from sedate import utcnow
 from riskmatrix.orm.softdelete_base import SoftDeleteMixin
 from sqlalchemy import ForeignKey
@@ -10,6 +9,7 @@ from sqlalchemy.orm import validates
 from sqlalchemy.orm import Mapped
 from uuid import uuid4
 
+from riskmatrix.orm.acl import OrganizationACLMixin
 from riskmatrix.orm.meta import Base
 from riskmatrix.orm.meta import str_128
 from riskmatrix.orm.meta import Text
@@ -20,10 +20,9 @@ from riskmatrix.orm.meta import UUIDStrPK
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from riskmatrix.models import Organization
-    from riskmatrix.types import ACL
 
 
-class RiskCategory(Base, SoftDeleteMixin):
+class RiskCategory(Base, SoftDeleteMixin, OrganizationACLMixin):
 
     __tablename__ = 'risk_category'
     __table_args__ = (
@@ -70,6 +69,10 @@ class RiskCategory(Base, SoftDeleteMixin):
         self.organization = organization
         self.parent = parent
 
+    @property
+    def acl_organization_id(self) -> str:
+        return self.organization_id
+
     @validates('parent')
     def ensure_consistent_organization(
         self,
@@ -83,8 +86,3 @@ class RiskCategory(Base, SoftDeleteMixin):
             )
 
         return parent
-
-    def __acl__(self) -> list['ACL']:
-        return [
-            (Allow, f'org_{self.organization_id}', ['view']),
-        ]
@@ -1,4 +1,3 @@
-import bcrypt
 from datetime import datetime
 from sedate import utcnow
 from sqlalchemy import ForeignKey
@@ -12,6 +11,8 @@ from riskmatrix.orm.meta import str_128
 from riskmatrix.orm.meta import str_256
 from riskmatrix.orm.meta import UUIDStr
 from riskmatrix.orm.meta import UUIDStrPK
+from riskmatrix.passwords import get_password_hasher
+from riskmatrix.passwords import PasswordHasherBusy
 
 
 from typing import TYPE_CHECKING
@@ -75,20 +76,33 @@ class User(Base):
 
     def set_password(self, password: str) -> None:
         password = password or ''
-        pwhash = bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt())
-        self.password = pwhash.decode('utf8')
+        self.password = get_password_hasher().hash(password)
         self.last_password_change = utcnow()
 
     def check_password(self, password: str) -> bool:
+        """
+        Verifies the password and transparently rehashes it, if it was
+        hashed using a different cost than the one that's configured.
+
+        Raises :class:`riskmatrix.passwords.PasswordHasherBusy` if too
+        many passwords are being verified at the same time.
+        """
         if not self.password:
             return False
+
+        hasher = get_password_hasher()
         try:
-            return bcrypt.checkpw(
-                password.encode('utf8'),
-                self.password.encode('utf8')
-            )
+            valid = hasher.verify(password, self.password)
         except (AttributeError, ValueError):
             return False
 
+        if valid and hasher.needs_rehash(self.password):
+            try:
+                self.password = hasher.hash(password)
+            except PasswordHasherBusy:
+                # the password is correct, so we can rehash it next time
+                pass
+        return valid
+
     def groups(self) -> list[str]:
         return [f'org_{self.organization_id}']
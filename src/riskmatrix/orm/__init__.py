@@ -2,6 +2,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy.orm import sessionmaker
 import zope.sqlalchemy
 
+from .invalidation import register_invalidation
 from .meta import Base
 
 
@@ -26,6 +27,7 @@ def get_engine(
 def get_session_factory(engine: 'Engine') -> sessionmaker['Session']:
     factory = sessionmaker()
     factory.configure(bind=engine)
+    register_invalidation(factory)
     return factory
 
 
@@ -0,0 +1,29 @@
+from pyramid.authorization import Allow
+
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from riskmatrix.types import ACL
+
+
+class OrganizationACLMixin:
+    """
+    Grants the members of the organization an object belongs to the
+    permission to view it.
+
+    Since this is the only rule, the security policy can decide these
+    permissions without building and scanning the ACL.
+
+    NOTE: Subclasses need to implement `acl_organization_id` and must not
+          override `__acl__`, otherwise the security policy won't see the
+          change.
+    """
+
+    @property
+    def acl_organization_id(self) -> str:
+        raise NotImplementedError()
+
+    def __acl__(self) -> list['ACL']:
+        return [
+            (Allow, f'org_{self.acl_organization_id}', ['view']),
+        ]
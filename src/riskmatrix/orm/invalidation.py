@@ -0,0 +1,123 @@
+"""
+Publishes cache invalidation tags for the rows touched by a transaction.
+
+Tags are collected while flushing and only published once the transaction
+has been committed successfully, aborted transactions discard them. Every
+changed row produces the following tags:
+
+* ``<table>:<primary key>``
+* ``<referred table>:<value>`` for each of its foreign keys
+* ``org:<organization id>:<table>`` if it belongs to an organization
+
+"""
+from sqlalchemy import event
+from sqlalchemy import inspect
+
+from riskmatrix.cache import publish
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from sqlalchemy.orm import Session
+    from sqlalchemy.orm import SessionTransaction
+    from sqlalchemy.orm import UOWTransaction
+    from sqlalchemy.orm import sessionmaker
+
+
+PENDING_TAGS = 'riskmatrix.invalidation_tags'
+REGISTERED = '_riskmatrix_invalidation'
+
+
+def model_tags(obj: Any) -> 'Iterator[str]':
+    state = inspect(obj)
+    table = state.mapper.local_table
+    identity = state.identity or state.mapper.primary_key_from_instance(obj)
+    yield f'{table.name}:{":".join(str(value) for value in identity)}'
+
+    for column in table.columns:
+        if not column.foreign_keys and column.name != 'organization_id':
+            continue
+
+        attr = state.mapper.get_property_by_column(column).key
+        history = state.attrs[attr].history
+        # include the previous value, so moving a row from one parent
+        # to another invalidates both of them
+        values = {*history.unchanged, *history.added, *history.deleted}
+        values.discard(None)
+        for value in values:
+            for foreign_key in column.foreign_keys:
+                yield f'{foreign_key.column.table.name}:{value}'
+            if column.name == 'organization_id':
+                yield f'org:{value}:{table.name}'
+
+
+def pending_tags(session: 'Session') -> set[str]:
+    return session.info.setdefault(PENDING_TAGS, set())
+
+
+def invalidate_on_commit(session: 'Session', *tags: str) -> None:
+    """
+    Publishes the given tags once the session has been committed.
+
+    This is necessary for changes that bypass the unit of work, like
+    bulk inserts and updates.
+    """
+    pending_tags(session).update(tags)
+
+
+def has_pending_changes(session: 'Session') -> bool:
+    """
+    Whether or not the session contains changes that haven't been
+    committed yet. Cached values should neither be read nor stored
+    while this is the case, since they could be stale or get rolled
+    back respectively.
+    """
+    return bool(
+        session.info.get(PENDING_TAGS)
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+def collect_tags(session: 'Session', flush_context: 'UOWTransaction') -> None:
+    tags = pending_tags(session)
+    for obj in session.new:
+        tags.update(model_tags(obj))
+    for obj in session.deleted:
+        tags.update(model_tags(obj))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tags.update(model_tags(obj))
+
+
+def publish_tags(session: 'Session') -> None:
+    tags = session.info.pop(PENDING_TAGS, None)
+    if tags:
+        publish(frozenset(tags))
+
+
+def discard_tags(
+    session:     'Session',
+    transaction: 'SessionTransaction'
+) -> None:
+    # NOTE: This runs after after_commit, so if the tags are still
+    #       around the transaction has been rolled back. Savepoints
+    #       are ignored, since the outer transaction may still commit
+    #       changes that were flushed before the savepoint.
+    if transaction.parent is None:
+        session.info.pop(PENDING_TAGS, None)
+
+
+def register_invalidation(session_factory: 'sessionmaker[Any]') -> None:
+    # NOTE: We can't use event.contains for this check, since it compares
+    #       targets by id, which gets reused once an earlier factory has
+    #       been garbage collected
+    if getattr(session_factory, REGISTERED, False):
+        return
+
+    event.listen(session_factory, 'after_flush', collect_tags)
+    event.listen(session_factory, 'after_commit', publish_tags)
+    event.listen(session_factory, 'after_transaction_end', discard_tags)
+    setattr(session_factory, REGISTERED, True)
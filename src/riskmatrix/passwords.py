@@ -0,0 +1,144 @@
+"""
+Password hashing using bcrypt.
+
+bcrypt is deliberately slow, so a burst of logins can easily occupy all
+the worker threads of the server. We therefore only let a limited number
+of password operations run at the same time and reject new attempts if
+no slot frees up within a short timeout.
+
+NOTE: The hashing runs in the worker thread that handles the request,
+      bcrypt releases the GIL, so there is nothing to gain by handing
+      it to another thread. `max_concurrency` therefore needs to be
+      smaller than the number of threads of the server, otherwise a
+      burst of logins still ties up all of them.
+"""
+import bcrypt
+from threading import BoundedSemaphore
+from time import perf_counter
+
+from riskmatrix.instrumentation.metrics import Counter
+from riskmatrix.instrumentation.metrics import Histogram
+
+
+from typing import TypeVar, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pyramid.config import Configurator
+
+_T = TypeVar('_T')
+
+
+DEFAULT_ROUNDS = 12
+# NOTE: waitress uses four threads by default
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_QUEUE_TIMEOUT = 0.5
+
+bcrypt_queue_duration = Histogram(
+    'riskmatrix_bcrypt_queue_seconds',
+    'Time a password operation spent waiting for a free bcrypt slot.',
+    ('operation',)
+)
+bcrypt_duration = Histogram(
+    'riskmatrix_bcrypt_duration_seconds',
+    'Time spent hashing or verifying a password.',
+    ('operation',)
+)
+bcrypt_rejections = Counter(
+    'riskmatrix_bcrypt_rejections_total',
+    'Number of password operations rejected since all slots were busy.',
+    ('operation',)
+)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when too many password operations are already in progress.
+    """
+
+
+class PasswordHasher:
+
+    rounds:          int
+    max_concurrency: int
+    queue_timeout:   float
+
+    def __init__(
+        self,
+        rounds:          int = DEFAULT_ROUNDS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        queue_timeout:   float = DEFAULT_QUEUE_TIMEOUT
+    ):
+        self.rounds = rounds
+        self.max_concurrency = max(max_concurrency, 1)
+        self.queue_timeout = queue_timeout
+        self._slots = BoundedSemaphore(self.max_concurrency)
+
+    def run(self, operation: str, func: 'Callable[[], _T]') -> _T:
+        submitted = perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            bcrypt_rejections.inc(operation=operation)
+            raise PasswordHasherBusy()
+
+        started = perf_counter()
+        bcrypt_queue_duration.observe(
+            started - submitted,
+            operation=operation
+        )
+        try:
+            return func()
+        finally:
+            self._slots.release()
+            bcrypt_duration.observe(
+                perf_counter() - started,
+                operation=operation
+            )
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self.run(
+            'hash',
+            lambda: bcrypt.hashpw(password.encode('utf8'), salt)
+        ).decode('utf8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.run(
+            'verify',
+            lambda: bcrypt.checkpw(
+                password.encode('utf8'),
+                hashed.encode('utf8')
+            )
+        )
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # bcrypt hashes look like $2b$<rounds>$<salt and hash>
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
+
+
+def configure_password_hasher(hasher: PasswordHasher) -> None:
+    global password_hasher
+    password_hasher = hasher
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
+
+
+def includeme(config: 'Configurator') -> None:
+    settings = config.get_settings()
+    configure_password_hasher(PasswordHasher(
+        rounds=int(settings.get('bcrypt.rounds', DEFAULT_ROUNDS)),
+        max_concurrency=int(settings.get(
+            'bcrypt.max_concurrency',
+            DEFAULT_MAX_CONCURRENCY
+        )),
+        queue_timeout=float(settings.get(
+            'bcrypt.queue_timeout',
+            DEFAULT_QUEUE_TIMEOUT
+        ))
+    ))
@@ -1,15 +1,24 @@
 from pyramid.httpexceptions import HTTPForbidden
 
+from riskmatrix.models import Organization
+from riskmatrix.security import authenticated_identity
+
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from pyramid.interfaces import IRequest
 
-    from riskmatrix.models import Organization
-
 
-def organization_factory(request: 'IRequest') -> 'Organization':
-    if not request.user:
+def organization_factory(request: 'IRequest') -> Organization:
+    identity = authenticated_identity(request)
+    if identity is None:
         raise HTTPForbidden()
 
-    return request.user.organization
+    # NOTE: If the user is already loaded, this won't emit a query
+    organization = request.dbsession.get(
+        Organization,
+        identity.organization_id
+    )
+    if organization is None:
+        raise HTTPForbidden()
+    return organization
@@ -0,0 +1,82 @@
+import argparse
+import logging
+import sys
+import time
+
+from pyramid.paster import bootstrap
+from pyramid.paster import setup_logging
+
+from riskmatrix.mail import IMailer
+from riskmatrix.mail.outbox import drain_outbox
+from riskmatrix.mail.outbox import OutboxSettings
+
+
+from typing import Any, NoReturn
+
+
+logger = logging.getLogger('riskmatrix.scripts.drain_outbox')
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Sends the mails waiting in the outbox'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--watch',
+        type=float,
+        metavar='SECONDS',
+        help='Keep running and check for new mails in the given interval'
+    )
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--max-attempts', type=int, default=8)
+    return parser.parse_args(argv[1:])
+
+
+def drain(
+    env:      dict[str, Any],
+    mailer:   IMailer,
+    settings: OutboxSettings
+) -> None:
+
+    request = env['request']
+    while True:
+        with request.tm:
+            processed = drain_outbox(request.dbsession, mailer, settings)
+        if processed < settings.batch_size:
+            # the outbox is empty, or only contains mails to retry later
+            return
+
+
+def watch(
+    env:      dict[str, Any],
+    mailer:   IMailer,
+    settings: OutboxSettings,
+    interval: float
+) -> NoReturn:
+
+    while True:
+        try:
+            drain(env, mailer, settings)
+        except Exception:
+            # NOTE: We keep running, e.g. if the database is briefly
+            #       unavailable, the next round will try again
+            logger.exception('Failed to drain the outbox')
+        time.sleep(interval)
+
+
+def main(argv: list[str] = sys.argv) -> None:
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = OutboxSettings(
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts
+    )
+    with bootstrap(args.config_uri) as env:
+        mailer = env['registry'].getUtility(IMailer)
+        if args.watch:
+            watch(env, mailer, settings, args.watch)
+        drain(env, mailer, settings)
@@ -1,11 +1,25 @@
 from sqlalchemy.orm import object_session
 
+from riskmatrix.cache import process_cache
 from riskmatrix.models import User
+from riskmatrix.orm.invalidation import has_pending_changes
 
 
-from typing import TYPE_CHECKING
+from typing import NamedTuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from pyramid.interfaces import IRequest
+    from sqlalchemy.orm import Session
+
+
+class Identity(NamedTuple):
+    """
+    The immutable parts of an authenticated user which are needed on
+    every request, so they can be cached across requests.
+    """
+    user_id:         str
+    organization_id: str
+    groups:          tuple[str, ...]
+    locale:          str
 
 
 def query_user(user_id: str, request: 'IRequest') -> User | None:
@@ -26,3 +40,40 @@ def query_user(user_id: str, request: 'IRequest') -> User | None:
 def authenticated_user(request: 'IRequest') -> User | None:
     user_id = request.authenticated_userid
     return query_user(user_id, request)
+
+
+# NOTE: The time to live bounds how long other workers may use stale
+#       identities when the in-memory cache backend is used
+@process_cache(
+    maxsize=4096,
+    ttl=60,
+    key=lambda user_id, session: user_id,
+    tags=lambda user_id, session: [f'user:{user_id}'],
+    result_tags=lambda identity: (
+        [f'organization:{identity.organization_id}'] if identity else []
+    ),
+    bypass=lambda user_id, session: has_pending_changes(session)
+)
+def query_identity(user_id: str, session: 'Session') -> Identity | None:
+    user = session.get(User, user_id)
+    if user is None:
+        return None
+
+    return Identity(
+        user_id=user.id,
+        organization_id=user.organization_id,
+        groups=tuple(user.groups()),
+        locale=user.organization.locale
+    )
+
+
+def authenticated_identity(request: 'IRequest') -> Identity | None:
+    """
+    Returns the cached identity of the authenticated user. Unlike
+    :func:`authenticated_user` this usually doesn't need to query the
+    database.
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        return None
+    return query_identity(user_id, request.dbsession)
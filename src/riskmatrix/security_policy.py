@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from pyramid.authorization import ACLAllowed
 from pyramid.authorization import ACLDenied
 from pyramid.authorization import Allow
@@ -8,7 +9,9 @@ from pyramid.interfaces import ISecurityPolicy
 from pyramid.util import is_nonstr_iter
 from zope.interface import implementer
 
-from riskmatrix.cache import request_cache
+from riskmatrix.cache import request_bound_cache
+from riskmatrix.orm.acl import OrganizationACLMixin
+from riskmatrix.security import query_identity
 from riskmatrix.security import query_user
 
 
@@ -28,6 +31,19 @@ class PasswordException(Exception):
     pass
 
 
+@lru_cache(maxsize=4096)
+def organization_permits(
+    principals:      frozenset[str],
+    organization_id: str,
+    permission:      str
+) -> bool:
+    """
+    Decides permissions for an :class:`OrganizationACLMixin` context
+    without building and scanning its ACL.
+    """
+    return permission == 'view' and f'org_{organization_id}' in principals
+
+
 @implementer(ISecurityPolicy)
 class SessionSecurityPolicy:
 
@@ -47,7 +63,7 @@ class SessionSecurityPolicy:
             timeout = int(timeout)
         self.timeout = timeout
 
-    @request_cache()
+    @request_bound_cache()
     def acl(self, context: Any, request: 'IRequest') -> list['ACL']:
         if not hasattr(context, '__acl__'):
             return [DENY_ALL]
@@ -59,15 +75,25 @@ class SessionSecurityPolicy:
         if hasattr(request.session, 'regenerate_id'):
             request.session.regenerate_id()
 
-    @request_cache()
+    @request_bound_cache()
     def principals(self, request: 'IRequest') -> list[str]:
-        user = self.identity(request)
-        if user:
-            principals = [Authenticated, f'user:{user.id}']
-            principals.extend(user.groups())
+        user_id = self.authenticated_userid(request)
+        if user_id is None:
+            return []
+
+        # NOTE: We use the cached identity, so we don't need to load
+        #       the user unless the view actually needs it
+        identity = query_identity(user_id, request.dbsession)
+        if identity:
+            principals = [Authenticated, f'user:{identity.user_id}']
+            principals.extend(identity.groups)
             return principals
         return []
 
+    @request_bound_cache()
+    def principal_set(self, request: 'IRequest') -> frozenset[str]:
+        return frozenset(self.principals(request))
+
     def authenticated_userid(self, request: 'IRequest') -> str | None:
         last_accessed = getattr(request.session, 'last_accessed', None)
         timeout = request.session.get(self.timeout_key, None)
@@ -113,8 +139,25 @@ class SessionSecurityPolicy:
         permission: str
     ) -> 'ACLPermitsResult':
 
+        # NOTE: Fast path for contexts with the default organization ACL
+        acl_method = getattr(type(context), '__acl__', None)
+        if acl_method is OrganizationACLMixin.__acl__:
+            organization_id = context.acl_organization_id
+            principals = self.principal_set(request)
+            allowed = organization_permits(
+                principals,
+                organization_id,
+                permission
+            )
+            ace = (Allow, f'org_{organization_id}', ['view'])
+            if allowed:
+                return ACLAllowed(ace, [ace], permission, principals, context)
+            return ACLDenied(
+                '<default deny>', [ace], permission, principals, context
+            )
+
         acl = self.acl(context, request)
-        principals = self.principals(request)
+        principals = self.principal_set(request)
         for ace in acl:
             ace_action, ace_principal, ace_permissions = ace
             if ace_principal in principals:
@@ -0,0 +1,134 @@
+"""
+Session factories.
+
+By default sessions are stored by beaker, which is configured through
+the ``session.*`` settings. Storing them on disk with ``session.type =
+file`` requires a lock file and pickling to disk on every request and
+a shared directory once there is more than one host.
+
+With ``session.type = encrypted_cookie`` the whole session is stored in
+the cookie itself instead. It is encrypted and authenticated using a key
+derived from ``session.secret``, so clients can neither read nor modify
+it, but the session has to stay small (browsers drop cookies larger than
+4KB) and it can't be invalidated on the server.
+"""
+import logging
+import pickle  # nosec: B403
+from base64 import urlsafe_b64encode
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from pyramid.session import BaseCookieSessionFactory
+from pyramid.settings import asbool
+from pyramid_beaker import session_factory_from_settings as beaker_factory
+
+
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pyramid.interfaces import IRequest
+    from pyramid.interfaces import ISession
+
+    SessionFactory = Callable[[IRequest], ISession]
+
+
+logger = logging.getLogger('riskmatrix.session')
+
+# browsers ignore cookies that are larger than this
+MAX_COOKIE_SIZE = 4093
+
+
+def derive_key(secret: str) -> bytes:
+    return urlsafe_b64encode(HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'riskmatrix.session'
+    ).derive(secret.encode('utf-8')))
+
+
+class EncryptedSerializer:
+    """
+    Serializes the session state into an encrypted and authenticated
+    token using Fernet.
+
+    NOTE: We use pickle like beaker does, so translation strings in
+          flash messages keep their mapping. This is safe since we only
+          unpickle tokens that have been created using our secret.
+    """
+
+    def __init__(self, secret: str):
+        self.fernet = Fernet(derive_key(secret))
+
+    def dumps(self, appstruct: Any) -> bytes:
+        token = self.fernet.encrypt(pickle.dumps(appstruct))
+        if len(token) > MAX_COOKIE_SIZE:
+            logger.warning(
+                f'Session cookie is {len(token)} bytes, browsers will '
+                f'likely refuse to store it'
+            )
+        return token
+
+    def loads(self, bstruct: bytes) -> Any:
+        try:
+            data = self.fernet.decrypt(bstruct)
+        except InvalidToken as exception:
+            # pyramid drops the session on a ValueError
+            raise ValueError('Invalid session cookie') from exception
+        return pickle.loads(data)  # nosec: B301
+
+
+def encrypted_cookie_session_factory(
+    settings: dict[str, Any]
+) -> 'SessionFactory':
+
+    def setting(name: str, default: Any = None) -> Any:
+        return settings.get(f'session.{name}', default)
+
+    def optional_int(name: str, default: int | None = None) -> int | None:
+        value = setting(name)
+        if value is None or value == '':
+            return default
+        return int(value)
+
+    secret = setting('secret')
+    if not secret:
+        raise ValueError('Encrypted cookie sessions require session.secret')
+
+    expires = str(setting('cookie_expires', '')).strip()
+
+    factory = BaseCookieSessionFactory(
+        EncryptedSerializer(secret),
+        cookie_name=setting('key', 'session'),
+        # NOTE: We reuse beaker's setting for the lifetime of the cookie,
+        #       which may also be a boolean to expire it with the browser
+        max_age=int(expires) if expires.isdigit() else None,
+        path=setting('cookie_path', '/'),
+        domain=setting('cookie_domain') or None,
+        secure=asbool(setting('secure', False)),
+        httponly=asbool(setting('httponly', True)),
+        samesite=setting('samesite', 'Lax'),
+        timeout=optional_int('timeout'),
+        reissue_time=optional_int('reissue_time', 0),
+        set_on_exception=asbool(setting('cookie_on_exception', True)),
+    )
+
+    class EncryptedCookieSession(factory):  # type:ignore[valid-type,misc]
+
+        @property
+        def last_accessed(self) -> float | None:
+            # NOTE: Matches beaker, SessionSecurityPolicy uses this to
+            #       expire inactive logins
+            return None if self.new else self.renewed
+
+    return EncryptedCookieSession
+
+
+def session_factory_from_settings(
+    settings: dict[str, Any]
+) -> 'SessionFactory':
+
+    if settings.get('session.type') == 'encrypted_cookie':
+        return encrypted_cookie_session_factory(settings)
+    return beaker_factory(settings)
@@ -221,24 +221,62 @@ $(document).ready(function () {
     var save_button = $("button#generate-risks")[0];
     title.text(catalogs[idx].title);
 
-    function initiateGeneration(catalog) {
-        console.log(catalog)
-        console.log("Fetching data...");
-        title.text("Generating risks for '" + catalog.name + "' catalog..");
-        // Initialize a variable to accumulate received text
-        let accumulatedText = '';
-
-        // Function to update the modal body with new text
-        function updateModalBody(newText) {
-            // Remove all contents from div.modal-body
-            $("#generate-risks-xhr div.modal-body").empty();
-            const htmlContent = marked.parse(newText, { gfm: true });
-            // Insert the parsed HTML into div.modal-body
-            $("#generate-risks-xhr div.modal-body").html(htmlContent);
+    // Generated text and state by catalog id, the risks for all the
+    // catalogs are generated at once, while the user reviews them
+    // one catalog at a time.
+    var generated = {};
+    var finished = {};
+
+    // Function to update the modal body with new text
+    function updateModalBody(newText) {
+        // Remove all contents from div.modal-body
+        $("#generate-risks-xhr div.modal-body").empty();
+        const htmlContent = marked.parse(newText, { gfm: true });
+        // Insert the parsed HTML into div.modal-body
+        $("#generate-risks-xhr div.modal-body").html(htmlContent);
+    }
+
+    function showCatalog(catalog) {
+        if (finished[catalog.id]) {
+            save_button.disabled = false;
+            title.text("Generated Risks for '" + catalog.name + "' catalog");
+        } else {
+            save_button.disabled = true;
+            title.text("Generating risks for '" + catalog.name + "' catalog..");
         }
+        updateModalBody(generated[catalog.id] || 'Awaiting magician response...');
+    }
 
+    function handleEvent(message) {
+        var event = 'message';
+        var data = '';
+        message.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) {
+                event = line.slice(7);
+            } else if (line.startsWith('data: ')) {
+                data += line.slice(6);
+            }
+        });
+        data = JSON.parse(data);
+        if (event === 'chunk') {
+            generated[data.catalog] = (generated[data.catalog] || '') + data.text;
+        } else {
+            if (event === 'error') {
+                console.error("Failed to generate risks for catalog", data.catalog);
+                if (!generated[data.catalog]) {
+                    generated[data.catalog] = 'The risks could not be generated, please try again later.';
+                }
+            }
+            finished[data.catalog] = true;
+        }
+        if (idx < catalogs.length && data.catalog === catalogs[idx].id) {
+            showCatalog(catalogs[idx]);
+        }
+    }
+
+    function initiateGeneration() {
         // Using the Fetch API to handle the streaming response
-        fetch('/risk_catalog/generate/stream', {
+        fetch('/risk_catalog/generate/stream/batch', {
             method: 'POST',
             headers: {
                 'X-CSRF-Token': csrf_token,
@@ -246,31 +284,36 @@ $(document).ready(function () {
             },
             body: JSON.stringify({
                 answers,
-                catalog
+                catalogs
             }),
         }).then(response => {
-            updateModalBody('Awaiting magician response...')
-            save_button.disabled = true;
+            if (!response.ok) {
+                throw new Error("Unexpected response status " + response.status);
+            }
             const reader = response.body.getReader();
+            const decoder = new TextDecoder("utf-8");
+            let buffer = '';
 
-            // Function to process the stream
-            (async function readStream() {
+            // Function to process the stream, events are separated
+            // by an empty line
+            return (async function readStream() {
                 while (true) {
                     const { done, value } = await reader.read();
                     if (done) break;
-                    let textChunk = new TextDecoder("utf-8").decode(value);
-                    accumulatedText += textChunk; // Accumulate the new text chunk
-                    updateModalBody(accumulatedText); // Update the modal body with the new accumulated text
+                    buffer += decoder.decode(value, { stream: true });
+                    let end;
+                    while ((end = buffer.indexOf('\n\n')) >= 0) {
+                        handleEvent(buffer.slice(0, end));
+                        buffer = buffer.slice(end + 2);
+                    }
                 }
-                save_button.disabled = false;
-                title.text("Generated Risks for '" + catalog.name + "' catalog");
             })();
         }).catch(error => {
             console.error("Error fetching data:", error);
+            save_button.disabled = true;
+            title.text("Failed to generate risks");
+            updateModalBody('The risks could not be generated, please try again later.');
         });
-
-
-
     }
     $("button#generate-risks").on('click', function (event) {
         event.preventDefault();
@@ -293,42 +336,35 @@ $(document).ready(function () {
             if (isChecked) {
                 // Construct the risk object and add it to the 'risks' array
                 risks.push({
+                    catalog_id: catalogs[idx].id,
                     name: name,
                     description: description,
-                    catalog: catalogs[idx],
                 });
             }
         });
 
 
-        Promise.all(risks.map(risk => {
-
-
-            // make post request to /risk_catalog/{id}/add
-            return fetch('/risks_catalog/' + catalogs[idx].id + '/add', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRF-Token': csrf_token,
-                    'X-Requested-With': 'XMLHttpRequest' // Mark the request as an AJAX request
-                },
-                body: JSON.stringify(risk),
-            }).then(response => {
-                return response.json();
-            }).then(data => {
-                risks = [];
-            }).catch(error => {
-                console.error("Error fetching data:", error);
-            }).finally(() => {
-            });
-        })).then(() => {
+        // add all the selected risks of this catalog in a single request
+        fetch('/risks/add', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRF-Token': csrf_token,
+                'X-Requested-With': 'XMLHttpRequest' // Mark the request as an AJAX request
+            },
+            body: JSON.stringify(risks),
+        }).then(response => {
+            return response.json();
+        }).catch(error => {
+            console.error("Error fetching data:", error);
+        }).then(() => {
             idx += 1;
             if (idx >= catalogs.length) {
                 console.log("No more catalogs to process");
                 $('div.modal#generate-risks-xhr').modal('hide');
                 return;
             }
-            initiateGeneration(catalogs[idx]);
+            showCatalog(catalogs[idx]);
         })
 
 
@@ -336,5 +372,6 @@ $(document).ready(function () {
     });
 
 
-    initiateGeneration(catalogs[idx]);
+    initiateGeneration();
+    showCatalog(catalogs[idx]);
 });
@@ -1,14 +1,27 @@
 from pyramid.events import NewRequest
 from pyramid.events import NewResponse
 import secrets
+from functools import lru_cache
 
-from typing import TYPE_CHECKING
+from typing import NamedTuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from pyramid.config import Configurator
     from pyramid.interfaces import IRequest
 
 
-def default_csp_directives(request: 'IRequest') -> dict[str, str]:
+# NOTE: Placeholder for the nonce in the compiled header
+NONCE_SLOT = '\x00'
+
+
+def default_csp_directives(
+    sentry_dsn: str | None,
+    nonce:      str | None
+) -> dict[str, str]:
+
+    script_src = "'self' blob: resource:"
+    if nonce is not None:
+        script_src = f"'self' 'nonce-{nonce}' blob: resource:"
+
     directives = {
         "base-uri": "'self'",
         "child-src": "blob:",
@@ -19,11 +32,10 @@ def default_csp_directives(request: 'IRequest') -> dict[str, str]:
         "frame-ancestors": "'none'",
         "img-src":  "'self' data: blob:",
         "object-src": "'self'",
-        "script-src": f"'self' 'nonce-{request.csp_nonce}' blob: resource:",
+        "script-src": script_src,
         "style-src": "'self' 'unsafe-inline'",
     }
 
-    sentry_dsn = request.registry.settings.get('sentry_dsn')
     if sentry_dsn:
         key = sentry_dsn.split('@')[0].split('/')[-1].split(':')[0]
         host = sentry_dsn.split('@')[1].split('/')[0]
@@ -34,12 +46,47 @@ def default_csp_directives(request: 'IRequest') -> dict[str, str]:
     return directives
 
 
+class CSPTemplate(NamedTuple):
+    # the header split at the nonce
+    before_nonce: str
+    after_nonce:  str
+    # the header for responses without a nonce
+    without_nonce: str
+
+    def render(self, nonce: str | None) -> str:
+        if nonce is None:
+            return self.without_nonce
+        return f'{self.before_nonce}{nonce}{self.after_nonce}'
+
+
+def join_directives(directives: dict[str, str]) -> str:
+    return '; '.join([f'{k} {v}' for k, v in directives.items()])
+
+
+@lru_cache(maxsize=8)
+def compile_csp(sentry_dsn: str | None) -> CSPTemplate:
+    """
+    Builds the header once, only the nonce differs between requests.
+    """
+    before, after = join_directives(
+        default_csp_directives(sentry_dsn, NONCE_SLOT)
+    ).split(NONCE_SLOT)
+    return CSPTemplate(
+        before,
+        after,
+        join_directives(default_csp_directives(sentry_dsn, None))
+    )
+
+
 def csp_header(event: NewResponse) -> None:
     response = event.response
     if 'Content-Security-Policy' not in response.headers:
-        directives = default_csp_directives(event.request)
-        csp = '; '.join([f'{k} {v}' for k, v in directives.items()])
-        response.headers['Content-Security-Policy'] = csp
+        request = event.request
+        template = compile_csp(request.registry.settings.get('sentry_dsn'))
+        # NOTE: The nonce is only generated when the response needs it,
+        #       i.e. if the request accessed it to render a script tag
+        nonce = request.__dict__.get('csp_nonce')
+        response.headers['Content-Security-Policy'] = template.render(nonce)
 
 
 def sentry_context(event: NewRequest) -> None:
@@ -50,12 +97,12 @@ def sentry_context(event: NewRequest) -> None:
         with configure_scope() as scope:
             scope.user = {'id': request.user.id}
 
-def request_nonce_generator(event: 'NewRequest') -> None:
-    request = event.request
-    request.set_property(lambda r: secrets.token_urlsafe(), 'csp_nonce', reify=True)
+
+def csp_nonce(request: 'IRequest') -> str:
+    return secrets.token_urlsafe()
 
 
 def includeme(config: 'Configurator') -> None:
     config.add_subscriber(csp_header, NewResponse)
-    config.add_subscriber(request_nonce_generator, NewRequest)
+    config.add_request_method(csp_nonce, 'csp_nonce', reify=True)
     config.add_subscriber(sentry_context, NewRequest)
@@ -1,17 +1,22 @@
 import pyramid.testing as testing
+from contextlib import contextmanager
 from webob.acceptparse import accept_language_property
 from webob.multidict import MultiDict
 from zope.interface.verify import verifyClass
 
 from riskmatrix.flash import MessageQueue
 from riskmatrix.i18n import _
+from riskmatrix.instrumentation import count_queries
 from riskmatrix.security import authenticated_user
 
 
 from typing import Any, TYPE_CHECKING
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from zope.interface import Interface
 
+    from riskmatrix.instrumentation import QueryStats
+
     from riskmatrix.models import User
 
 
@@ -50,6 +55,24 @@ def verify_interface(klass: type[object], interface: 'Interface') -> None:
     assert verifyClass(interface, klass)
 
 
+@contextmanager
+def assert_max_queries(budget: int) -> 'Iterator[QueryStats]':
+    """
+    Asserts that no more than `budget` statements are executed within
+    the context.
+    """
+    with count_queries() as stats:
+        yield stats
+
+    statements = '\n'.join(
+        f'{count}x {shape}' for shape, count in stats.shapes.most_common()
+    )
+    assert stats.count <= budget, (
+        f'Executed {stats.count} queries, expected at most {budget}:\n'
+        f'{statements}'
+    )
+
+
 # translation strings used for testing
 _('Just a test')
 _('<b>bold</b>', markup=True)
@@ -15,9 +15,11 @@ from .home import home_view
 from .login import login_view
 from .logout import logout_view
 from .organization import organization_view
+from .risk import add_risks_view
 from .risk import delete_risk_view, generate_risk_completion, stream_risk_generation
 from .risk import edit_risk_view
 from .risk import risks_view
+from .risk import stream_risk_generation_batch
 from .risk_assessment import assess_impact_view
 from .risk_assessment import assess_likelihood_view
 from .risk_assessment import assessment_view
@@ -212,6 +214,18 @@ def includeme(config: 'Configurator') -> None:
         xhr=True
     )
 
+    config.add_route(
+        'stream_risk_generation_batch',
+        '/risk_catalog/generate/stream/batch',
+        factory=organization_factory
+    )
+    config.add_view(
+        stream_risk_generation_batch,
+        route_name='stream_risk_generation_batch',
+        request_method='POST',
+        xhr=True
+    )
+
     config.add_route(
         'add_catalog',
         '/risks_catalog/add',
@@ -300,6 +314,19 @@ def includeme(config: 'Configurator') -> None:
         xhr=True
     )
 
+    config.add_route(
+        'add_risks',
+        '/risks/add',
+        factory=organization_factory
+    )
+    config.add_view(
+        add_risks_view,
+        route_name='add_risks',
+        renderer='json',
+        request_method='POST',
+        xhr=True
+    )
+
     config.add_route(
         'edit_risk',
         '/risks/{id}/edit',
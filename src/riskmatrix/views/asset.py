@@ -7,6 +7,7 @@ from wtforms import StringField
 from wtforms import TextAreaField
 from wtforms import validators
 
+from riskmatrix.cache import process_cache
 from riskmatrix.controls import Button
 from riskmatrix.models import Asset
 from riskmatrix.models import Risk
@@ -17,12 +18,14 @@ from riskmatrix.data_table import DataColumn
 from riskmatrix.data_table import maybe_escape
 from riskmatrix.i18n import _
 from riskmatrix.i18n import translate
+from riskmatrix.orm.invalidation import has_pending_changes
 from riskmatrix.static import xhr_edit_js
 from riskmatrix.wtform import Form
 
 
 from typing import Any, TYPE_CHECKING
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from pyramid.interfaces import IRequest
     from sqlalchemy.orm import Session
     from sqlalchemy.orm.query import Query
@@ -39,11 +42,22 @@ if TYPE_CHECKING:
 
 
 # NOTE: Eventually this should return a nested dict to represent
-#       the nested risk catalog tree
+#       the nested risk catalog tree. Invalidations only reach the
+#       worker that committed with the in-memory cache backend, so the
+#       time to live bounds how long other workers show stale choices
+@process_cache(
+    maxsize=256,
+    ttl=60,
+    key=lambda organization_id, session: organization_id,
+    tags=lambda organization_id, session: [
+        f'org:{organization_id}:risk_catalog'
+    ],
+    bypass=lambda organization_id, session: has_pending_changes(session)
+)
 def catalog_choices(
     organization_id: str,
     session: 'Session'
-) -> list['_Choice']:
+) -> 'Sequence[_Choice]':
 
     query = session.query(
         RiskCatalog.id,
@@ -52,10 +66,12 @@ def catalog_choices(
     query = query.filter(RiskCatalog.organization_id == organization_id)
     query = query.order_by(RiskCatalog.name.asc())
 
-    return [
+    # NOTE: The result is shared between requests, so it shouldn't
+    #       be mutable
+    return tuple(
         (catalog_id, catalog_name)
         for catalog_id, catalog_name in query
-    ]
+    )
 
 
 class AssetForm(Form):
@@ -7,6 +7,7 @@ from wtforms import StringField
 from wtforms import validators
 
 from riskmatrix.models import User
+from riskmatrix.passwords import PasswordHasherBusy
 
 
 from typing import TYPE_CHECKING
@@ -46,7 +47,18 @@ def login_view(request: 'IRequest') -> 'RenderDataOrRedirect':
         query = session.query(User)
         query = query.filter(User.email.ilike(login))
         user = query.first()
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except PasswordHasherBusy:
+            request.response.status_int = 503
+            request.response.headers['Retry-After'] = '5'
+            request.messages.add(
+                'Too many login attempts, please try again in a moment.',
+                'error'
+            )
+            return {'form': form}
+
+        if user and valid:
             next_url = request.route_url('home')
             user.last_login = utcnow()
             headers = remember(request, user.id)
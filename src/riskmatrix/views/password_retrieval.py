@@ -5,7 +5,7 @@ from wtforms import Form
 from wtforms import StringField
 from wtforms.validators import InputRequired
 
-from ..mail import IMailer
+from ..mail.outbox import enqueue_template_mail
 from ..models import PasswordChangeToken
 from ..models import User
 from ..security_policy import PasswordException
@@ -59,20 +59,20 @@ def mail_retrieval(email: str, request: 'IRequest') -> None:
     session.add(token_obj)
     session.flush()
 
-    mailer = request.registry.getUtility(IMailer)
-    mailer.send_template(
-        sender=None,  # This mail doesn't need a reply-to
-        receivers=Address(user.fullname, addr_spec=user.email),
-        template='password-reset',
-        data={
+    # NOTE: The mail is sent by the drain-outbox worker once the token
+    #       has been committed, this mail doesn't need a reply-to
+    enqueue_template_mail(session, {
+        'receivers': Address(user.fullname, addr_spec=user.email),
+        'template': 'password-reset',
+        'data': {
             'name': user.fullname,
             'action_url': request.route_url(
                 'password_change',
                 _query={'token': token_obj.token}
             )
         },
-        tag='password-reset',
-    )
+        'tag': 'password-reset',
+    })
 
 
 def password_retrieval_view(request: 'IRequest') -> 'RenderDataOrRedirect':
@@ -1,12 +1,21 @@
+import logging
 from markupsafe import Markup
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.httpexceptions import HTTPConflict
 from pyramid.httpexceptions import HTTPFound
+from sedate import utcnow
 from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from uuid import uuid4
 from wtforms import SelectField
 from wtforms import StringField
 from wtforms import TextAreaField
 from wtforms import validators
 from pyramid.response import Response
 
+from riskmatrix.cache import stream_cache
 from riskmatrix.controls import Button
 from riskmatrix.models import Risk
 from riskmatrix.models import RiskCategory, RiskCatalog
@@ -15,7 +24,12 @@ from riskmatrix.data_table import DataColumn
 from riskmatrix.data_table import maybe_escape
 from riskmatrix.i18n import _
 from riskmatrix.i18n import translate
+from riskmatrix.instrumentation.metrics import llm_stream_duration
+from riskmatrix.llm import generation_key
+from riskmatrix.llm import get_generation_pool
+from riskmatrix.llm import llm_model
 from riskmatrix.models.organization import Organization
+from riskmatrix.orm.invalidation import invalidate_on_commit
 from riskmatrix.static import xhr_edit_js
 from riskmatrix.views.risk_catalog import RiskCatalogForm, RiskCatalogGenerationForm, RiskCatalogTable
 from riskmatrix.wtform import Form
@@ -24,6 +38,7 @@ import re
 
 from typing import Any, TYPE_CHECKING
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from collections.abc import Iterator
     from pyramid.interfaces import IRequest
     from sqlalchemy.orm import Session
@@ -41,6 +56,9 @@ if TYPE_CHECKING:
     _Q = TypeVar('_Q', bound=Query[Any])
 
 
+logger = logging.getLogger('riskmatrix.views.risk')
+
+
 # FIXME: currently we only render the top-level and the leaves
 #        since optgroup only supports one level of nesting, maybe
 #        we should restrict categories to the same? However the
@@ -334,6 +352,103 @@ def edit_risk_view(
             'target_url': target_url,
         }
 
+
+# NOTE: Keeps the number of bound parameters of the insert well within
+#       the limits of the database
+MAX_BULK_RISKS = 500
+# NOTE: The length of Risk.name, longer names fail the insert
+MAX_RISK_NAME_LENGTH = 256
+
+
+def add_risks_view(
+    context: 'Organization',
+    request: 'IRequest'
+) -> dict[str, Any]:
+    """
+    Adds a list of `{catalog_id, name, description}` risks at once.
+
+    Risks whose name is already taken within the organization, including
+    by deleted risks, are skipped. Returns the ids of the added risks.
+
+    Responds with a 409 if a concurrent request added one of the names
+    in the meantime.
+    """
+    try:
+        items = request.json
+    except ValueError:
+        raise HTTPBadRequest() from None
+
+    if not isinstance(items, list) or len(items) > MAX_BULK_RISKS:
+        raise HTTPBadRequest()
+
+    for item in items:
+        if not (
+            isinstance(item, dict)
+            and isinstance(item.get('catalog_id'), str)
+            and isinstance(item.get('name'), str)
+            and item['name'].strip()
+            and len(item['name'].strip()) <= MAX_RISK_NAME_LENGTH
+            and isinstance(item.get('description') or '', str)
+        ):
+            raise HTTPBadRequest()
+
+    session = request.dbsession
+    catalog_ids = {item['catalog_id'] for item in items}
+    if catalog_ids and len(catalog_ids) != session.scalar(
+        select(func.count(RiskCatalog.id)).where(
+            RiskCatalog.id.in_(catalog_ids),
+            RiskCatalog.organization_id == context.id
+        )
+    ):
+        raise HTTPBadRequest()
+
+    names = {item['name'].strip() for item in items}
+    existing = set(session.scalars(
+        select(Risk.name).where(
+            Risk.organization_id == context.id,
+            Risk.name.in_(names)
+        ).execution_options(include_deleted=True)
+    )) if names else set()
+
+    now = utcnow()
+    rows: list[dict[str, Any]] = []
+    for item in items:
+        name = item['name'].strip()
+        if name in existing:
+            continue
+
+        # the first risk with a given name wins
+        existing.add(name)
+        rows.append({
+            'id': str(uuid4()),
+            'organization_id': context.id,
+            'catalog_id': item['catalog_id'],
+            'name': name,
+            'description': item.get('description') or None,
+            'meta': {},
+            'created': now,
+        })
+
+    if rows:
+        # NOTE: A single multi-row INSERT, this bypasses the unit of work
+        #       so we need to publish the invalidation tags ourselves
+        try:
+            session.execute(insert(Risk).values(rows))
+        except IntegrityError:
+            # NOTE: Another request added one of the names after we looked
+            #       for the existing ones, the unique constraint caught it
+            raise HTTPConflict() from None
+        invalidate_on_commit(
+            session,
+            f'organization:{context.id}',
+            f'org:{context.id}:risk',
+            *(f'risk:{row["id"]}' for row in rows),
+            *(f'risk_catalog:{catalog_id}' for catalog_id in catalog_ids)
+        )
+        request.response.status_int = 201
+
+    return {'ids': [row['id'] for row in rows]}
+
 import json
 
 sys_prompts = {
@@ -398,43 +513,194 @@ few_shot_examples = {
 
 }
 
-from langchain_core.messages import HumanMessage, SystemMessage
 
-def stream_risk_generation(context: 'Organization', request: 'IRequest') -> Any:
-    req_catalog = request.json['catalog']
-    existing_catalog: RiskCatalog | None = request.dbsession.query(RiskCatalog).filter_by(
-        name=req_catalog['name'], organization_id=context.id
+# NOTE: Generations are cached by model, prompt, organization, catalog and
+#       answers, so re-opening the generation modal replays the previous
+#       suggestions. They are never shared between organizations.
+@stream_cache(maxsize=512, ttl=24 * 60 * 60, key=lambda key, stream: key)
+def cached_generation(
+    key:    str,
+    stream: 'Callable[[], Iterator[str]]'
+) -> 'Iterator[str]':
+    return stream()
+
+
+def get_or_create_catalog(
+    context: 'Organization',
+    request: 'IRequest',
+    data:    dict[str, Any]
+) -> RiskCatalog:
+
+    query = request.dbsession.query(RiskCatalog)
+    catalog: RiskCatalog | None = query.filter_by(
+        name=data['name'], organization_id=context.id
     ).first()
-    if existing_catalog:
-        catalog = existing_catalog
-    else:
-        catalog = RiskCatalog(name=req_catalog['name'], organization=context, description=req_catalog['description'])
+    if catalog is None:
+        catalog = RiskCatalog(
+            name=data['name'],
+            organization=context,
+            description=data.get('description')
+        )
         request.dbsession.add(catalog)
         request.dbsession.flush()
         request.dbsession.refresh(catalog)
-    
-    def generate(catalog_name: str, catalog_description: str, email: str, org_name) -> Any:
-        answers = request.json['answers']
-        user_answers = '\n'.join(list(map(lambda answer: f' - **{answer[0]}**: {answer[1]}', answers.items())))
-        examples = '\n'.join(list(map(lambda answer: f' - __{answer["name"]}__: {answer["description"]}', few_shot_examples['risks'])))
-        prompt = f"\n{user_prompts['risks']}\nExamples:\n{examples}\n\nUser-Answers:\n{user_answers}. \n\nCurrent Risk-Catalog:\n - name:{catalog_name}\n - description: {catalog_description}"
+    return catalog
+
+
+def risk_generation(
+    context:   'Organization',
+    request:   'IRequest',
+    catalog:   RiskCatalog,
+    answers:   dict[str, str],
+    endpoint:  str = 'stream_risk_generation'
+) -> 'Callable[[], Iterator[str]]':
+    """
+    Returns a function which streams the generated risks for the given
+    catalog, it may be called from another thread.
+    """
+
+    user_answers = '\n'.join(
+        f' - **{question}**: {answer}'
+        for question, answer in answers.items()
+    )
+    examples = '\n'.join(
+        f' - __{example["name"]}__: {example["description"]}'
+        for example in few_shot_examples['risks']
+    )
+    prompt = (
+        f"\n{user_prompts['risks']}\n"
+        f"Examples:\n{examples}\n\n"
+        f"User-Answers:\n{user_answers}. \n\n"
+        f"Current Risk-Catalog:\n"
+        f" - name:{catalog.name}\n"
+        f" - description: {catalog.description}"
+    )
+    key = generation_key(
+        llm_model(request.registry.settings),
+        prompt,
+        organization_id=context.id,
+        catalog_name=catalog.name,
+        catalog_description=catalog.description,
+        answers=answers
+    )
+    # NOTE: Everything we need from the request is looked up right away,
+    #       since the request can't be shared with other threads
+    llm = request.llm
+    llm_config = {
+        'callbacks': [request.langfuse],
+        'langfuse_user_id': request.user.email,
+        'tags': [context.name]
+    }
+
+    def stream() -> 'Iterator[str]':
+        from langchain_core.messages import HumanMessage
+
+        messages = [
+            #SystemMessage(content=sys_prompts['risks']),
+            HumanMessage(content=prompt)
+        ]
+        with llm_stream_duration.time(endpoint=endpoint):
+            for event in llm.stream(messages, config=llm_config):
+                yield event.content
+
+    return lambda: cached_generation(key, stream)
+
+
+def stream_risk_generation(
+    context: 'Organization',
+    request: 'IRequest'
+) -> Any:
+
+    catalog = get_or_create_catalog(context, request, request.json['catalog'])
+    generation = risk_generation(
+        context,
+        request,
+        catalog,
+        request.json['answers']
+    )
+
+    def generate() -> 'Iterator[bytes]':
         try:
-            messages = [
-                #SystemMessage(content=sys_prompts['risks']),
-                HumanMessage(content=prompt)
-            ]
-            response = request.llm.stream(messages, config={"callbacks":[request.langfuse], "langfuse_user_id": email, "tags": [org_name]})
-            for event in response:
-               yield bytes(event.content, encoding='utf-8')
+            for chunk in generation():
+                yield bytes(chunk, encoding='utf-8')
         except Exception as e:
             raise StopIteration
 
     headers = [('Content-Type', 'text/event-stream'),
                ('Cache-Control', 'no-cache'),]
     response = Response(headerlist=headers)
-    response.app_iter = generate(catalog.name, catalog.description, request.user.email, context.name)
-    return response 
-    
+    response.app_iter = generate()
+    return response
+
+
+def server_sent_event(event: str, data: dict[str, Any]) -> bytes:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+
+def stream_risk_generation_batch(
+    context: 'Organization',
+    request: 'IRequest'
+) -> Any:
+    """
+    Generates the risks for multiple catalogs concurrently and sends
+    them as server-sent events tagged with the id of their catalog.
+
+    Every catalog gets `chunk` events with the generated text followed
+    by either a `done` or an `error` event.
+    """
+    try:
+        body = request.json
+    except ValueError:
+        raise HTTPBadRequest() from None
+
+    if not isinstance(body, dict):
+        raise HTTPBadRequest()
+
+    answers = body.get('answers')
+    catalogs = body.get('catalogs')
+    if not (
+        isinstance(answers, dict)
+        and all(isinstance(answer or '', str) for answer in answers.values())
+        and isinstance(catalogs, list)
+    ):
+        raise HTTPBadRequest()
+
+    for data in catalogs:
+        if not (
+            isinstance(data, dict)
+            and isinstance(data.get('name'), str)
+            and data['name'].strip()
+            and isinstance(data.get('description') or '', str)
+        ):
+            raise HTTPBadRequest()
+
+    generations: 'dict[str, Callable[[], Iterator[str]]]' = {}
+    for data in catalogs:
+        catalog = get_or_create_catalog(context, request, data)
+        generations[catalog.id] = risk_generation(
+            context,
+            request,
+            catalog,
+            answers,
+            endpoint='stream_risk_generation_batch'
+        )
+
+    def generate() -> 'Iterator[bytes]':
+        for event in get_generation_pool().multiplex(generations):
+            data: dict[str, Any] = {'catalog': event.key}
+            if event.event == 'chunk':
+                data['text'] = event.data
+            elif event.event == 'error':
+                logger.warning(f'Failed to generate risks: {event.data!r}')
+            yield server_sent_event(event.event, data)
+
+    headers = [('Content-Type', 'text/event-stream'),
+               ('Cache-Control', 'no-cache'),]
+    response = Response(headerlist=headers)
+    response.app_iter = generate()
+    return response
+
+
 def generate_risk_completion(context: 'Organization', request: 'IRequest') -> 'XHRDataOrRedirect':
     answers_form = RiskCatalogGenerationForm(None, request)
     
@@ -8,9 +8,8 @@ from wtforms import StringField
 from wtforms import TextAreaField
 from wtforms import DateTimeLocalField
 from wtforms.widgets import html_params
-import plotly.graph_objects as go
-import numpy as np
 from datetime import datetime
+import random
 
 from riskmatrix.controls import Button
 from riskmatrix.models import RiskAssessment, RiskMatrixAssessment
@@ -476,6 +475,9 @@ def generate_risk_matrix_compare_view(
 
 
 def plot_risk_matrix(risks: 'Query[RiskMatrixAssessment]') -> str:
+    # NOTE: plotly is expensive to import, so we defer it until we need it
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     # Define the colors for different risk levels
@@ -508,7 +510,8 @@ def plot_risk_matrix(risks: 'Query[RiskMatrixAssessment]') -> str:
             y, x = risk.likelihood - 1, (risk.impact - 1)
 
             # Adjust the position within the cell, ensuring it's within the cell boundaries
-            noise_x, noise_y = np.random.uniform(0.1, 0.9), np.random.uniform(0.1, 0.9)
+            noise_x = random.uniform(0.1, 0.9)  # nosec: B311
+            noise_y = random.uniform(0.1, 0.9)  # nosec: B311
             x, y = float(x) + noise_x, float(y) + noise_y
 
             fig.add_trace(
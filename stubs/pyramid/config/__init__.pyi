@@ -18,6 +18,7 @@ from pyramid.config.rendering import RenderingConfiguratorMixin
 from pyramid.config.routes import RoutesConfiguratorMixin
 from pyramid.config.security import SecurityConfiguratorMixin
 from pyramid.config.settings import SettingsConfiguratorMixin
+from pyramid.config.tweens import TweensConfiguratorMixin
 from pyramid.config.views import _View
 from pyramid.config.views import ViewsConfiguratorMixin
 from pyramid.interfaces import IAuthenticationPolicy
@@ -45,7 +46,7 @@ class Configurator(
     # ActionConfiguratorMixin,
     PredicateConfiguratorMixin,
     # TestingConfiguratorMixin,
-    # TweensConfiguratorMixin,
+    TweensConfiguratorMixin,
     SecurityConfiguratorMixin,
     ViewsConfiguratorMixin,
     RoutesConfiguratorMixin,
@@ -0,0 +1,14 @@
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+
+_TweenFactory = Callable[[Any, Any], Any]
+
+class TweensConfiguratorMixin:
+    def add_tween(
+        self,
+        tween_factory: _TweenFactory | str,
+        under: str | _TweenFactory | Iterable[str | _TweenFactory] | None = ...,
+        over: str | _TweenFactory | Iterable[str | _TweenFactory] | None = ...
+    ) -> None: ...
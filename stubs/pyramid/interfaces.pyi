@@ -165,6 +165,8 @@ class IRequest(Interface, _Request):
 
     messages: MessageQueue
     show_steps: bool
+    # NOTE: Set on first use by the request caches in riskmatrix.cache
+    cache: dict[Any, Any]
 
     response: IResponse
     layout_manager: ILayoutManager
@@ -8,9 +8,9 @@ _T = TypeVar('_T')
 _I = TypeVar('_I', bound=Interface)
 
 
-# NOTE: Technically Registry also derives from dict, but we never
-#       use it like that, so for simplicity, let's not inherit
-class Registry(Components):
+# NOTE: We use the dict part of the registry to share objects like the
+#       session factory between the includes
+class Registry(Components, dict[str, Any]):
     settings: dict[str, Any]
     package_name: str
     def __init__(self, package_name: str = ..., *args: Any, **kw: Any) -> None: ...
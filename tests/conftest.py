@@ -10,6 +10,7 @@ from riskmatrix.orm import Base
 from riskmatrix.orm import get_engine
 from riskmatrix.orm import get_session_factory
 from riskmatrix.orm import get_tm_session
+from riskmatrix.testing import assert_max_queries
 from riskmatrix.testing import DummyRequest
 
 
@@ -113,3 +114,15 @@ def user(config, organization):
     session.refresh(user)
     config.testing_securitypolicy(userid=user.id)
     return user
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Usage::
+
+        with query_budget(2):
+            view(context, request)
+
+    """
+    return assert_max_queries
@@ -0,0 +1,84 @@
+import shutil
+from babel.messages.mofile import read_mo
+from time import perf_counter
+
+from riskmatrix.i18n.catalogs import compile_catalogs
+from riskmatrix.i18n.catalogs import LOCALE_DIR
+from riskmatrix.i18n.catalogs import missing_msgids
+from riskmatrix.i18n.catalogs import read_catalog
+from riskmatrix.i18n.catalogs import uncompiled_translations
+from riskmatrix.i18n.core import make_localizer
+
+
+# NOTE: Loading all the catalogs at startup should be fast, this is
+#       generous enough to not fail on slow CI runners
+LOAD_BUDGET = 0.5
+
+
+def test_catalogs_cover_template():
+    missing = missing_msgids()
+    assert set(missing) == {'de', 'en', 'fr'}
+    for language, msgids in missing.items():
+        assert not msgids, f'{language} is missing {msgids}'
+
+
+def test_catalogs_compiled():
+    for po_path in LOCALE_DIR.glob('*/LC_MESSAGES/*.po'):
+        mo_path = po_path.with_suffix('.mo')
+        assert mo_path.exists(), f'{po_path} has not been compiled'
+
+        with mo_path.open('rb') as fp:
+            compiled = {message.id: message.string for message in read_mo(fp)}
+        for message in read_catalog(po_path):
+            if message.id and message.string and not message.fuzzy:
+                assert compiled.get(message.id) == message.string, (
+                    f'{mo_path} is outdated'
+                )
+
+
+def test_compile_catalogs(tmp_path):
+    messages_dir = tmp_path / 'de' / 'LC_MESSAGES'
+    messages_dir.mkdir(parents=True)
+    shutil.copy(LOCALE_DIR / 'de/LC_MESSAGES/riskmatrix.po', messages_dir)
+
+    mo_path = messages_dir / 'riskmatrix.mo'
+    assert compile_catalogs(tmp_path) == [mo_path]
+    assert compile_catalogs(tmp_path) == []
+    assert compile_catalogs(tmp_path, force=True) == [mo_path]
+
+    with mo_path.open('rb') as fp:
+        catalog = read_mo(fp)
+    assert catalog['Just a test'].string == 'Nur ein Test'
+
+
+def test_uncompiled_translations(tmp_path):
+    messages_dir = tmp_path / 'de' / 'LC_MESSAGES'
+    messages_dir.mkdir(parents=True)
+    shutil.copy(LOCALE_DIR / 'de/LC_MESSAGES/riskmatrix.po', messages_dir)
+
+    translations, = uncompiled_translations(['de'], [str(tmp_path)])
+    assert translations.domain == 'riskmatrix'
+    assert translations.gettext('Just a test') == 'Nur ein Test'
+
+    compile_catalogs(tmp_path)
+    assert list(uncompiled_translations(['de'], [str(tmp_path)])) == []
+
+
+def test_localizer_uncompiled(config, tmp_path):
+    messages_dir = tmp_path / 'de' / 'LC_MESSAGES'
+    messages_dir.mkdir(parents=True)
+    shutil.copy(LOCALE_DIR / 'de/LC_MESSAGES/riskmatrix.po', messages_dir)
+    config.add_translation_dirs(str(tmp_path))
+
+    localizer = make_localizer('de_CH', config.registry)
+    assert localizer.translate('Just a test', domain='riskmatrix') == (
+        'Nur ein Test'
+    )
+
+
+def test_load_budget(config):
+    config.add_translation_dirs('riskmatrix:locale/', 'wtforms:locale/')
+    start = perf_counter()
+    for language in ('de', 'en', 'fr'):
+        make_localizer(language, config.registry)
+    assert perf_counter() - start < LOAD_BUDGET
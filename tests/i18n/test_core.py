@@ -1,10 +1,17 @@
 from markupsafe import escape
 from markupsafe import Markup
+from pyramid.events import ApplicationCreated
 from pyramid.i18n import TranslationString
+from pyramid.interfaces import ILocalizer
 
 from riskmatrix.i18n import _
 from riskmatrix.i18n import translate
+from riskmatrix.i18n.core import get_localizer
+from riskmatrix.i18n.core import load_localizers
+from riskmatrix.i18n.core import memoized_translate
+from riskmatrix.i18n.core import request_localizer
 from riskmatrix.i18n.translation_string import TranslationMarkup
+from riskmatrix.testing import DummyRequest
 
 
 def test_translation_string_factory():
@@ -42,8 +49,6 @@ def test_translate_markup():
 
 def test_translate_translation_dirs(config):
     config.add_translation_dirs('riskmatrix:locale/')
-    # Testing localizer doesn't seem to work.
-    config.registry.localizer_de = None
     msg = _('Just a test')
     assert translate(msg, 'en') == 'Just a test'
     assert translate(msg, 'de') == 'Nur ein Test'
@@ -51,8 +56,6 @@ def test_translate_translation_dirs(config):
 
 def test_translate_translation_dirs_markup(config):
     config.add_translation_dirs('riskmatrix:locale/')
-    # Testing localizer doesn't seem to work.
-    config.registry.localizer_de = None
     msg = _('<b>bold</b>', markup=True)
     assert escape(translate(msg, 'en')) == Markup('<b>bold</b>')
     assert escape(translate(msg, 'de')) == Markup('<b>fett</b>')
@@ -60,8 +63,54 @@ def test_translate_translation_dirs_markup(config):
 
 def test_translate_translation_dirs_markup_omitted(config):
     config.add_translation_dirs('riskmatrix:locale/')
-    # Testing localizer doesn't seem to work.
-    config.registry.localizer_de = None
     msg = _('<b>bold</b>')
     assert escape(translate(msg, 'en')) == Markup('&lt;b&gt;bold&lt;/b&gt;')
     assert escape(translate(msg, 'de')) == Markup('&lt;b&gt;fett&lt;/b&gt;')
+
+
+def test_get_localizer(config):
+    config.add_translation_dirs('riskmatrix:locale/')
+    localizer = get_localizer('de')
+    assert get_localizer('de') is localizer
+    assert config.registry.queryUtility(ILocalizer, name='de') is localizer
+    assert get_localizer('fr') is not localizer
+
+
+def test_load_localizers(config):
+    config.registry.settings['pyramid.available_languages'] = 'de fr'
+    config.add_translation_dirs('riskmatrix:locale/')
+    app = config.make_wsgi_app()
+    load_localizers(ApplicationCreated(app))
+    for language in ('de', 'en', 'fr'):
+        assert config.registry.queryUtility(ILocalizer, name=language)
+
+    request = DummyRequest()
+    request.locale_name = 'de'
+    assert request_localizer(request) is get_localizer('de')
+    assert request_localizer(request).translate(_('Just a test')) == (
+        'Nur ein Test'
+    )
+
+
+def test_memoized_translate(config):
+    config.add_translation_dirs('riskmatrix:locale/')
+    memoized_translate.cache_clear()
+    msg = _('Just a test')
+    assert translate(msg, 'de') == 'Nur ein Test'
+    assert translate(msg, 'de') == 'Nur ein Test'
+    assert memoized_translate.cache_info().hits == 1
+
+    # the type of the term is part of the key
+    result = translate(_(Markup('Just a test')), 'de')
+    assert isinstance(result, Markup)
+    assert memoized_translate.cache_info().hits == 1
+
+    # as is the domain
+    assert translate(TranslationString('Just a test'), 'de') == (
+        'Just a test'
+    )
+
+    # terms with a mapping are not memoized
+    msg = _('Hi ${name}', mapping={'name': 'Jane'})
+    assert translate(msg, 'de') == 'Hi Jane'
+    assert memoized_translate.cache_info().currsize == 3
@@ -0,0 +1,118 @@
+import pytest
+from pyramid.httpexceptions import HTTPForbidden
+from pyramid.response import Response
+from sqlalchemy import text
+
+from riskmatrix.instrumentation.metrics import Counter
+from riskmatrix.instrumentation.metrics import Histogram
+from riskmatrix.instrumentation.metrics import MetricsRegistry
+from riskmatrix.instrumentation.metrics import default_registry
+from riskmatrix.instrumentation.metrics import instrument_pool
+from riskmatrix.instrumentation.metrics import metrics_tween_factory
+from riskmatrix.instrumentation.metrics import metrics_view
+from riskmatrix.instrumentation.metrics import request_duration
+from riskmatrix.testing import DummyRequest
+
+
+def test_counter():
+    registry = MetricsRegistry()
+    counter = Counter('test_total', 'Test counter.', ('kind',), registry)
+    counter.inc(kind='a')
+    counter.inc(2, kind='a')
+    counter.inc(kind='b"c')
+    assert counter.value(kind='a') == 3
+    assert registry.render() == (
+        '# HELP test_total Test counter.\n'
+        '# TYPE test_total counter\n'
+        'test_total{kind="a"} 3\n'
+        'test_total{kind="b\\"c"} 1\n'
+    )
+
+    with pytest.raises(ValueError):
+        counter.inc(other='a')
+
+    bound = counter.labels(kind='a')
+    bound.inc()
+    assert counter.value(kind='a') == 4
+    with pytest.raises(ValueError):
+        counter.labels()
+
+
+def test_histogram():
+    registry = MetricsRegistry()
+    histogram = Histogram(
+        'test_seconds', 'Test histogram.', buckets=(0.1, 1), registry=registry
+    )
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    assert histogram.count() == 4
+    assert histogram.sum() == 5.65
+    assert registry.render() == (
+        '# HELP test_seconds Test histogram.\n'
+        '# TYPE test_seconds histogram\n'
+        'test_seconds_bucket{le="0.1"} 2\n'
+        'test_seconds_bucket{le="1"} 3\n'
+        'test_seconds_bucket{le="+Inf"} 4\n'
+        'test_seconds_sum 5.65\n'
+        'test_seconds_count 4\n'
+    )
+
+
+def test_duplicate_metric():
+    registry = MetricsRegistry()
+    Counter('test_total', 'Test counter.', registry=registry)
+    with pytest.raises(ValueError):
+        Counter('test_total', 'Test counter.', registry=registry)
+
+
+def test_metrics_tween(config):
+    def handler(request):
+        return Response()
+
+    tween = metrics_tween_factory(handler, config.registry)
+    request = DummyRequest()
+    request.matched_route = type('Route', (), {'name': 'test_route'})()
+    before = request_duration.count(route='test_route')
+    tween(request)
+    assert request_duration.count(route='test_route') == before + 1
+
+
+def test_instrument_pool(config):
+    from riskmatrix.instrumentation.metrics import db_pool_checkout_duration
+
+    engine = config.dbsession.get_bind()
+    instrument_pool(engine)
+    instrument_pool(engine)
+    before = db_pool_checkout_duration.count()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    assert db_pool_checkout_duration.count() == before + 1
+
+
+def test_metrics_view(config):
+    request = DummyRequest()
+    with pytest.raises(HTTPForbidden):
+        metrics_view(request)
+
+    config.registry.settings['metrics.token'] = 'secret'
+    request = DummyRequest(headers={'Authorization': 'Bearer wrong'})
+    with pytest.raises(HTTPForbidden):
+        metrics_view(request)
+
+    request = DummyRequest(headers={'Authorization': 'Bearer secret'})
+    response = metrics_view(request)
+    assert response.content_type == 'text/plain'
+    assert response.text == default_registry.render()
+    assert '# TYPE riskmatrix_request_duration_seconds histogram' in (
+        response.text
+    )
+
+
+def test_includeme(base_config):
+    base_config.registry.settings['metrics.token'] = 'secret'
+    base_config.include('riskmatrix.models')
+    base_config.include('riskmatrix.instrumentation')
+    base_config.commit()
+    assert base_config.registry.introspector.get('routes', 'metrics')
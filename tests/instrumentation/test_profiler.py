@@ -0,0 +1,84 @@
+import os
+import pstats
+from pyramid.response import Response
+
+from riskmatrix.instrumentation.profiler import ProfilerSettings
+from riskmatrix.instrumentation.profiler import profiler_tween_factory
+from riskmatrix.instrumentation.profiler import rotate_profiles
+from riskmatrix.instrumentation.profiler import should_profile
+from riskmatrix.testing import DummyRequest
+
+
+def handler(request):
+    return Response()
+
+
+def test_should_profile(config, tmp_path):
+    config.add_route('assessment', '/assessment')
+    config.commit()
+    settings = ProfilerSettings({
+        'profiler.directory': str(tmp_path),
+        'profiler.routes': 'assessment',
+        'profiler.users': 'user-1',
+        'profiler.token': 'secret',
+    })
+
+    request = DummyRequest(path='/assessment')
+    request.registry = config.registry
+    assert should_profile(request, settings) is True
+
+    request = DummyRequest(path='/assets')
+    request.registry = config.registry
+    assert should_profile(request, settings) is False
+
+    config.testing_securitypolicy(userid='user-1')
+    assert should_profile(request, settings) is True
+
+    config.testing_securitypolicy(userid='user-2')
+    assert should_profile(request, settings) is False
+
+    request = DummyRequest(path='/assets', headers={'X-Profile': 'secret'})
+    request.registry = config.registry
+    assert should_profile(request, settings) is True
+
+    settings.sample_rate = 1.0
+    request = DummyRequest(path='/assets')
+    request.registry = config.registry
+    assert should_profile(request, settings) is True
+
+
+def test_profiler_tween(config, tmp_path):
+    config.registry.settings['profiler.directory'] = str(tmp_path)
+    config.registry.settings['profiler.sample_rate'] = '1'
+    config.registry.settings['profiler.keep'] = '2'
+    tween = profiler_tween_factory(handler, config.registry)
+
+    for __ in range(3):
+        request = DummyRequest()
+        request.matched_route = None
+        tween(request)
+
+    profiles = list(tmp_path.glob('*.prof'))
+    assert len(profiles) == 2
+    stats = pstats.Stats(str(profiles[0]))
+    assert any(name == 'handler' for __, __, name in stats.stats)
+
+
+def test_profiler_tween_disabled(config, tmp_path):
+    config.registry.settings['profiler.directory'] = str(tmp_path)
+    tween = profiler_tween_factory(handler, config.registry)
+    request = DummyRequest()
+    tween(request)
+    assert list(tmp_path.glob('*.prof')) == []
+
+
+def test_rotate_profiles(tmp_path):
+    for index in range(5):
+        path = tmp_path / f'{index}.prof'
+        path.write_text('')
+        os.utime(path, (index, index))
+
+    rotate_profiles(tmp_path, 2)
+    assert sorted(p.name for p in tmp_path.glob('*.prof')) == [
+        '3.prof', '4.prof'
+    ]
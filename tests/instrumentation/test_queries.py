@@ -0,0 +1,123 @@
+import logging
+import pytest
+from pyramid.response import Response
+from sqlalchemy import text
+
+from riskmatrix.instrumentation import add_query_observer
+from riskmatrix.instrumentation import count_queries
+from riskmatrix.instrumentation import remove_query_observer
+from riskmatrix.instrumentation.queries import query_counter_tween_factory
+from riskmatrix.instrumentation.queries import statement_shape
+from riskmatrix.layouts.steps import steps
+from riskmatrix.models import Organization
+from riskmatrix.testing import DummyRequest
+
+
+def test_statement_shape():
+    assert statement_shape(
+        'SELECT a\n  FROM b\n WHERE c = ?'
+    ) == 'SELECT a FROM b WHERE c = ?'
+    assert statement_shape(
+        'SELECT a FROM b WHERE c IN (?, ?, ?)'
+    ) == statement_shape(
+        'SELECT a FROM b WHERE c IN (?)'
+    )
+    assert statement_shape(
+        'SELECT a FROM b WHERE c IN (%(c_1_1)s, %(c_1_2)s)'
+    ) == 'SELECT a FROM b WHERE c IN (?)'
+    assert statement_shape(
+        'SELECT a FROM b WHERE c = %(c_1)s'
+    ) == statement_shape(
+        'SELECT a FROM b WHERE c = %(c_2)s'
+    )
+
+
+def test_count_queries(config):
+    session = config.dbsession
+    with count_queries() as stats:
+        for value in range(3):
+            session.execute(text('SELECT :value'), {'value': value})
+        session.execute(text('SELECT 1, 2'))
+
+    assert stats.count == 4
+    assert stats.duration > 0
+    assert stats.repeated(3) == [('SELECT ?', 3)]
+    assert stats.repeated(4) == []
+
+    # outside of the context nothing gets recorded
+    session.execute(text('SELECT 1'))
+    assert stats.count == 4
+
+
+def test_nested_count_queries(config):
+    session = config.dbsession
+    with count_queries() as outer:
+        session.execute(text('SELECT 1'))
+        with count_queries() as inner:
+            session.execute(text('SELECT 2'))
+        session.execute(text('SELECT 3'))
+
+    assert outer.count == 2
+    assert inner.count == 1
+
+
+def test_query_observer(config):
+    session = config.dbsession
+    observed = []
+
+    def observer(conn, statement, parameters, duration, context):
+        observed.append((statement, duration))
+
+    add_query_observer(observer)
+    try:
+        session.execute(text('SELECT 1'))
+    finally:
+        remove_query_observer(observer)
+
+    session.execute(text('SELECT 2'))
+    assert len(observed) == 1
+    assert observed[0][0] == 'SELECT 1'
+
+
+def test_query_counter_tween(config, caplog):
+    session = config.dbsession
+
+    def handler(request):
+        for value in range(3):
+            session.execute(text('SELECT :value'), {'value': value})
+        return Response()
+
+    config.registry.settings['debug.query_counter.threshold'] = '3'
+    tween = query_counter_tween_factory(handler, config.registry)
+    request = DummyRequest()
+    request.matched_route = None
+    with caplog.at_level(logging.WARNING, logger='riskmatrix.queries'):
+        response = tween(request)
+
+    assert response.headers['X-Query-Count'] == '3'
+    assert response.headers['X-Query-Duration'].endswith('ms')
+    assert response.headers['X-Query-Repeated'] == '1'
+    assert 'Possible N+1 query' in caplog.text
+
+
+def test_query_budget(config, query_budget):
+    session = config.dbsession
+    with query_budget(1):
+        session.execute(text('SELECT 1'))
+
+    with pytest.raises(AssertionError, match=r'Executed 2 queries'):
+        with query_budget(1):
+            session.execute(text('SELECT 1'))
+            session.execute(text('SELECT 2'))
+
+
+def test_steps_query_budget(config, query_budget):
+    config.include('riskmatrix.views')
+    session = config.dbsession
+    organization = Organization(name='Test', email='test@example.com')
+    session.add(organization)
+    session.flush()
+
+    request = DummyRequest()
+    with query_budget(0):
+        steps(organization, request)
@@ -0,0 +1,83 @@
+import logging
+from sqlalchemy import text
+
+from riskmatrix.instrumentation import add_query_observer
+from riskmatrix.instrumentation import remove_query_observer
+from riskmatrix.instrumentation.queries import _query_observers
+from riskmatrix.instrumentation.slow_queries import includeme
+from riskmatrix.instrumentation.slow_queries import parameter_shape
+from riskmatrix.instrumentation.slow_queries import SlowQueryLogger
+from riskmatrix.models import Organization
+
+
+def test_parameter_shape():
+    assert parameter_shape({'a': 1, 'b': 'x'}) == '{a: int, b: str}'
+    assert parameter_shape((1, 'x', None)) == '(int, str, NoneType)'
+    assert parameter_shape([(1,), (2,)]) == '2 x (int)'
+    assert parameter_shape(None) == 'NoneType'
+
+
+def test_slow_query_logger(config, caplog):
+    session = config.dbsession
+    observer = SlowQueryLogger(threshold=0)
+    add_query_observer(observer)
+    try:
+        with caplog.at_level(logging.WARNING, 'riskmatrix.slow_queries'):
+            session.execute(text('SELECT :value'), {'value': 'secret'})
+    finally:
+        remove_query_observer(observer)
+
+    assert 'Slow query' in caplog.text
+    assert '[None] parameters (str): SELECT ?' in caplog.text
+    assert 'secret' not in caplog.text
+
+
+def test_slow_query_logger_threshold(config, caplog):
+    session = config.dbsession
+    observer = SlowQueryLogger(threshold=10_000)
+    add_query_observer(observer)
+    try:
+        with caplog.at_level(logging.WARNING, 'riskmatrix.slow_queries'):
+            session.execute(text('SELECT 1'))
+    finally:
+        remove_query_observer(observer)
+
+    assert caplog.text == ''
+
+
+def test_slow_query_logger_explain(config, caplog):
+    session = config.dbsession
+    session.add(Organization(name='Test', email='test@example.com'))
+    session.flush()
+
+    observer = SlowQueryLogger(threshold=0, explain=True)
+    add_query_observer(observer)
+    try:
+        with caplog.at_level(logging.WARNING, 'riskmatrix.slow_queries'):
+            session.query(Organization).filter(
+                Organization.name == 'Test'
+            ).all()
+    finally:
+        remove_query_observer(observer)
+
+    assert 'SCAN organization' in caplog.text
+
+
+def test_includeme_replaces_previous_setup(base_config, tmp_path):
+    logger = logging.getLogger('riskmatrix.slow_queries')
+    handlers = list(logger.handlers)
+    observers = list(_query_observers)
+    settings = base_config.registry.settings
+    settings['slow_query.threshold'] = '100'
+    settings['slow_query.log_file'] = str(tmp_path / 'slow.log')
+
+    includeme(base_config)
+    includeme(base_config)
+    assert len(logger.handlers) == len(handlers) + 1
+    assert len(_query_observers) == len(observers) + 1
+
+    # without a threshold the previous setup is removed again
+    del settings['slow_query.threshold']
+    includeme(base_config)
+    assert logger.handlers == handlers
+    assert _query_observers == observers
@@ -0,0 +1,67 @@
+from riskmatrix.layouts.fragments import cached_fragment
+from riskmatrix.layouts.fragments import cached_panel
+from riskmatrix.layouts.fragments import fragment_key
+from riskmatrix.layouts.navbar import navbar
+from riskmatrix.layouts.steps import steps
+from riskmatrix.testing import DummyRequest
+
+
+def test_fragment_key(config):
+    request = DummyRequest()
+    key = fragment_key(None, request)
+    assert key == fragment_key(None, DummyRequest())
+
+    request = DummyRequest()
+    request.path_url = 'http://example.com/assets'
+    assert fragment_key(None, request) != key
+
+    request = DummyRequest()
+    request.locale_name = 'fr'
+    assert fragment_key(None, request) != key
+
+
+def test_cached_panel(config):
+    cached_fragment.cache_clear()
+    calls = []
+
+    def panel(context, request):
+        calls.append(request)
+        return f'Panel {len(calls)}'
+
+    wrapped = cached_panel(panel, 'string')
+    assert wrapped(None, DummyRequest()) == 'Panel 1'
+    assert wrapped(None, DummyRequest()) == 'Panel 1'
+    assert len(calls) == 1
+
+    request = DummyRequest()
+    request.path_url = 'http://example.com/assets'
+    assert wrapped(None, request) == 'Panel 2'
+    assert wrapped(None, DummyRequest()) == 'Panel 1'
+
+    # different panels don't share their fragments
+    other = cached_panel(lambda context, request: 'Other', 'string')
+    assert other(None, DummyRequest()) == 'Other'
+
+
+def test_cached_navbar(config):
+    cached_fragment.cache_clear()
+    config.include('riskmatrix.views')
+    wrapped = cached_panel(navbar, 'riskmatrix:layouts/navbar.pt')
+
+    request = DummyRequest()
+    request.show_steps = False
+    html = wrapped(None, request)
+    assert 'RiskMatrix' in html
+    assert wrapped(None, DummyRequest()) is html
+
+
+def test_cached_steps(config):
+    cached_fragment.cache_clear()
+    config.include('riskmatrix.views')
+    wrapped = cached_panel(steps, 'riskmatrix:layouts/steps.pt')
+
+    request = DummyRequest()
+    request.path_url = request.route_url('assess_impact')
+    html = wrapped(None, request)
+    assert 'list-group-item-action active' in html
+    assert wrapped(None, request) is html
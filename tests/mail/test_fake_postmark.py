@@ -0,0 +1,117 @@
+import pytest
+from email.headerregistry import Address
+
+from riskmatrix.mail import InactiveRecipient
+from riskmatrix.mail import MailState
+from riskmatrix.mail import PostmarkMailer
+from riskmatrix.mail.fake_postmark import FakePostmarkServer
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakePostmarkServer() as server:
+        yield server
+
+
+@pytest.fixture
+def mailer(server):
+    server.inactive_recipients = {'inactive@example.com'}
+    server.fail_requests = 0
+    server.slow_requests = 0
+    server.requests.clear()
+    server.messages.clear()
+    mailer = PostmarkMailer(
+        Address(addr_spec='noreply@example.com'),
+        'token',
+        'test',
+        max_workers=2,
+        api_url=server.url + '/'
+    )
+    yield mailer
+    mailer.close()
+
+
+def mails(count, template=False):
+    result = []
+    for index in range(count):
+        mail = {'receivers': Address(addr_spec=f'user{index}@example.com')}
+        if template:
+            mail['template'] = 'welcome'
+            mail['data'] = {'index': index}
+        else:
+            mail['subject'] = 'Subject'
+            mail['content'] = 'Content'
+        result.append(mail)
+    return result
+
+
+def test_api_url(server, mailer):
+    assert mailer.api_url == server.url
+    default = PostmarkMailer(Address(addr_spec='a@example.com'), 't', 'test')
+    assert default.api_url == 'https://api.postmarkapp.com'
+
+
+def test_send(server, mailer):
+    receiver = Address('User', addr_spec='user@example.com')
+    assert mailer.send(None, receiver, 'Subject', 'Content')
+    assert mailer.send_template(None, receiver, 'welcome', {})
+
+    inactive = Address(addr_spec='inactive@example.com')
+    with pytest.raises(InactiveRecipient):
+        mailer.send(None, inactive, 'Subject', 'Content')
+
+    assert server.messages == {'/email': 2, '/email/withTemplate': 1}
+
+
+def test_bulk_send(server, mailer):
+    batch = mails(1100)
+    batch[600]['receivers'] = Address(addr_spec='inactive@example.com')
+    result = mailer.bulk_send(batch)
+
+    assert len(result) == 1100
+    assert result[600].state == MailState.inactive_recipient
+    assert result[600].error.startswith('406: You tried to send')
+    assert all(isinstance(r, str) for r in result[:600] + result[601:])
+    assert server.requests['/email/batch'] == 3
+    assert server.messages['/email/batch'] == 1100
+
+    result = mailer.bulk_send_template(mails(10, template=True))
+    assert all(isinstance(r, str) for r in result)
+    assert server.messages['/email/batchWithTemplates'] == 10
+
+
+def test_bulk_send_server_error(server, mailer):
+    server.fail_requests = 1
+    result = mailer.bulk_send(mails(10))
+    assert result == [MailState.temporary_failure] * 10
+
+    # the next request goes through again
+    result = mailer.bulk_send(mails(10))
+    assert all(isinstance(r, str) for r in result)
+
+
+def test_bulk_send_timeout(server, mailer):
+    server.slow_requests = 1
+    server.slow_latency = 1
+    mailer.batch_timeout = (5, 0.2)
+    result = mailer.bulk_send(mails(1100))
+
+    # only the mails of the slow batch fail, they aren't sent again
+    # since the API may have accepted them after all
+    failed = [r for r in result if not isinstance(r, str)]
+    assert {r.state for r in failed} == {MailState.failed}
+    assert len(result) == 1100
+    assert len(failed) in (100, 500)
+    assert sum(isinstance(r, str) for r in result) == 1100 - len(failed)
+
+
+def test_handle(server):
+    assert server.handle('/unknown', {}, b'')[0] == 404
+    status, data = server.handle('/email', {}, b'{}')
+    assert status == 401
+    assert data['ErrorCode'] == 10
+
+    headers = {'X-Postmark-Server-Token': 'token'}
+    status, data = server.handle('/email/batch', headers, b'[{}]')
+    assert status == 200
+    assert data[0]['ErrorCode'] == 300
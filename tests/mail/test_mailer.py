@@ -0,0 +1,243 @@
+import base64
+import io
+import json
+import os
+import pytest
+import requests
+import time
+from email.headerregistry import Address
+from threading import Lock
+
+from riskmatrix.mail import MailConnectionError
+from riskmatrix.mail import MailFailure
+from riskmatrix.mail import MailState
+from riskmatrix.mail import PostmarkMailer
+
+
+class FakeResponse:
+
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """ Responds to batches, the first batch is the slowest. """
+
+    def __init__(self, fail=(), error=requests.ConnectionError):
+        self.fail = fail
+        self.error = error
+        self.batches = []
+        self.concurrent = self.max_concurrent = 0
+        self.lock = Lock()
+
+    def post(self, url, data=None, **kwargs):
+        messages = json.loads(data.read())
+        with self.lock:
+            index = len(self.batches)
+            self.batches.append(messages)
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+
+        try:
+            time.sleep(0.05 if index == 0 else 0.01)
+            if index in self.fail:
+                raise self.error()
+            return FakeResponse([
+                {
+                    'ErrorCode': 406,
+                    'Message': 'Inactive recipient'
+                } if message['To'].startswith('x') else {
+                    'ErrorCode': 0,
+                    'MessageID': message['To']
+                }
+                for message in messages
+            ])
+        finally:
+            with self.lock:
+                self.concurrent -= 1
+
+    def close(self):
+        pass
+
+
+def make_mailer(session, max_workers=4):
+    mailer = PostmarkMailer(
+        Address(addr_spec='noreply@example.com'),
+        'token',
+        'development',
+        max_workers=max_workers
+    )
+    mailer._session = session
+    mailer._pid = os.getpid()
+    return mailer
+
+
+def mails(count, prefix='user'):
+    return [
+        {
+            'receivers': Address(addr_spec=f'{prefix}{index}@example.com'),
+            'subject': 'Subject',
+            'content': 'Content'
+        }
+        for index in range(count)
+    ]
+
+
+def test_session():
+    mailer = PostmarkMailer(
+        Address(addr_spec='noreply@example.com'),
+        'token',
+        'development',
+        max_workers=2
+    )
+    session = mailer.session
+    assert mailer.session is session
+    adapter = session.get_adapter('https://api.postmarkapp.com')
+    assert adapter._pool_maxsize == 2
+
+    # a forked process creates its own session
+    mailer._pid = -1
+    assert mailer.session is not session
+    mailer.close()
+
+
+def test_bulk_send_concurrent():
+    session = FakeSession()
+    mailer = make_mailer(session)
+    result = mailer.bulk_send(mails(1200) + mails(5, prefix='x'))
+    mailer.close()
+
+    assert len(session.batches) == 3
+    assert session.max_concurrent > 1
+    # the order is preserved even though the first batch finished last
+    assert result[:1200] == [f'user{i}@example.com' for i in range(1200)]
+    # the error reported for a message is passed on
+    assert result[1200:] == [MailFailure(
+        MailState.inactive_recipient,
+        '406: Inactive recipient'
+    )] * 5
+
+
+@pytest.mark.parametrize('error,state', [
+    (requests.ConnectionError, MailState.temporary_failure),
+    (requests.ConnectTimeout, MailState.temporary_failure),
+    # the batch may have been accepted, so it mustn't be sent again
+    (requests.ReadTimeout, MailState.failed),
+])
+def test_bulk_send_connection_error(error, state):
+    session = FakeSession(fail=(1,), error=error)
+    mailer = make_mailer(session, max_workers=1)
+    result = mailer.bulk_send(mails(1100))
+    mailer.close()
+
+    assert session.max_concurrent == 1
+    assert result[:500] == [f'user{i}@example.com' for i in range(500)]
+    assert [getattr(r, 'state', r) for r in result[500:1000]] == [state] * 500
+    assert result[1000:] == [f'user{i}@example.com' for i in range(1000, 1100)]
+
+
+@pytest.mark.parametrize(
+    'error',
+    [requests.ConnectionError, requests.ReadTimeout]
+)
+def test_send_connection_error(error):
+    class FailingSession:
+        def post(self, *args, **kwargs):
+            raise error()
+
+    mailer = make_mailer(FailingSession())
+    with pytest.raises(MailConnectionError):
+        mailer.send(None, Address(addr_spec='a@example.com'), 'Hi', 'Text')
+
+
+class ShortReads(io.RawIOBase):
+    """ An unseekable stream which never returns more than 1000 bytes. """
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.data.readinto(memoryview(buffer)[:1000])
+
+
+@pytest.mark.parametrize('kind', ['bytes', 'path', 'stream', 'short_reads'])
+def test_bulk_send_attachments(kind, tmp_path):
+    data = os.urandom(100_001)
+    path = tmp_path / 'report.pdf'
+    path.write_bytes(data)
+    content = {
+        'bytes': lambda: data,
+        'path': lambda: path,
+        'stream': lambda: io.BytesIO(data),
+        'short_reads': lambda: ShortReads(data),
+    }[kind]
+
+    batch = mails(3)
+    for mail in batch:
+        mail['attachments'] = [{
+            'filename': 'report.pdf',
+            'content': content(),
+            'content_type': 'application/pdf',
+            'content_id': 'report'
+        }]
+
+    session = FakeSession()
+    mailer = make_mailer(session)
+    result = mailer.bulk_send(batch)
+    mailer.close()
+
+    assert result == [f'user{i}@example.com' for i in range(3)]
+    for message in session.batches[0]:
+        attachment, = message['Attachments']
+        assert attachment['Name'] == 'report.pdf'
+        assert attachment['ContentID'] == 'cid:report'
+        assert base64.b64decode(attachment['Content']) == data
+
+
+def test_batch_message_size():
+    mailer = make_mailer(FakeSession())
+    mail = mails(1)[0]
+    mail['attachments'] = [
+        {
+            'filename': f'{index}.txt',
+            'content': os.urandom(size),
+            'content_type': 'text/plain'
+        }
+        for index, size in enumerate((0, 1, 2, 3, 1000))
+    ]
+    message = mailer.prepare_batch_message(mail)
+    buffer = io.BytesIO()
+    message.write(buffer)
+    assert message.size == buffer.tell()
+    assert json.loads(buffer.getvalue()) == mailer.prepare_message(mail)
+
+
+def test_bulk_send_large_batches():
+    # large batches in flight are limited to about one full batch
+    session = FakeSession()
+    mailer = make_mailer(session)
+    mailer.size_limit = 100_000
+    batch = mails(6)
+    for mail in batch:
+        mail['attachments'] = [{
+            'filename': 'large.bin',
+            'content': io.BytesIO(bytes(60_000)),
+            'content_type': 'application/octet-stream'
+        }]
+    result = mailer.bulk_send(batch)
+    mailer.close()
+
+    assert result == [f'user{i}@example.com' for i in range(6)]
+    assert [len(messages) for messages in session.batches] == [1] * 6
+    assert session.max_concurrent == 1
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from email.headerregistry import Address
+from sedate import utcnow
+from sqlalchemy import select
+
+from riskmatrix.mail import MailFailure
+from riskmatrix.mail import MailState
+from riskmatrix.mail.outbox import deserialize_params
+from riskmatrix.mail.outbox import drain_outbox
+from riskmatrix.mail.outbox import enqueue_mail
+from riskmatrix.mail.outbox import enqueue_template_mail
+from riskmatrix.mail.outbox import OutboxSettings
+from riskmatrix.mail.outbox import serialize_params
+from riskmatrix.models import OutgoingMail
+from riskmatrix.testing import DummyRequest
+from riskmatrix.views.password_retrieval import mail_retrieval
+
+
+class FakeMailer:
+
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.sent = []
+        self.sent_templates = []
+
+    def result(self, mail):
+        address = mail['receivers'][0].addr_spec
+        return self.results.get(address, f'id-{address}')
+
+    def bulk_send(self, mails):
+        self.sent.append(mails)
+        return [self.result(mail) for mail in mails]
+
+    def bulk_send_template(self, mails, default_template=None):
+        self.sent_templates.append(mails)
+        return [self.result(mail) for mail in mails]
+
+
+def test_serialize_params():
+    params = {
+        'sender': Address('Sender', addr_spec='sender@example.com'),
+        'receivers': Address('Jane', addr_spec='jane@example.com'),
+        'subject': 'Subject',
+        'content': 'Content',
+        'attachments': [{
+            'filename': 'report.txt',
+            'content': b'\x00report',
+            'content_type': 'text/plain'
+        }]
+    }
+    data = serialize_params(params)
+    assert data['receivers'] == [['Jane', 'jane@example.com']]
+    assert data['attachments'][0]['content'] == 'AHJlcG9ydA=='
+
+    result = deserialize_params(data)
+    assert result['receivers'] == [params['receivers']]
+    assert result['sender'] == params['sender']
+    assert result['attachments'] == params['attachments']
+
+
+def test_drain_outbox(config):
+    session = config.dbsession
+    enqueue_mail(session, {
+        'receivers': Address(addr_spec='a@example.com'),
+        'subject': 'Subject',
+        'content': 'Content'
+    })
+    enqueue_template_mail(session, {
+        'receivers': Address(addr_spec='b@example.com'),
+        'template': 'password-reset',
+        'data': {'name': 'B'}
+    })
+    session.flush()
+
+    mailer = FakeMailer()
+    assert drain_outbox(session, mailer) == 2
+    assert len(mailer.sent) == 1
+    assert mailer.sent_templates[0][0]['template'] == 'password-reset'
+
+    mails = session.scalars(select(OutgoingMail)).all()
+    assert {mail.state for mail in mails} == {MailState.submitted}
+    assert {mail.message_id for mail in mails} == {
+        'id-a@example.com',
+        'id-b@example.com'
+    }
+
+    # nothing left to send
+    assert drain_outbox(session, mailer) == 0
+
+
+def test_drain_outbox_backoff(config):
+    session = config.dbsession
+    mail = enqueue_mail(session, {
+        'receivers': Address(addr_spec='a@example.com'),
+        'subject': 'Subject',
+        'content': 'Content'
+    })
+    session.flush()
+
+    settings = OutboxSettings(max_attempts=3, base_delay=10)
+    mailer = FakeMailer({'a@example.com': MailState.temporary_failure})
+    now = utcnow()
+    assert drain_outbox(session, mailer, settings, now) == 1
+    assert mail.state == MailState.temporary_failure
+    assert mail.next_attempt == now + timedelta(seconds=10)
+
+    # not due yet
+    assert drain_outbox(session, mailer, settings, now) == 0
+
+    now += timedelta(seconds=10)
+    assert drain_outbox(session, mailer, settings, now) == 1
+    assert mail.next_attempt == now + timedelta(seconds=20)
+
+    # the last attempt turns it into a dead letter
+    now += timedelta(seconds=20)
+    assert drain_outbox(session, mailer, settings, now) == 1
+    assert mail.state == MailState.failed
+    assert mail.attempts == 3
+    assert drain_outbox(session, mailer, settings, now + timedelta(1)) == 0
+
+
+def test_drain_outbox_dead_letter(config):
+    session = config.dbsession
+    mail = enqueue_mail(session, {
+        'receivers': Address(addr_spec='a@example.com'),
+        'subject': 'Subject',
+        'content': 'Content'
+    })
+    session.flush()
+
+    mailer = FakeMailer({'a@example.com': MailFailure(
+        MailState.inactive_recipient,
+        '406: Inactive recipient'
+    )})
+    assert drain_outbox(session, mailer) == 1
+    assert mail.state == MailState.inactive_recipient
+    assert mail.last_error == '406: Inactive recipient'
+    assert drain_outbox(session, mailer) == 0
+
+
+def test_password_retrieval_enqueues(config, user):
+    config.include('riskmatrix.views')
+    session = config.dbsession
+    mail_retrieval(user.email, DummyRequest())
+
+    mail, = session.scalars(select(OutgoingMail)).all()
+    assert mail.template == 'password-reset'
+    assert mail.params['receivers'] == [[user.fullname, user.email]]
+    assert 'token=' in mail.params['data']['action_url']
@@ -0,0 +1,155 @@
+import gc
+import pytest
+import transaction
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from uuid import uuid4
+
+from riskmatrix.cache import subscribe
+from riskmatrix.cache import unsubscribe
+from riskmatrix.models import Asset
+from riskmatrix.models import Organization
+from riskmatrix.models import RiskCatalog
+from riskmatrix.orm.invalidation import collect_tags
+from riskmatrix.orm.invalidation import has_pending_changes
+from riskmatrix.orm.invalidation import invalidate_on_commit
+from riskmatrix.orm.invalidation import register_invalidation
+from riskmatrix.views.asset import catalog_choices
+
+
+@pytest.fixture
+def published():
+    published = []
+    subscribe(published.append)
+    yield published
+    unsubscribe(published.append)
+
+
+def test_invalidate_on_commit(config, published):
+    session = config.dbsession
+    org = Organization(name='Test', email='test@example.com')
+    session.add(org)
+    session.flush()
+    assert published == []
+    assert has_pending_changes(session)
+
+    asset = Asset(name='Asset', organization=org)
+    session.add(asset)
+    session.flush()
+    assert published == []
+
+    org_id, asset_id = org.id, asset.id
+    transaction.commit()
+    assert published == [frozenset({
+        f'organization:{org_id}',
+        f'asset:{asset_id}',
+        f'org:{org_id}:asset',
+    })]
+    assert not has_pending_changes(session)
+
+    asset = session.get(Asset, asset_id)
+    asset.name = 'Renamed'
+    invalidate_on_commit(session, 'custom')
+    transaction.commit()
+    assert published[1] == frozenset({
+        f'asset:{asset_id}',
+        f'organization:{org_id}',
+        f'org:{org_id}:asset',
+        'custom',
+    })
+
+
+def test_abort_does_not_invalidate(config, published):
+    session = config.dbsession
+    session.add(Organization(name='Test', email='test@example.com'))
+    session.flush()
+    transaction.abort()
+    assert published == []
+    assert not has_pending_changes(session)
+
+    # nothing left over from the aborted transaction
+    transaction.commit()
+    assert published == []
+
+
+def test_savepoint_rollback(config, published):
+    session = config.dbsession
+    org = Organization(name='Test', email='test@example.com')
+    session.add(org)
+    session.flush()
+    org_id = org.id
+
+    savepoint = session.begin_nested()
+    session.add(Asset(name='Asset', organization=org))
+    session.flush()
+    savepoint.rollback()
+
+    # the changes from before the savepoint still need to be published
+    transaction.commit()
+    assert len(published) == 1
+    assert f'organization:{org_id}' in published[0]
+
+
+def test_catalog_choices_cache(config):
+    session = config.dbsession
+    org = Organization(name='Test', email='test@example.com')
+    session.add(org)
+    session.add(RiskCatalog(name='Catalog A', organization=org))
+    session.flush()
+
+    # uncommitted changes bypass the cache
+    catalog_choices.cache_clear()
+    assert len(catalog_choices(org.id, session)) == 1
+    assert catalog_choices.cache_info().currsize == 0
+
+    org_id = org.id
+    transaction.commit()
+    assert len(catalog_choices(org_id, session)) == 1
+    assert catalog_choices.cache_info().currsize == 1
+    assert len(catalog_choices(org_id, session)) == 1
+    assert catalog_choices.cache_info().hits == 1
+
+    org = session.get(Organization, org_id)
+    session.add(RiskCatalog(name='Catalog B', organization=org))
+    transaction.commit()
+    assert catalog_choices.cache_info().currsize == 0
+    assert len(catalog_choices(org_id, session)) == 2
+
+
+def test_catalog_choices_cache_ttl(config, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr('riskmatrix.cache.monotonic', lambda: now)
+    session = config.dbsession
+    org = Organization(name='Test', email='test@example.com')
+    session.add(org)
+    session.add(RiskCatalog(name='Catalog A', organization=org))
+    org_id = org.id
+    transaction.commit()
+
+    catalog_choices.cache_clear()
+    assert len(catalog_choices(org_id, session)) == 1
+
+    # a change committed by another worker doesn't reach our cache
+    session.execute(insert(RiskCatalog).values(
+        id=str(uuid4()),
+        organization_id=org_id,
+        name='Catalog B'
+    ))
+    transaction.commit()
+    assert len(catalog_choices(org_id, session)) == 1
+
+    # but it shows up once the cached choices expired
+    now += 61
+    assert len(catalog_choices(org_id, session)) == 2
+
+
+def test_register_invalidation():
+    # a factory which reuses the id of a garbage collected factory
+    # still needs to be registered
+    for _ in range(20):
+        factory = sessionmaker()
+        register_invalidation(factory)
+        register_invalidation(factory)
+        assert list(factory().dispatch.after_flush) == [collect_tags]
+        del factory
+        gc.collect()
@@ -0,0 +1,33 @@
+import pytest
+
+from riskmatrix.mail.outbox import OutboxSettings
+from riskmatrix.scripts import drain_outbox
+
+
+class StopWatching(Exception):
+    pass
+
+
+def test_watch_survives_errors(monkeypatch, caplog):
+    calls = []
+
+    def drain(env, mailer, settings):
+        calls.append(settings)
+        if len(calls) == 1:
+            raise ConnectionError('database is gone')
+
+    def sleep(interval):
+        assert interval == 10
+        if len(calls) == 3:
+            raise StopWatching()
+
+    monkeypatch.setattr(drain_outbox, 'drain', drain)
+    monkeypatch.setattr(drain_outbox.time, 'sleep', sleep)
+    settings = OutboxSettings()
+    with pytest.raises(StopWatching):
+        drain_outbox.watch({}, None, settings, 10)
+
+    # the first error is logged and we keep draining the outbox
+    assert calls == [settings] * 3
+    assert 'Failed to drain the outbox' in caplog.text
+    assert 'database is gone' in caplog.text
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+
+# NOTE: These are imported lazily once they're actually needed, they
+#       should never be imported just to run one of the console scripts
+HEAVY_MODULES = {
+    'anthropic',
+    'langchain_anthropic',
+    'langchain_core',
+    'langchain_openai',
+    'langfuse',
+    'numpy',
+    'openai',
+    'plotly',
+}
+
+# cumulative import time in microseconds, this is deliberately generous
+# so slow CI runners don't cause spurious failures
+IMPORT_BUDGET = 2_500_000
+
+
+def import_times(*modules: str) -> dict[str, int]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-X', 'importtime',
+            '-c', '; '.join(f'import {module}' for module in modules)
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_console_scripts_import_time():
+    scripts = (
+        'riskmatrix.scripts.add_user',
+        'riskmatrix.scripts.upgrade',
+    )
+    times = import_times(*scripts)
+
+    imported = {name.partition('.')[0] for name in times}
+    assert not imported & HEAVY_MODULES
+
+    total = sum(times[script] for script in scripts)
+    assert total < IMPORT_BUDGET, f'Import took {total / 1000:.0f}ms'
+
+
+def test_app_import_time():
+    times = import_times('riskmatrix', 'riskmatrix.views')
+    imported = {name.partition('.')[0] for name in times}
+    assert not imported & HEAVY_MODULES
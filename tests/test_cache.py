@@ -1,5 +1,20 @@
+import pytest
+from riskmatrix.cache import _EMPTY
+from riskmatrix.cache import CacheInfo
 from riskmatrix.cache import clear_instance_cache
 from riskmatrix.cache import instance_cache
+from riskmatrix.cache import invalidate_tags
+from riskmatrix.cache import LRUCache
+from riskmatrix.cache import process_cache
+from riskmatrix.cache import publish
+from riskmatrix.cache import request_bound_cache
+from riskmatrix.cache import set_backend_factory
+from riskmatrix.cache import SQLiteCache
+from riskmatrix.cache import SQLiteStore
+from riskmatrix.cache import stream_cache
+from riskmatrix.cache import subscribe
+from riskmatrix.cache import unsubscribe
+from riskmatrix.testing import DummyRequest
 
 
 class DummyObject:
@@ -76,3 +91,301 @@ def test_clear_instance_cache():
     assert obj.method.cache(obj) == {}
     assert obj.method() == 'called'
     assert obj.calls == 2
+
+
+def test_process_cache():
+    calls = []
+
+    @process_cache(maxsize=2)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    assert double(1) == 2
+    assert double(1) == 2
+    assert double(2) == 4
+    assert calls == [1, 2]
+    assert double.cache_info() == CacheInfo(1, 2, 0, 2, 2)
+
+    # 1 is the most recently used entry, so 2 will be evicted
+    assert double(1) == 2
+    assert double(3) == 6
+    assert double.cache_info() == CacheInfo(2, 3, 1, 2, 2)
+    assert double(1) == 2
+    assert double(2) == 4
+    assert calls == [1, 2, 3, 2]
+
+    double.invalidate(1)
+    assert double(1) == 2
+    assert calls == [1, 2, 3, 2, 1]
+
+    double.cache_clear()
+    assert double.cache_info().currsize == 0
+
+
+def test_process_cache_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr('riskmatrix.cache.monotonic', lambda: now)
+    calls = []
+
+    @process_cache(ttl=10)
+    def func():
+        calls.append(1)
+        return 'result'
+
+    assert func() == 'result'
+    now += 5
+    assert func() == 'result'
+    assert len(calls) == 1
+    now += 5
+    assert func() == 'result'
+    assert len(calls) == 2
+
+
+def test_process_cache_key():
+    calls = []
+
+    @process_cache(key=lambda obj, **kwargs: obj['id'])
+    def func(obj, **kwargs):
+        calls.append(obj)
+        return obj['id']
+
+    assert func({'id': 1}, unhashable=[]) == 1
+    assert func({'id': 1, 'other': 2}) == 1
+    assert len(calls) == 1
+
+
+def test_process_cache_tags():
+    calls = []
+
+    @process_cache(tags=lambda org_id: [f'organization:{org_id}'])
+    def func(org_id):
+        calls.append(org_id)
+        return org_id
+
+    @process_cache(tags=['static'])
+    def other():
+        calls.append('other')
+        return 'other'
+
+    func(1)
+    func(2)
+    other()
+    invalidate_tags('organization:1', 'unknown')
+    func(1)
+    func(2)
+    other()
+    assert calls == [1, 2, 'other', 1]
+
+    invalidate_tags('static')
+    other()
+    assert calls == [1, 2, 'other', 1, 'other']
+    assert func.cache_info().currsize == 2
+
+
+def test_lru_cache_retag():
+    cache = LRUCache('test')
+    cache.set('key', 'value', ['a'])
+    cache.set('key', 'value', ['b'])
+    cache.invalidate_tags(['a'])
+    assert cache.get('key') == 'value'
+    cache.invalidate_tags(['b'])
+    assert cache.info().currsize == 0
+
+
+def test_process_cache_invalidated_while_computing():
+    calls = []
+
+    @process_cache(tags=['tag'])
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            # simulates a commit by a concurrent request
+            invalidate_tags('tag')
+        return len(calls)
+
+    assert func() == 1
+    assert func.cache_info().currsize == 0
+    assert func() == 2
+    assert func() == 2
+
+
+def test_process_cache_bypass():
+    calls = []
+
+    @process_cache(bypass=lambda value: value < 0)
+    def func(value):
+        calls.append(value)
+        return value
+
+    func(-1)
+    func(-1)
+    func(1)
+    func(1)
+    assert calls == [-1, -1, 1]
+    assert func.cache_info().currsize == 1
+
+
+def test_stream_cache():
+    calls = []
+
+    @stream_cache(key=lambda key, items: key)
+    def stream(key, items):
+        calls.append(key)
+        for item in items:
+            if item is None:
+                raise ValueError()
+            yield item
+
+    assert list(stream('a', ['x', 'y'])) == ['x', 'y']
+    # the stored items are replayed
+    assert list(stream('a', ['z'])) == ['x', 'y']
+    assert calls == ['a']
+    assert stream.cache_info().currsize == 1
+
+    # abandoned streams are not stored
+    iterator = stream('b', ['x', 'y'])
+    assert next(iterator) == 'x'
+    iterator.close()
+    with pytest.raises(ValueError):
+        list(stream('b', ['x', None]))
+    assert list(stream('b', ['z'])) == ['z']
+    assert calls == ['a', 'b', 'b', 'b']
+
+    stream.invalidate('a', [])
+    assert list(stream('a', ['z'])) == ['z']
+    stream.cache_clear()
+    assert stream.cache_info().currsize == 0
+
+
+def test_publish():
+    published = []
+    subscribe(published.append)
+    subscribe(published.append)
+    try:
+        publish(frozenset({'tag'}))
+    finally:
+        unsubscribe(published.append)
+
+    assert published == [frozenset({'tag'})]
+    publish(frozenset({'tag'}))
+    assert len(published) == 1
+
+
+def test_sqlite_cache_shared(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    # two stores on the same file behave like two worker processes
+    worker1 = SQLiteCache('test', 10, None, SQLiteStore(path))
+    worker2 = SQLiteCache('test', 10, None, SQLiteStore(path))
+    other = SQLiteCache('other', 10, None, SQLiteStore(path))
+
+    assert worker1.get(('key', 1)) is _EMPTY
+    worker1.set(('key', 1), {'value': [1, 2]}, ['tag'])
+    assert worker2.get(('key', 1)) == {'value': [1, 2]}
+    assert other.get(('key', 1)) is _EMPTY
+    assert worker2.info() == CacheInfo(1, 0, 0, 10, 1)
+
+    other.set(('key', 1), 'other', ['tag'])
+    generation = worker1.generation
+    worker2.invalidate_tags(['tag'])
+    assert worker1.get(('key', 1)) is _EMPTY
+    assert other.get(('key', 1)) == 'other'
+    assert worker1.generation == generation + 1
+
+    # stale values are rejected
+    worker1.set('key', 'value', generation=generation)
+    assert worker2.get('key') is _EMPTY
+    worker1.set('key', 'value', generation=worker1.generation)
+    assert worker2.get('key') == 'value'
+
+    worker2.delete('key')
+    assert worker1.get('key') is _EMPTY
+
+    worker1.set('key', 'value')
+    worker1.clear()
+    assert worker1.info().currsize == 0
+    assert other.info().currsize == 1
+
+
+def test_sqlite_cache_eviction(tmp_path, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr('riskmatrix.cache.time', lambda: now)
+    store = SQLiteStore(str(tmp_path / 'cache.db'), max_bytes=1000)
+    cache = SQLiteCache('test', 2, 10, store)
+
+    for value in range(3):
+        now += 1
+        cache.set(value, value)
+    assert cache.get(0) is _EMPTY
+    assert cache.get(1) == 1
+    assert cache.get(2) == 2
+    assert cache.evictions == 1
+
+    now += 10
+    assert cache.get(2) is _EMPTY
+
+    large = SQLiteCache('large', 10, None, store)
+    large.set('a', 'x' * 600)
+    now += 1
+    large.set('b', 'x' * 600)
+    assert large.get('a') is _EMPTY
+    assert len(large.get('b')) == 600
+
+
+def test_process_cache_backend(tmp_path, base_config):
+    calls = []
+
+    @process_cache()
+    def func(value):
+        calls.append(value)
+        return value
+
+    base_config.registry.settings['cache.backend'] = 'sqlite'
+    base_config.registry.settings['cache.path'] = str(tmp_path / 'cache.db')
+    base_config.include('riskmatrix.cache')
+    try:
+        func(1)
+        func(1)
+        assert calls == [1]
+        assert func.cache_info().currsize == 1
+
+        func.invalidate(1)
+        func(1)
+        assert calls == [1, 1]
+    finally:
+        set_backend_factory(LRUCache)
+
+    assert func.cache_info().currsize == 0
+
+
+def test_request_bound_cache():
+    calls = []
+
+    class Policy:
+        @request_bound_cache()
+        def acl(self, context, request):
+            calls.append(context)
+            return [context['name']]
+
+    policy = Policy()
+    request = DummyRequest()
+    context = {'name': 'unhashable'}
+    assert policy.acl(context, request) == ['unhashable']
+    assert policy.acl(context, request) == ['unhashable']
+    assert len(calls) == 1
+
+    # equal but not identical contexts are cached separately
+    assert policy.acl(dict(context), request) == ['unhashable']
+    assert len(calls) == 2
+
+    # keyword arguments bypass the cache
+    policy.acl(context, request=request)
+    assert len(calls) == 3
+
+    # the cache is bound to the request
+    policy.acl(context, DummyRequest())
+    assert len(calls) == 4
+
+    Policy.acl.cache_clear(request)
+    policy.acl(context, request)
+    assert len(calls) == 5
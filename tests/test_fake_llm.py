@@ -0,0 +1,68 @@
+import time
+from langchain_core.messages import HumanMessage
+
+from riskmatrix.fake_llm import fake_client
+from riskmatrix.fake_llm import FakeChatModel
+
+
+PROMPT = (
+    'Examples\n\nCurrent Risk-Catalog:\n - name:Backup\n - description: D'
+)
+
+
+def test_stream_template():
+    llm = FakeChatModel(risks=3)
+    chunks = list(llm.stream([HumanMessage(content=PROMPT)]))
+    assert len(chunks) > 3
+    text = ''.join(chunk.content for chunk in chunks)
+    lines = text.splitlines()
+    assert lines[0] == '#### Backup'
+    assert len(lines) == 4
+    assert all(line.startswith('- [ ] __') for line in lines[1:])
+
+    # the output only depends on the prompt
+    assert ''.join(c.content for c in llm.stream([PROMPT])) == text
+    other = ''.join(c.content for c in llm.stream([PROMPT + '.']))
+    assert other.splitlines()[0] == '#### Backup'
+
+
+def test_stream_response():
+    llm = FakeChatModel(response='#### Backup\n- __Restore__: Untested')
+    chunks = [chunk.content for chunk in llm.stream(['prompt'], config={})]
+    assert chunks == [
+        '#### ', 'Backup\n', '- ', '__Restore__: ', 'Untested'
+    ]
+
+
+def test_stream_timing():
+    llm = FakeChatModel(
+        response='a b c d e',
+        latency=0.05,
+        tokens_per_second=50
+    )
+    start = time.perf_counter()
+    stream = llm.stream(['prompt'])
+    next(stream)
+    assert time.perf_counter() - start >= 0.05
+    list(stream)
+    # four more tokens at 50 tokens per second
+    assert time.perf_counter() - start >= 0.13
+
+
+def test_fake_client(tmp_path):
+    path = tmp_path / 'response.md'
+    path.write_text('#### Canned')
+    llm = fake_client({
+        'llm.fake.latency': '0.1',
+        'llm.fake.tokens_per_second': '20',
+        'llm.fake.risks': '5',
+        'llm.fake.response': str(path),
+    })
+    assert llm.latency == 0.1
+    assert llm.tokens_per_second == 20.0
+    assert llm.risks == 5
+    assert llm.response == '#### Canned'
+
+    llm = fake_client({})
+    assert llm.latency == 0.0
+    assert llm.response is None
@@ -0,0 +1,162 @@
+import time
+from threading import Event
+from threading import Lock
+
+from riskmatrix.llm import ANTHROPIC_MODEL
+from riskmatrix.llm import generation_key
+from riskmatrix.llm import GenerationPool
+from riskmatrix.llm import LazyClient
+from riskmatrix.llm import llm_factory
+from riskmatrix.llm import llm_model
+
+
+def test_lazy_client():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    client = LazyClient(factory)
+    assert calls == []
+    first = client(None)
+    assert client(None) is first
+    assert calls == [1]
+
+
+def test_llm_factory():
+    assert llm_factory({}) is None
+    assert llm_factory({'openai_api_key': ''}) is None
+
+    factory = llm_factory({'openai_api_key': 'key'})
+    assert factory.func.__name__ == 'openai_client'
+
+    factory = llm_factory({'anthropic_api_key': 'key'})
+    assert factory.func.__name__ == 'anthropic_client'
+
+    factory = llm_factory({'llm.provider': 'fake', 'openai_api_key': 'key'})
+    assert factory.func.__name__ == 'fake_client'
+
+
+def test_llm_model():
+    assert llm_model({}) is None
+    assert llm_model({'anthropic_api_key': 'key'}) == ANTHROPIC_MODEL
+    assert llm_model({'llm.provider': 'fake'}) == 'fake'
+
+
+def test_generation_key():
+    key = generation_key('model', 'prompt', answers={'a': 1, 'b': 2})
+    assert key == generation_key('model', 'prompt', answers={'b': 2, 'a': 1})
+    assert key != generation_key('other', 'prompt', answers={'a': 1, 'b': 2})
+    assert key != generation_key('model', 'prompt', answers={'a': 2, 'b': 2})
+
+
+def test_generation_pool_multiplex():
+    lock = Lock()
+    running = max_running = 0
+
+    def stream(name, count):
+        def generate():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            try:
+                for index in range(count):
+                    time.sleep(0.05)
+                    yield f'{name}{index}'
+            finally:
+                with lock:
+                    running -= 1
+        return generate
+
+    def failing():
+        yield 'x'
+        raise ValueError('failed')
+
+    pool = GenerationPool(max_concurrency=2)
+    streams = {'a': stream('a', 4), 'b': stream('b', 4), 'c': failing}
+    start = time.perf_counter()
+    events = list(pool.multiplex(streams))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    chunks = {key: [] for key in streams}
+    for event in events:
+        if event.event == 'chunk':
+            chunks[event.key].append(event.data)
+    assert chunks == {
+        'a': ['a0', 'a1', 'a2', 'a3'],
+        'b': ['b0', 'b1', 'b2', 'b3'],
+        'c': ['x']
+    }
+    assert {(e.key, e.event) for e in events if e.event != 'chunk'} == {
+        ('a', 'done'), ('b', 'done'), ('c', 'error')
+    }
+    assert max_running == 2
+    # a and b run concurrently, rather than one after the other
+    assert elapsed < 0.35
+
+
+def test_generation_pool_cancel():
+    stopped = Event()
+
+    def endless():
+        try:
+            while True:
+                time.sleep(0.01)
+                yield 'chunk'
+        finally:
+            stopped.set()
+
+    pool = GenerationPool(max_concurrency=1)
+    events = pool.multiplex({'a': endless})
+    assert next(events).data == 'chunk'
+    events.close()
+    assert stopped.wait(1)
+    pool.shutdown()
+
+
+def test_generation_pool_timeout():
+    release = Event()
+
+    def stalled():
+        yield 'chunk'
+        release.wait(1)
+        yield 'late'
+
+    def waiting():
+        release.wait(1)
+        yield 'late'
+
+    pool = GenerationPool(max_concurrency=1, timeout=0.1)
+    events = list(pool.multiplex({'a': stalled, 'b': waiting}))
+    release.set()
+    pool.shutdown()
+
+    assert [(event.key, event.event) for event in events] == [
+        ('a', 'chunk'), ('a', 'error'), ('b', 'error')
+    ]
+    assert isinstance(events[1].data, TimeoutError)
+
+
+def test_includeme(base_config):
+    base_config.registry.settings['anthropic_api_key'] = 'key'
+    base_config.include('riskmatrix.llm')
+    base_config.commit()
+
+    from pyramid.interfaces import IRequestExtensions
+    extensions = base_config.registry.getUtility(IRequestExtensions)
+    assert 'llm' in extensions.descriptors
+    assert 'langfuse' not in extensions.descriptors
+
+
+def test_includeme_fake(base_config):
+    base_config.registry.settings['llm.provider'] = 'fake'
+    base_config.include('riskmatrix.llm')
+    base_config.commit()
+
+    from pyramid.interfaces import IRequestExtensions
+    extensions = base_config.registry.getUtility(IRequestExtensions)
+    assert 'llm' in extensions.descriptors
+    assert 'langfuse' in extensions.descriptors
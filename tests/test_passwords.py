@@ -0,0 +1,143 @@
+import pytest
+from threading import Event
+from threading import Thread
+from threading import Timer
+from webob.multidict import MultiDict
+
+from riskmatrix.models import User
+from riskmatrix.passwords import bcrypt_rejections
+from riskmatrix.passwords import configure_password_hasher
+from riskmatrix.passwords import get_password_hasher
+from riskmatrix.passwords import PasswordHasher
+from riskmatrix.passwords import PasswordHasherBusy
+from riskmatrix.testing import DummyRequest
+from riskmatrix.views.login import login_view
+
+
+@pytest.fixture
+def hasher():
+    previous = get_password_hasher()
+    hasher = PasswordHasher(rounds=4, max_concurrency=1, queue_timeout=0)
+    configure_password_hasher(hasher)
+    yield hasher
+    configure_password_hasher(previous)
+
+
+def test_hash_verify(hasher):
+    hashed = hasher.hash('secret')
+    assert hashed.startswith('$2b$04$')
+    assert hasher.verify('secret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.needs_rehash(hashed)
+
+    hasher.rounds = 5
+    assert hasher.needs_rehash(hashed)
+    assert hasher.needs_rehash('invalid')
+
+
+def test_busy(hasher):
+    started = Event()
+    release = Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    thread = Thread(target=hasher.run, args=('verify', blocking))
+    thread.start()
+    started.wait(5)
+    try:
+        before = bcrypt_rejections.value(operation='verify')
+        with pytest.raises(PasswordHasherBusy):
+            hasher.verify('secret', '$2b$04$invalid')
+        assert bcrypt_rejections.value(operation='verify') == before + 1
+    finally:
+        release.set()
+        thread.join()
+
+    # the slot has been released again
+    assert not hasher.verify('secret', hasher.hash('other'))
+
+
+def test_busy_timeout(hasher):
+    started = Event()
+    release = Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    thread = Thread(target=hasher.run, args=('verify', blocking))
+    thread.start()
+    started.wait(5)
+
+    # operations wait for a slot to free up until the timeout
+    hasher.queue_timeout = 5
+    Timer(0.1, release.set).start()
+    assert hasher.run('verify', lambda: True)
+    thread.join()
+
+
+def test_rehash_on_login(config, organization, hasher):
+    user = User(email='test@example.com', organization=organization)
+    user.set_password('secret')
+    assert user.password.startswith('$2b$04$')
+    changed = user.last_password_change
+
+    hasher.rounds = 5
+    assert not user.check_password('wrong')
+    assert user.password.startswith('$2b$04$')
+    assert user.check_password('secret')
+    assert user.password.startswith('$2b$05$')
+    assert user.last_password_change == changed
+    assert user.check_password('secret')
+
+
+def test_rehash_busy(config, organization, hasher, monkeypatch):
+    user = User(email='test@example.com', organization=organization)
+    user.set_password('secret')
+
+    def busy(password):
+        raise PasswordHasherBusy()
+
+    # the rehash is skipped if there's no free slot, but the login works
+    hasher.rounds = 5
+    monkeypatch.setattr(hasher, 'hash', busy)
+    assert user.check_password('secret')
+    assert user.password.startswith('$2b$04$')
+
+    monkeypatch.undo()
+    assert user.check_password('secret')
+    assert user.password.startswith('$2b$05$')
+
+
+def test_includeme(base_config):
+    previous = get_password_hasher()
+    base_config.registry.settings['bcrypt.rounds'] = '10'
+    base_config.registry.settings['bcrypt.max_concurrency'] = '2'
+    base_config.include('riskmatrix.passwords')
+    try:
+        hasher = get_password_hasher()
+        assert hasher is not previous
+        assert hasher.rounds == 10
+        assert hasher.max_concurrency == 2
+        assert hasher.queue_timeout == 0.5
+    finally:
+        configure_password_hasher(previous)
+
+
+def test_login_busy(config, user, hasher, monkeypatch):
+    def busy(*args):
+        raise PasswordHasherBusy()
+
+    user.set_password('secret')
+    monkeypatch.setattr(hasher, 'verify', busy)
+    request = DummyRequest(post=MultiDict({
+        'email': user.email,
+        'password': 'secret',
+    }))
+    request.method = 'POST'
+    result = login_view(request)
+    assert 'form' in result
+    assert request.response.status_int == 503
+    assert request.response.headers['Retry-After'] == '5'
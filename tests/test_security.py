@@ -1,5 +1,13 @@
+import transaction
+
+from riskmatrix.models import Organization
+from riskmatrix.models import User
+from riskmatrix.security import authenticated_identity
 from riskmatrix.security import authenticated_user
+from riskmatrix.security import Identity
+from riskmatrix.security import query_identity
 from riskmatrix.security import query_user
+from riskmatrix.testing import assert_max_queries
 from riskmatrix.testing import DummyRequest
 
 
@@ -19,3 +27,40 @@ def test_authenticated_user(config, user):
 def test_authenticated_user_not_authenticated(config):
     request = DummyRequest()
     assert authenticated_user(request) is None
+
+
+def test_query_identity(config, user):
+    session = config.dbsession
+    user_id, org_id = user.id, user.organization_id
+
+    # uncommitted changes bypass the cache
+    query_identity.cache_clear()
+    identity = query_identity(user_id, session)
+    assert identity == Identity(user_id, org_id, (f'org_{org_id}',), 'en')
+    assert query_identity.cache_info().currsize == 0
+
+    transaction.commit()
+    assert query_identity(user_id, session) == identity
+    assert query_identity.cache_info().currsize == 1
+    with assert_max_queries(0):
+        assert query_identity(user_id, session) == identity
+
+    # changes to the organization invalidate the identity
+    session.get(Organization, org_id).locale = 'fr'
+    transaction.commit()
+    assert query_identity.cache_info().currsize == 0
+    assert query_identity(user_id, session).locale == 'fr'
+
+    session.delete(session.get(User, user_id))
+    transaction.commit()
+    assert query_identity(user_id, session) is None
+
+
+def test_authenticated_identity(config, user):
+    request = DummyRequest()
+    identity = authenticated_identity(request)
+    assert identity.user_id == user.id
+    assert identity.organization_id == user.organization_id
+
+    config.testing_securitypolicy(userid=None)
+    assert authenticated_identity(request) is None
@@ -8,7 +8,11 @@ from pyramid.authorization import DENY_ALL
 from pyramid.interfaces import ISecurityPolicy
 from sqlalchemy.orm import object_session
 
+from riskmatrix.models import Organization
+from riskmatrix.models import Risk
+from riskmatrix.models import RiskCatalog
 from riskmatrix.models import User
+from riskmatrix.security_policy import organization_permits
 from riskmatrix.security_policy import SessionSecurityPolicy
 from riskmatrix.testing import DummyRequest
 from riskmatrix.testing import verify_interface
@@ -187,6 +191,37 @@ def test_permits_no_acl_method(config):
     assert isinstance(result, ACLDenied)
 
 
+def test_permits_organization(config, organization, user):
+    session = config.dbsession
+    policy = SessionSecurityPolicy()
+    other = Organization(name='Other', email='other@example.com')
+    catalog = RiskCatalog(name='Catalog', organization=organization)
+    other_catalog = RiskCatalog(name='Catalog', organization=other)
+    session.add_all([other, catalog, other_catalog])
+    session.flush()
+
+    request = DummyRequest()
+    request.session['auth.userid'] = user.id
+    for context in (organization, catalog, Risk('Risk', catalog)):
+        result = policy.permits(request, context, 'view')
+        assert isinstance(result, ACLAllowed)
+        assert result.ace == (Allow, f'org_{organization.id}', ['view'])
+        result = policy.permits(request, context, 'edit')
+        assert isinstance(result, ACLDenied)
+
+    for context in (other, other_catalog):
+        result = policy.permits(request, context, 'view')
+        assert isinstance(result, ACLDenied)
+
+    request = DummyRequest()
+    result = policy.permits(request, catalog, 'view')
+    assert isinstance(result, ACLDenied)
+
+    # the fast path doesn't need to build the ACL
+    assert 'request:SessionSecurityPolicy.acl' not in request.cache
+    assert organization_permits.cache_info().hits > 0
+
+
 def test_remember():
     policy = SessionSecurityPolicy()
 
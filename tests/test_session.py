@@ -0,0 +1,143 @@
+import pytest
+from pyramid.csrf import check_csrf_token
+from pyramid.csrf import get_csrf_token
+from pyramid.i18n import TranslationString
+from pyramid.interfaces import ISession
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import get_current_registry
+from zope.interface.verify import verifyObject
+
+from riskmatrix.flash import MessageQueue
+from riskmatrix.security_policy import SessionSecurityPolicy
+from riskmatrix.session import EncryptedSerializer
+from riskmatrix.session import session_factory_from_settings
+
+
+SETTINGS = {
+    'session.type': 'encrypted_cookie',
+    'session.key': 'riskmatrix',
+    'session.secret': 'secret',
+    'session.cookie_expires': '3024000',
+}
+
+
+def roundtrip(factory, cookies=None, update=None):
+    request = Request.blank('/')
+    request.registry = get_current_registry()
+    if cookies:
+        request.cookies.update(cookies)
+    session = factory(request)
+    if update is not None:
+        update(request, session)
+    response = Response()
+    request._process_response_callbacks(response)
+    return session, {
+        cookie.split('=', 1)[0]: cookie.split('=', 1)[1].split(';', 1)[0]
+        for cookie in response.headers.getall('Set-Cookie')
+    }
+
+
+def test_serializer():
+    serializer = EncryptedSerializer('secret')
+    message = TranslationString('Hi ${name}', mapping={'name': 'Jane'})
+    token = serializer.dumps({'message': message})
+    assert b'Jane' not in token
+    data = serializer.loads(token)
+    assert data['message'].mapping == {'name': 'Jane'}
+
+    with pytest.raises(ValueError):
+        EncryptedSerializer('other').loads(token)
+
+    with pytest.raises(ValueError):
+        serializer.loads(token[:-4] + b'AAAA')
+
+
+def test_beaker_fallback():
+    factory = session_factory_from_settings({'session.type': 'memory'})
+    assert factory.__name__ == 'PyramidBeakerSessionObject'
+
+
+def test_requires_secret():
+    with pytest.raises(ValueError):
+        session_factory_from_settings({'session.type': 'encrypted_cookie'})
+
+
+def test_encrypted_cookie_session():
+    factory = session_factory_from_settings(SETTINGS)
+
+    def update(request, session):
+        verifyObject(ISession, session)
+        assert session.last_accessed is None
+        session['key'] = 'value'
+
+    session, cookies = roundtrip(factory, update=update)
+    assert 'value' not in cookies['riskmatrix']
+
+    session, _ = roundtrip(factory, cookies)
+    assert session['key'] == 'value'
+    assert session.last_accessed is not None
+
+    # a tampered cookie results in an empty session
+    tampered = {'riskmatrix': cookies['riskmatrix'][:-4] + 'AAAA'}
+    session, _ = roundtrip(factory, tampered)
+    assert dict(session) == {}
+
+    # as does a cookie that was created using a different secret
+    other = session_factory_from_settings({**SETTINGS, 'session.secret': 'x'})
+    session, _ = roundtrip(other, cookies)
+    assert dict(session) == {}
+
+
+def test_encrypted_cookie_flash_and_csrf(config):
+    factory = session_factory_from_settings(SETTINGS)
+    token = None
+
+    def update(request, session):
+        nonlocal token
+        request.session = session
+        MessageQueue(request).add(
+            TranslationString('Hi ${name}', mapping={'name': 'Jane'})
+        )
+        token = get_csrf_token(request)
+
+    _, cookies = roundtrip(factory, update=update)
+
+    def check(request, session):
+        request.session = session
+        request.headers['X-CSRF-Token'] = token
+        assert check_csrf_token(request)
+        messages = MessageQueue(request).pop()
+        assert messages == [{'type': 'info', 'message': 'Hi ${name}'}]
+        assert messages[0]['message'].mapping == {'name': 'Jane'}
+
+    roundtrip(factory, cookies, update=check)
+
+
+def test_encrypted_cookie_security_policy():
+    factory = session_factory_from_settings(SETTINGS)
+    policy = SessionSecurityPolicy(timeout=60)
+
+    def remember(request, session):
+        request.session = session
+        policy.remember(request, 'user')
+
+    _, cookies = roundtrip(factory, update=remember)
+
+    def check(request, session):
+        request.session = session
+        assert policy.authenticated_userid(request) == 'user'
+
+    roundtrip(factory, cookies, update=check)
+
+    def forget(request, session):
+        request.session = session
+        policy.forget(request)
+
+    _, cookies = roundtrip(factory, cookies, update=forget)
+
+    def check_forgotten(request, session):
+        request.session = session
+        assert policy.authenticated_userid(request) is None
+
+    roundtrip(factory, cookies, update=check_forgotten)
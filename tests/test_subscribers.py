@@ -1,7 +1,10 @@
 from pyramid.events import NewRequest
 from pyramid.events import NewResponse
+from pyramid.request import apply_request_extensions
 
-from riskmatrix.subscribers import csp_header, request_nonce_generator
+from riskmatrix.subscribers import compile_csp
+from riskmatrix.subscribers import csp_header
+from riskmatrix.subscribers import csp_nonce
 from riskmatrix.subscribers import sentry_context
 from riskmatrix.testing import DummyRequest
 
@@ -71,6 +74,38 @@ def test_csp_header_sentry(config):
     )
 
 
+def test_csp_header_without_nonce(config):
+    request = DummyRequest()
+    response = request.response
+    event = NewResponse(request, response)
+    csp_header(event)
+    assert 'nonce' not in response.headers['Content-Security-Policy']
+    assert "script-src 'self' blob: resource:;" in (
+        response.headers['Content-Security-Policy']
+    )
+
+
+def test_csp_nonce(config):
+    config.add_request_method(csp_nonce, 'csp_nonce', reify=True)
+    request = DummyRequest()
+    apply_request_extensions(request)
+    other = DummyRequest()
+    apply_request_extensions(other)
+    nonce = request.csp_nonce
+    assert nonce == request.csp_nonce
+    assert nonce != other.csp_nonce
+
+    response = request.response
+    event = NewResponse(request, response)
+    csp_header(event)
+    assert f"'nonce-{nonce}'" in response.headers['Content-Security-Policy']
+
+
+def test_compile_csp():
+    assert compile_csp(None) is compile_csp(None)
+    assert compile_csp(None).render('1') != compile_csp(None).render('2')
+
+
 def test_csp_header_existing(config):
     request = DummyRequest()
     response = request.response
@@ -0,0 +1,228 @@
+import json
+import pytest
+import transaction
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.httpexceptions import HTTPConflict
+from sqlalchemy import select
+from types import SimpleNamespace
+
+from riskmatrix.cache import subscribe
+from riskmatrix.cache import unsubscribe
+from riskmatrix.models import Organization
+from riskmatrix.models import Risk
+from riskmatrix.models import RiskCatalog
+from riskmatrix.testing import DummyRequest
+from riskmatrix.views.risk import add_risks_view
+from riskmatrix.views.risk import cached_generation
+from riskmatrix.views.risk import stream_risk_generation
+from riskmatrix.views.risk import stream_risk_generation_batch
+
+
+class FakeLLM:
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    def stream(self, messages, config):
+        self.calls += 1
+        for chunk in self.chunks:
+            yield SimpleNamespace(content=chunk)
+
+
+def test_stream_risk_generation_cached(config, organization, user):
+    cached_generation.cache_clear()
+    llm = FakeLLM(['#### Backup\n', '- [ ] __Restore__: Untested'])
+
+    def generate(answers, organization=organization):
+        request = DummyRequest(
+            json={
+                'catalog': {'name': 'Backup', 'description': 'Backups'},
+                'answers': answers
+            },
+            llm=llm,
+            langfuse=None
+        )
+        response = stream_risk_generation(organization, request)
+        assert response.content_type == 'text/event-stream'
+        return b''.join(response.app_iter)
+
+    expected = b'#### Backup\n- [ ] __Restore__: Untested'
+    assert generate({'Industry': 'IT'}) == expected
+    assert llm.calls == 1
+
+    # the same question is answered from the cache
+    assert generate({'Industry': 'IT'}) == expected
+    assert llm.calls == 1
+
+    # different answers need a new generation
+    assert generate({'Industry': 'Retail'}) == expected
+    assert llm.calls == 2
+
+    # generations are never shared with other organizations
+    other = Organization(name='Other', email='other@example.com')
+    config.dbsession.add(other)
+    config.dbsession.flush()
+    assert generate({'Industry': 'IT'}, other) == expected
+    assert llm.calls == 3
+
+
+def test_stream_risk_generation_batch(config, organization, user):
+    cached_generation.cache_clear()
+    llm = FakeLLM(['#### Catalog\n', '- [ ] __Risk__: Description'])
+    request = DummyRequest(
+        json={
+            'catalogs': [
+                {'name': 'Backup', 'description': 'Backups'},
+                # existing catalogs don't need to have a description
+                {'name': 'Network', 'description': None},
+            ],
+            'answers': {'Industry': 'IT'}
+        },
+        llm=llm,
+        langfuse=None
+    )
+    response = stream_risk_generation_batch(organization, request)
+    assert response.content_type == 'text/event-stream'
+    body = b''.join(response.app_iter).decode('utf-8')
+
+    texts = {}
+    finished = set()
+    for message in body.split('\n\n')[:-1]:
+        event_line, data_line = message.split('\n')
+        event = event_line.removeprefix('event: ')
+        data = json.loads(data_line.removeprefix('data: '))
+        if event == 'chunk':
+            text = texts.get(data['catalog'], '')
+            texts[data['catalog']] = text + data['text']
+        else:
+            assert event == 'done'
+            finished.add(data['catalog'])
+
+    catalogs = organization.risk_catalogs
+    assert {catalog.name: catalog.description for catalog in catalogs} == {
+        'Backup': 'Backups',
+        'Network': None
+    }
+    assert finished == {catalog.id for catalog in catalogs}
+    assert set(texts.values()) == {'#### Catalog\n- [ ] __Risk__: Description'}
+    assert llm.calls == 2
+
+
+@pytest.mark.parametrize('body', [
+    [],
+    {'catalogs': []},
+    {'answers': {'Industry': 'IT'}},
+    {'answers': ['IT'], 'catalogs': []},
+    {'answers': {'Industry': 1}, 'catalogs': []},
+    {'answers': {}, 'catalogs': {'name': 'Backup'}},
+    {'answers': {}, 'catalogs': ['Backup']},
+    {'answers': {}, 'catalogs': [{'description': 'Backups'}]},
+    {'answers': {}, 'catalogs': [{'name': ' ', 'description': 'Backups'}]},
+    {'answers': {}, 'catalogs': [{'name': 'Backup', 'description': 1}]},
+])
+def test_stream_risk_generation_batch_invalid(
+    config,
+    organization,
+    user,
+    body
+):
+    request = DummyRequest(json=body, llm=FakeLLM([]), langfuse=None)
+    with pytest.raises(HTTPBadRequest):
+        stream_risk_generation_batch(organization, request)
+    assert organization.risk_catalogs == []
+
+
+def test_add_risks_view(config, organization, user, query_budget):
+    session = config.dbsession
+    backup = RiskCatalog(name='Backup', organization=organization)
+    network = RiskCatalog(name='Network', organization=organization)
+    other = RiskCatalog(
+        name='Other',
+        organization=Organization(name='Other', email='other@example.com')
+    )
+    session.add_all([backup, network, other])
+    session.flush()
+    deleted = Risk('Deleted', backup)
+    session.add_all([Risk('Existing', backup), deleted])
+    session.flush()
+    deleted.soft_delete()
+    session.flush()
+
+    request = DummyRequest(json=[
+        {'catalog_id': backup.id, 'name': 'Restore', 'description': 'D'},
+        {'catalog_id': network.id, 'name': ' Firewall '},
+        {'catalog_id': network.id, 'name': 'Firewall'},
+        {'catalog_id': network.id, 'name': 'Existing'},
+        {'catalog_id': network.id, 'name': 'Deleted'},
+    ])
+    with query_budget(3):
+        result = add_risks_view(organization, request)
+
+    assert request.response.status_int == 201
+    assert len(result['ids']) == 2
+    risks = {
+        risk.name: risk
+        for risk in session.scalars(
+            select(Risk).where(Risk.id.in_(result['ids']))
+        )
+    }
+    assert risks['Restore'].catalog_id == backup.id
+    assert risks['Restore'].description == 'D'
+    assert risks['Firewall'].catalog_id == network.id
+    assert risks['Firewall'].description is None
+    assert risks['Firewall'].meta == {}
+
+    # nothing left to add
+    request = DummyRequest(json=[{'catalog_id': backup.id, 'name': 'Restore'}])
+    assert add_risks_view(organization, request) == {'ids': []}
+    assert request.response.status_int == 200
+
+    # risks can't be added to the catalogs of other organizations
+    for data in (
+        [{'catalog_id': other.id, 'name': 'Risk'}],
+        [{'catalog_id': backup.id, 'name': ''}],
+        [{'catalog_id': backup.id, 'name': 'x' * 257}],
+        {'catalog_id': backup.id, 'name': 'Risk'},
+    ):
+        with pytest.raises(HTTPBadRequest):
+            add_risks_view(organization, DummyRequest(json=data))
+
+
+def test_add_risks_view_conflict(config, organization, user, monkeypatch):
+    session = config.dbsession
+    catalog = RiskCatalog(name='Backup', organization=organization)
+    session.add(catalog)
+    session.flush()
+    session.add(Risk('Restore', catalog))
+    session.flush()
+
+    # another request added the risk after we looked for existing names
+    monkeypatch.setattr(session, 'scalars', lambda *args, **kwargs: [])
+    request = DummyRequest(json=[
+        {'catalog_id': catalog.id, 'name': 'Restore'}
+    ])
+    with pytest.raises(HTTPConflict):
+        add_risks_view(organization, request)
+
+
+def test_add_risks_view_invalidation(config, organization, user):
+    published = []
+    subscribe(published.append)
+    catalog = RiskCatalog(name='Backup', organization=organization)
+    config.dbsession.add(catalog)
+    config.dbsession.flush()
+    transaction.commit()
+    published.clear()
+
+    organization = config.dbsession.merge(organization)
+    catalog_id = config.dbsession.merge(catalog).id
+    request = DummyRequest(json=[{'catalog_id': catalog_id, 'name': 'Risk'}])
+    risk_id, = add_risks_view(organization, request)['ids']
+    assert published == []
+    transaction.commit()
+    unsubscribe(published.append)
+
+    tags, = published
+    assert f'risk:{risk_id}' in tags
+    assert f'risk_catalog:{catalog_id}' in tags